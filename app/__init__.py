@@ -1 +1,6 @@
-from app.ui import render_ui
+def __getattr__(name):
+    # Imported lazily so headless entry points (CLI, workers) never load Streamlit
+    if name == "render_ui":
+        from app.ui import render_ui
+        return render_ui
+    raise AttributeError(f"module 'app' has no attribute '{name}'")
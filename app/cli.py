@@ -0,0 +1,144 @@
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from app.generators import generator_config
+from app.helpers.config import DATASET_CACHE_MAX_MB, DEF_MEMORY_BUDGET_MB, DEF_PERIODS_PER_CHUNK, OUTPUT_DIR
+from app.helpers.dataset_cache import DatasetCache
+from app.helpers.distributions import distribution_errors
+from app.helpers.estimator import plan_run
+from app.helpers.export import EXPORT_FORMATS, available_export_formats, dataset_filename
+from app.helpers.profiling import StageProfiler
+from app.helpers.profile_loader import read_profile, resolve_profile_path, state_config_from_profile
+from app.helpers.scheduler import run_generators
+from app.helpers.streaming import stream_generators
+from app.helpers.writer import write_dataset
+from app.mods import apply_dataset_scenarios
+
+# ----------------------------
+# Headless batch entry point
+# ----------------------------
+# Runs a saved profile end to end (generators, custom columns, scenarios) and writes
+# one file per dataset (CSV, Parquet or Arrow IPC), without importing Streamlit:
+#   python -m app profiles/it_o2c.json --out output/it_o2c
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app", description="Generate synthetic datasets from a saved profile, without the UI.")
+    parser.add_argument(
+        "profile", help="Path to a profile JSON, or the name of a profile in the profiles/ folder.")
+    parser.add_argument("-o", "--out", default=OUTPUT_DIR,
+                        help="Output folder (default: %(default)s).")
+    parser.add_argument("-d", "--datasets", nargs="+", choices=list(generator_config), metavar="DATASET",
+                        help="Datasets to generate (default: all).")
+    parser.add_argument("--seed", type=int,
+                        help="Override the profile's seed.")
+    parser.add_argument("-f", "--format", default="csv", choices=list(EXPORT_FORMATS),
+                        help="Output format (default: %(default)s). Parquet and Arrow need pyarrow.")
+    parser.add_argument("-c", "--compression",
+                        help="Compression codec for Parquet / Arrow (default: the format's first codec, e.g. zstd).")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream fact datasets to disk a block of periods at a time.")
+    parser.add_argument("--periods-per-chunk", type=int, default=DEF_PERIODS_PER_CHUNK,
+                        help="Periods per chunk in streaming mode (default: %(default)s).")
+    parser.add_argument("--cache-dir",
+                        help="Reuse datasets cached here by earlier runs whose inputs are unchanged, and cache this run's.")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for in-memory generation (default: one per CPU, 1 = in-process).")
+    parser.add_argument("--memory-budget", type=float, default=DEF_MEMORY_BUDGET_MB, metavar="MB",
+                        help="Estimated peak memory allowed (default: %(default)s). Larger runs are streamed in smaller "
+                             "chunks, or refused if even that does not fit; 0 = no limit.")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a JSON run report (time, CPU, rows and memory of every generator, custom column and scenario).")
+    parser.add_argument("--profile-stage", metavar="STAGE",
+                        help="Also run one stage under cProfile and dump it as <STAGE>.prof, e.g. generator:Revenue_Invoices.")
+    parser.add_argument("--profile-dir",
+                        help="Folder for the .prof dump (default: the output folder).")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+
+    try:
+        profile_path = resolve_profile_path(args.profile)
+    except FileNotFoundError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    state_config = state_config_from_profile(read_profile(profile_path))
+    if args.seed is not None:
+        state_config["seed"] = args.seed
+    errors = distribution_errors(state_config)
+    if errors:
+        for msg in errors:
+            print(f"error: {msg}", file=sys.stderr)
+        return 2
+    datasets = args.datasets or list(generator_config)
+    if args.format not in available_export_formats():
+        print(f"error: {args.format} export needs pyarrow (`pip install pyarrow`).", file=sys.stderr)
+        return 2
+    codecs = EXPORT_FORMATS[args.format]["codecs"]
+    compression = args.compression or codecs[0]
+    if compression not in codecs:
+        print(
+            f"error: '{compression}' is not a {args.format} codec (choose from {', '.join(codecs)}).", file=sys.stderr)
+        return 2
+
+    plan = plan_run(state_config, datasets, args.memory_budget, args.stream, args.periods_per_chunk)
+    if plan["mode"] == "refuse":
+        print(f"error: {plan['reason']}", file=sys.stderr)
+        return 2
+    if plan["reason"]:
+        print(f"note: {plan['reason']}", file=sys.stderr)
+
+    profiler = StageProfiler(profile_stage=args.profile_stage, profile_dir=args.profile_dir or args.out) \
+        if args.report or args.profile_stage else None
+
+    if plan["mode"] == "stream":
+        outputs, warnings = stream_generators(
+            state_config, datasets, args.out, plan["periods_per_chunk"], args.format, compression, profiler=profiler)
+        written = {name: (out["path"], out["rows"])
+                   for name, out in outputs.items()}
+    else:
+        cache = DatasetCache(DATASET_CACHE_MAX_MB * 2**20,
+                             args.cache_dir) if args.cache_dir else None
+        generated, warnings = run_generators(
+            state_config, datasets, max_workers=args.workers, cache=cache, profiler=profiler)
+        if cache is not None:
+            cache.flush()
+            print(f"Reused {cache.hits} cached dataset(s)")
+        for sc in state_config["scenarios"]:
+            if sc.get('target_dataset') not in generated:
+                warnings.append(
+                    f"Scenario '{sc.get('name')}' targets '{sc.get('target_dataset')}', which was not generated. Skipping.")
+        written = {}
+        for name, df in generated.items():
+            df = apply_dataset_scenarios(
+                df, name, state_config["scenarios"], state_config["seed"], profiler=profiler)
+            path = os.path.join(args.out, dataset_filename(name, args.format))
+            write_dataset(df, path, args.format, compression)
+            written[name] = (path, len(df))
+
+    for msg in warnings:
+        print(f"warning: {msg}", file=sys.stderr)
+    for name, (path, rows) in written.items():
+        print(f"{name:28s} {rows:>12,} rows  -> {path}")
+    if profiler is not None:
+        dumps = [r["profile_path"] for r in profiler.records if r["profile_path"]]
+        if args.profile_stage and not dumps:
+            print(f"warning: stage '{args.profile_stage}' did not run; nothing was profiled.", file=sys.stderr)
+        for path in dumps:
+            print(f"cProfile dump -> {path}")
+        if args.report:
+            profiler.write_report(args.report)
+            print(f"Run report -> {args.report}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
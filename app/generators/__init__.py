@@ -1,31 +1,140 @@
-from typing import Callable, Dict
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List
 
-from faker import Faker
+import numpy as np
 import pandas as pd
 
 from app.generators.customer_master import generate_customer_master
 from app.generators.vendor_master import generate_vendor_master
-from app.generators.revenue import generate_revenue_invoices
-from app.generators.purchases import generate_purchases
+from app.generators.revenue import generate_revenue_invoices, iter_revenue_invoices
+from app.generators.purchases import generate_purchases, iter_purchases
 from app.generators.debtors import generate_debtors_from_invoices
-from app.generators.ppe import generate_ppe_register
-from app.generators.inventory import generate_inventory_snapshots
-from app.generators.operational import generate_operational_dataset
+from app.generators.ppe import generate_ppe_register, generate_ppe_depreciation_schedule
+from app.generators.inventory import generate_inventory_snapshots, iter_inventory_snapshots
+from app.generators.operational import generate_operational_dataset, iter_operational_dataset
 
-from app.types import TAppStateConfig
+from app.types import TAppStateConfig, TDatasetSchema
+
+if TYPE_CHECKING:
+    from faker import Faker
 
 
 TGeneratorFunction = Callable[[TAppStateConfig,
-                               Faker, Dict[str, pd.DataFrame]], pd.DataFrame]
+                               "Faker | None", Dict[str, pd.DataFrame], np.random.Generator | None], pd.DataFrame]
+
+TChunkGeneratorFunction = Callable[[TAppStateConfig, "Faker | None", Dict[str, pd.DataFrame],
+                                    np.random.Generator | None, int], Iterator[pd.DataFrame]]
 
 
 generator_config: Dict[str, TGeneratorFunction] = {
     "Customer_Master": generate_customer_master,
     "Vendor_Master": generate_vendor_master,
     "PPE_Register": generate_ppe_register,
+    "PPE_Depreciation_Schedule": generate_ppe_depreciation_schedule,
     "Revenue_Invoices": generate_revenue_invoices,
     "Purchases": generate_purchases,
     "Debtors": generate_debtors_from_invoices,
     "Inventory_Snapshots": generate_inventory_snapshots,
     "Operational_Dataset": generate_operational_dataset,
 }
+
+# Datasets each generator reads from `generated`; everything else is independent
+generator_inputs: Dict[str, List[str]] = {
+    "Customer_Master": [],
+    "Vendor_Master": [],
+    "PPE_Register": [],
+    "PPE_Depreciation_Schedule": ["PPE_Register"],
+    "Revenue_Invoices": ["Customer_Master"],
+    "Purchases": ["Vendor_Master"],
+    "Debtors": ["Revenue_Invoices", "Customer_Master"],
+    "Inventory_Snapshots": [],
+    "Operational_Dataset": [],
+}
+
+# Fact datasets that can be streamed as chunks of consecutive periods
+chunk_generator_config: Dict[str, TChunkGeneratorFunction] = {
+    "Revenue_Invoices": iter_revenue_invoices,
+    "Purchases": iter_purchases,
+    "Inventory_Snapshots": iter_inventory_snapshots,
+    "Operational_Dataset": iter_operational_dataset,
+}
+
+# Columns dependants read from a streamed dataset; only these are kept in memory while streaming
+chunk_input_columns: Dict[str, List[str]] = {
+    "Revenue_Invoices": ["Date", "CustomerID", "CustomerSegment", "Country", "State", "InvoiceAmount", "PaidAmount"],
+}
+
+# State config keys each generator reads (every generator also draws from the seed); these
+# drive the cache fingerprints, so a generator must be listed against anything new it reads
+generator_config_keys: Dict[str, List[str]] = {
+    "Customer_Master": ["seed", "faker_locale", "countries", "country_config", "end_date", "industry_kpi",
+                        "total_customers", "categorical_distributions"],
+    "Vendor_Master": ["seed", "faker_locale", "countries", "country_config", "end_date", "total_vendors",
+                      "categorical_distributions"],
+    "PPE_Register": ["seed", "faker_locale", "countries", "country_config", "start_date", "end_date", "total_assets",
+                     "outlier_frequency", "outlier_magnitude", "outlier_model", "outlier_labels",
+                     "categorical_distributions"],
+    "PPE_Depreciation_Schedule": ["seed", "start_date", "end_date", "total_assets"],
+    "Revenue_Invoices": ["seed", "industry", "products", "start_date", "end_date", "frequency",
+                         "outlier_frequency", "outlier_magnitude", "outlier_model", "outlier_labels",
+                         "categorical_distributions"],
+    "Purchases": ["seed", "industry", "products", "start_date", "end_date", "frequency",
+                  "outlier_frequency", "outlier_magnitude", "outlier_model", "outlier_labels",
+                  "categorical_distributions"],
+    "Debtors": ["seed", "outlier_frequency", "outlier_magnitude", "outlier_model", "outlier_labels",
+                "categorical_distributions"],
+    "Inventory_Snapshots": ["seed", "countries", "country_config", "products", "start_date", "end_date", "frequency",
+                            "total_warehouses", "outlier_frequency", "outlier_magnitude", "outlier_model", "outlier_labels",
+                            "categorical_distributions"],
+    "Operational_Dataset": ["seed", "industry", "industry_kpi", "countries", "country_config", "start_date", "end_date",
+                            "frequency"],
+}
+
+# Enumerated and date columns of each dataset, used to compact generated frames
+generator_schemas: Dict[str, TDatasetSchema] = {
+    "Customer_Master": {
+        "categorical": ["Country", "State", "CustomerSegment", "Industry", "BusinessType", "ListedFlag", "ListingStatus",
+                        "CustomerOrigin", "TaxCategory", "EntityCategory", "IsRelatedParty", "AccountStatus", "PaymentTerms"],
+        "datetime": ["RegistrationDate"],
+    },
+    "Vendor_Master": {
+        "categorical": ["Country", "State", "VendorType", "BusinessType", "ListedFlag", "ListingStatus", "VendorOrigin",
+                        "TaxCategory", "PaymentTerms", "IsPreferredVendor"],
+        "datetime": ["OnboardedDate"],
+    },
+    "PPE_Register": {
+        "categorical": ["AssetType", "Department", "CostCenter", "OwnershipType", "ConditionStatus", "DepreciationMethod",
+                        "CapexSource", "Country", "State"],
+        "datetime": ["AcquisitionDate"],
+    },
+    "PPE_Depreciation_Schedule": {
+        "categorical": ["AssetType", "Department", "CostCenter", "DepreciationMethod"],
+        "datetime": ["PeriodEnd"],
+    },
+    "Revenue_Invoices": {
+        "categorical": ["Industry", "Product", "CustomerSegment", "Country", "State", "SalesChannel", "ContractType",
+                        "PaymentMode", "SalespersonTier", "InvoiceType", "PromotionApplied", "CustomerTier",
+                        "MarketSegment", "PaymentStatus"],
+        "datetime": ["Date", "DueDate", "PaymentDate"],
+    },
+    "Purchases": {
+        "categorical": ["Industry", "Product", "VendorType", "Country", "State", "PurchaseType", "ProcurementChannel",
+                        "PriorityLevel", "PaymentMode", "ContractTerm"],
+        "datetime": ["Date"],
+    },
+    "Debtors": {
+        "categorical": ["CustomerSegment", "Country", "State", "Industry", "EntityCategory", "CustomerOrigin",
+                        "IsRelatedParty", "BusinessSegment", "ContractType", "ContractRenewalFlag", "CollectionTrend",
+                        "AutoDebitEnabled", "AgingBucket", "RiskCategory", "ProvisionStage", "PaymentTerms",
+                        "DelinquencyFlag", "DebtorCategory"],
+        "datetime": ["PeriodEnd"],
+    },
+    "Inventory_Snapshots": {
+        "categorical": ["Product", "Category", "Country", "State", "CostCenter", "WarehouseID", "WarehouseType",
+                        "StorageCondition", "InventoryStatus", "InventoryHealth"],
+        "datetime": ["Date"],
+    },
+    "Operational_Dataset": {
+        "categorical": ["Industry", "Country", "State"],
+        "datetime": ["Date"],
+    },
+}
@@ -1,16 +1,18 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict
 import pandas as pd
 import numpy as np
 
-from app.mods import inject_outliers_vectorized
+from app.helpers.distributions import categorical_sampler
+from app.mods import inject_outliers_vectorized, outlier_options
+from app.helpers.rng import dataset_rng
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker = Faker(), generated: Dict[str, pd.DataFrame] = {}):
-    seed = state_config["seed"]
-    outlier_freq = state_config["outlier_frequency"]
-    outlier_mag = state_config["outlier_magnitude"]
+
+def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "Debtors")
 
     invoices_df = generated.get("Revenue_Invoices", pd.DataFrame())
     cust_master_df = generated.get("Customer_Master", pd.DataFrame())
@@ -18,13 +20,11 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
     if invoices_df.empty or cust_master_df.empty:
         return pd.DataFrame()
 
-    np.random.seed(seed)
-
     # --- Aggregate base data ---
     df = invoices_df.copy()
     df["Period"] = pd.to_datetime(df["Date"]).dt.to_period("M")
 
-    agg = df.groupby(["Period", "CustomerID", "CustomerSegment", "Country", "State"]).agg(
+    agg = df.groupby(["Period", "CustomerID", "CustomerSegment", "Country", "State"], observed=True).agg(
         Credit=("InvoiceAmount", "sum"),
         Collections=("PaidAmount", "sum"),
     ).reset_index()
@@ -33,7 +33,7 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
     agg["DSO_Est"] = np.where(
         agg["Credit"] > 0, (agg["ClosingBalance"] / agg["Credit"]) * 30, 0
     )
-    agg["PeriodEnd"] = agg["Period"].dt.to_timestamp(how='end').dt.date
+    agg["PeriodEnd"] = agg["Period"].dt.to_timestamp(how='end').dt.normalize()
 
     # --- Merge with Customer Master ---
     merged = agg.merge(
@@ -49,25 +49,30 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
     ).sort_values(by=["CustomerID", "Period"])
 
     # --- Opening Balance Simulation ---
-    opening_balances = []
-    for cust_id, grp in merged.groupby("CustomerID"):
-        grp = grp.sort_values("Period")
-        base_opening = np.random.uniform(0.2, 0.8) * grp["Credit"].iloc[0]
-        credit_factor = (100 - grp["CreditRating"].iloc[0]) / 100
-        risk_factor = grp["RiskScore"].iloc[0] / 100
-        adj_opening = base_opening * (0.5 + credit_factor + risk_factor)
-        grp.loc[grp.index[0], "OpeningBalance"] = round(adj_opening, 2)
-        for i in range(1, len(grp)):
-            prev_close = grp.iloc[i - 1]["ClosingBalance"]
-            noise = np.random.normal(0, 0.05) * prev_close
-            grp.loc[grp.index[i], "OpeningBalance"] = max(
-                prev_close + noise, 0)
-        opening_balances.append(grp)
-    merged = pd.concat(opening_balances, ignore_index=True)
+    # Segmented over the (CustomerID, Period)-sorted frame: each customer's first
+    # period gets a simulated opening, later periods carry the previous close plus noise.
+    merged = merged.reset_index(drop=True)
+    cust_ids = merged["CustomerID"].to_numpy()
+    is_first = np.ones(len(merged), dtype=bool)
+    is_first[1:] = cust_ids[1:] != cust_ids[:-1]
+
+    first_idx = np.flatnonzero(is_first)
+    seg_len = np.diff(np.append(first_idx, len(merged)))
+    base_opening = rng.uniform(
+        0.2, 0.8, len(first_idx)) * merged["Credit"].to_numpy()[first_idx]
+    credit_factor = (100 - merged["CreditRating"].to_numpy()[first_idx]) / 100
+    risk_factor = merged["RiskScore"].to_numpy()[first_idx] / 100
+    adj_opening = np.round(
+        base_opening * (0.5 + credit_factor + risk_factor), 2)
+
+    prev_close = merged["ClosingBalance"].shift(1).to_numpy()
+    noise = rng.normal(0, 0.05, len(merged)) * prev_close
+    merged["OpeningBalance"] = np.where(
+        is_first, np.repeat(adj_opening, seg_len), np.maximum(prev_close + noise, 0))
 
     # --- Derived / Behavioral Metrics ---
     merged["Overdue%"] = np.clip(
-        np.random.normal(0.15, 0.05, len(merged)), 0, 1)
+        rng.normal(0.15, 0.05, len(merged)), 0, 1)
     merged["CollectionEfficiency"] = 1 - merged["Overdue%"]
     merged["AgingBucket"] = pd.cut(
         merged["DSO_Est"],
@@ -78,19 +83,17 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
     # --- Business / Relationship Attributes ---
     merged["EngagementTenureMonths"] = (
         merged["CustomerTenureDays"] / 30).astype(int)
-    merged["BusinessSegment"] = np.random.choice(
-        ["Enterprise", "Mid-Market", "SME", "Startup"], len(merged)
-    )
-    merged["ContractType"] = np.random.choice(
-        ["Fixed", "Time & Material", "Retainer", "Ad-hoc"], len(merged)
-    )
+    merged["BusinessSegment"] = categorical_sampler(
+        state_config, "Debtors.BusinessSegment").categorical(rng, len(merged))
+    merged["ContractType"] = categorical_sampler(
+        state_config, "Debtors.ContractType").categorical(rng, len(merged))
     merged["ContractRenewalFlag"] = np.where(
         merged["EngagementTenureMonths"] > 24, "Yes", "No"
     )
 
     # --- Credit / Risk Attributes ---
     merged["CreditLimit"] = np.round(
-        np.random.uniform(1.2, 2.5, len(merged)) * merged["Credit"], 2
+        rng.uniform(1.2, 2.5, len(merged)) * merged["Credit"], 2
     )
     merged["CreditUtilization%"] = np.round(
         merged["ClosingBalance"] / merged["CreditLimit"], 3
@@ -110,12 +113,12 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
 
     # --- Behavior Metrics ---
     merged["AvgPaymentDelayDays"] = np.round(
-        merged["DSO_Est"] * np.random.uniform(0.8, 1.2), 0)
-    merged["CollectionTrend"] = np.random.choice(
-        ["Up", "Stable", "Down"], len(merged))
-    merged["BounceCount"] = np.random.poisson(0.3, len(merged))
-    merged["AutoDebitEnabled"] = np.random.choice(
-        ["Yes", "No"], len(merged), p=[0.6, 0.4])
+        merged["DSO_Est"] * rng.uniform(0.8, 1.2), 0)
+    merged["CollectionTrend"] = categorical_sampler(
+        state_config, "Debtors.CollectionTrend").categorical(rng, len(merged))
+    merged["BounceCount"] = rng.poisson(0.3, len(merged))
+    merged["AutoDebitEnabled"] = categorical_sampler(
+        state_config, "Debtors.AutoDebitEnabled").categorical(rng, len(merged))
 
     # --- Financial Analytics ---
     merged["ReceivablesTurnover"] = np.where(
@@ -128,21 +131,21 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
     merged["BadDebtEstimate"] = (
         merged["ClosingBalance"] * merged["DefaultProbability"]).round(2)
     merged["LossGivenDefault"] = np.round(
-        np.random.uniform(0.2, 0.8, len(merged)), 2)
+        rng.uniform(0.2, 0.8, len(merged)), 2)
     merged["ExpectedCreditLoss"] = (
         merged["BadDebtEstimate"] * merged["LossGivenDefault"]).round(2)
     merged["DaysPastDue"] = (merged["Overdue%"] *
                              merged["AvgPaymentDelayDays"]).astype(int)
 
     # --- Debtor Category Logic ---
-    def classify_debtor(row):
-        if row["RiskScore"] > 80 and row["Overdue%"] < 0.2:
-            return "Prompt Payer"
-        elif row["RiskScore"] < 40 or row["Overdue%"] > 0.5:
-            return "High Risk"
-        else:
-            return "Standard"
-    merged["DebtorCategory"] = merged.apply(classify_debtor, axis=1)
+    merged["DebtorCategory"] = np.select(
+        [
+            (merged["RiskScore"] > 80) & (merged["Overdue%"] < 0.2),
+            (merged["RiskScore"] < 40) | (merged["Overdue%"] > 0.5),
+        ],
+        ["Prompt Payer", "High Risk"],
+        default="Standard"
+    )
     merged["DelinquencyFlag"] = np.where(
         merged["AgingBucket"].isin(["91-180", "180+"]), "Yes", "No"
     )
@@ -164,7 +167,7 @@ def generate_debtors_from_invoices(state_config: TAppStateConfig, faker: Faker =
 
     # --- Inject Outliers ---
     final_df = inject_outliers_vectorized(
-        final_df, ['ClosingBalance', 'ExpectedCreditLoss'], freq=outlier_freq, mag=outlier_mag, seed=seed + 5
+        final_df, ['ClosingBalance', 'ExpectedCreditLoss'], **outlier_options(state_config), rng=rng
     )
 
     return final_df
@@ -1,99 +1,144 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict, Iterator
 import pandas as pd
 import numpy as np
 
-from app.helpers.general import date_range
-from app.mods import inject_outliers_vectorized
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.distributions import categorical_sampler
+from app.helpers.general import date_range, iter_date_chunks, rand_regions
+from app.mods import inject_outliers_vectorized, outlier_options
+from app.helpers.rng import dataset_rng
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_inventory_snapshots(state_config: TAppStateConfig, faker: Faker = Faker(), generated: Dict[str, pd.DataFrame] = {}):
-    seed = state_config["seed"]
+
+def replenish_stock(opening: np.ndarray, sales: np.ndarray, adjustments: np.ndarray, reorder_level: np.ndarray,
+                    order_up_to: np.ndarray):
+    """
+    Rolls stock forward under a reorder-point policy: a period that opens at or below
+    `reorder_level` receives enough to bring it back up to `order_up_to`, and stock is
+    clipped at zero. Vectorized across products x warehouses, sequential along the period
+    (last) axis, since each period's receipts depend on the previous closing.
+    Returns (receipts, closing), shaped like `sales`.
+    """
+    receipts = np.zeros_like(sales)
+    closing = np.empty_like(sales)
+    stock = opening
+    for t in range(sales.shape[-1]):
+        receipts[..., t] = np.where(stock <= reorder_level, order_up_to - stock, 0)
+        stock = np.maximum(stock + receipts[..., t] - sales[..., t] + adjustments[..., t], 0)
+        closing[..., t] = stock
+    return receipts, closing
+
+
+def _inventory_setup(state_config: TAppStateConfig, rng: np.random.Generator):
+    """Static warehouse and product x warehouse attributes plus the initial opening stock."""
     countries = state_config["countries"]
     products = state_config["products"]
     default_regions = state_config["country_config"]
-    start_date = state_config["start_date"]
-    end_date = state_config["end_date"]
-    freq = state_config["frequency"]
-    outlier_freq = state_config["outlier_frequency"]
-    outlier_mag = state_config["outlier_magnitude"]
-
-    np.random.seed(seed)
-    dates = date_range(start_date, end_date, freq)
-
-    warehouse_types = ["Central", "Regional",
-                       "Transit", "3PL", "Vendor Managed"]
-    storage_conditions = ["Ambient", "Cold Storage",
-                          "Hazardous", "Dry", "Climate Controlled"]
-    inventory_status = ["Available", "Reserved",
-                        "In Transit", "Damaged", "Blocked"]
-    categories = ["Raw Material", "WIP", "Finished Goods", "Consumables"]
-
-    rows = []
-
-    for product in products:
-        base_stock = np.random.randint(100, 5000)
-        category = np.random.choice(categories)
-
-        for d in dates:
-            country = np.random.choice(countries)
-            region = np.random.choice(
-                default_regions.get(country, ["Unknown"]))
-            cost_center = f"{region[:3].upper()}-{np.random.randint(1, 11):02d}"
-            warehouse_id = f"WH-{np.random.randint(1, 11):02d}"
-            warehouse_type = np.random.choice(warehouse_types)
-            storage_cond = np.random.choice(storage_conditions)
-            inv_status = np.random.choice(inventory_status)
-
-            opening = base_stock + int(np.random.normal(0, base_stock * 0.05))
-            receipts = max(0, int(np.random.poisson(lam=base_stock * 0.2)))
-            sales = max(0, int(np.random.poisson(lam=base_stock * 0.18)))
-            adjustments = int(np.random.normal(0, base_stock * 0.01))
-            closing = opening + receipts - sales + adjustments
-            closing = max(0, closing)
-
-            unit_cost = round(np.random.uniform(10, 200), 2)
-            inventory_value = round(closing * unit_cost, 2)
-            carrying_cost = round(
-                inventory_value * np.random.uniform(0.005, 0.02), 2)
-            reorder_level = int(base_stock * np.random.uniform(0.2, 0.5))
-            safety_stock = int(base_stock * np.random.uniform(0.1, 0.3))
-            aging_days = int(np.random.normal(45, 15))
-            holding_days = max(1, int(np.random.normal(30, 10)))
-            stock_turnover = round(sales / ((opening + closing) / 2 + 1), 2)
-
-            rows.append({
-                "Date": d.date(),
-                "Product": product,
-                "Category": category,
-                "Country": country,
-                "State": region,
-                "CostCenter": cost_center,
-                "WarehouseID": warehouse_id,
-                "WarehouseType": warehouse_type,
-                "StorageCondition": storage_cond,
-                "InventoryStatus": inv_status,
-                "OpeningStock": opening,
-                "Receipts": receipts,
-                "Sales": sales,
-                "Adjustments": adjustments,
-                "ClosingStock": closing,
-                "UnitCost": unit_cost,
-                "InventoryValue": inventory_value,
-                "CarryingCost": carrying_cost,
-                "ReorderLevel": reorder_level,
-                "SafetyStock": safety_stock,
-                "AgingDays": aging_days,
-                "HoldingDays": holding_days,
-                "StockTurnoverRatio": stock_turnover,
-            })
-
-    df = pd.DataFrame(rows)
+    n_warehouses = max(1, int(state_config.get("total_warehouses", 5)))
+
+    P, W = len(products), n_warehouses
+
+    # Static warehouse attributes
+    wh_country = rng.choice(countries, size=W).astype(object)
+    wh_region = rand_regions(rng, wh_country, default_regions)
+    static = {
+        "wh_country": wh_country,
+        "wh_region": wh_region,
+        "wh_cost_center": np.array([f"{str(r)[:3].upper()}-{i + 1:02d}"
+                                    for i, r in enumerate(wh_region)], dtype=object),
+        "wh_id": np.array([f"WH-{i + 1:02d}" for i in range(W)], dtype=object),
+        "wh_type": categorical_sampler(state_config, "Inventory_Snapshots.WarehouseType").categorical(rng, W),
+        "wh_storage": categorical_sampler(state_config, "Inventory_Snapshots.StorageCondition").categorical(rng, W),
+    }
+
+    # Static product x warehouse attributes
+    static["category"] = categorical_sampler(state_config, "Inventory_Snapshots.Category").categorical(rng, P)
+    base_stock = rng.integers(100, 5000, size=(P, W))
+    static["base_stock"] = base_stock
+    static["base_cost"] = rng.uniform(10, 200, size=(P, W))
+    static["reorder_level"] = (
+        base_stock * rng.uniform(0.2, 0.5, size=(P, W))).astype(int)
+    static["safety_stock"] = (
+        base_stock * rng.uniform(0.1, 0.3, size=(P, W))).astype(int)
+    initial_opening = np.maximum(
+        base_stock + rng.normal(0, base_stock * 0.05).astype(int), 0)
+    return static, initial_opening
+
+
+def _inventory_chunk(state_config: TAppStateConfig, dates: pd.DatetimeIndex, static: dict, initial_opening: np.ndarray,
+                     rng: np.random.Generator):
+    """Snapshots for `dates`, rolled forward from `initial_opening`; returns (frame, closing stock of the last period)."""
+    products = state_config["products"]
+
+    # --- Dense grid: products (P) x warehouses (W) x periods (T) ---
+    P, W = initial_opening.shape
+    T = len(dates)
+    shape = (P, W, T)
+
+    # --- Demand drawn as whole matrices; stock is replenished up to base stock at the reorder level,
+    # so balances cycle around base stock instead of drifting; closing rolls into the next opening ---
+    base_stock = static["base_stock"]
+    base = base_stock[..., None]
+    sales = rng.poisson(lam=base * 0.18, size=shape)
+    adjustments = rng.normal(0, base * 0.01, size=shape).astype(int)
+
+    receipts, closing = replenish_stock(
+        initial_opening, sales, adjustments, static["reorder_level"], base_stock)
+    opening = np.concatenate(
+        [initial_opening[..., None], closing[..., :-1]], axis=-1)
+    # Stock cannot go negative: the shortfall comes out of fulfilled sales first, then adjustments
+    shortfall = closing - (opening + receipts - sales + adjustments)
+    sales = np.maximum(sales - shortfall, 0)
+    adjustments = closing - opening - receipts + sales
+
+    unit_cost = np.round(
+        static["base_cost"][..., None] * rng.uniform(0.95, 1.05, size=shape), 2)
+    inventory_value = np.round(closing * unit_cost, 2)
+    carrying_cost = np.round(
+        inventory_value * rng.uniform(0.005, 0.02, size=shape), 2)
+    aging_days = rng.normal(45, 15, size=shape).astype(int)
+    holding_days = np.maximum(
+        1, rng.normal(30, 10, size=shape).astype(int))
+    stock_turnover = np.round(sales / ((opening + closing) / 2 + 1), 2)
+    inv_status = categorical_sampler(
+        state_config, "Inventory_Snapshots.InventoryStatus").categorical(rng, P * W * T)
+
+    # --- Flatten product-major, then warehouse, then date ---
+    p_idx = np.repeat(np.arange(P), W * T)
+    w_idx = np.tile(np.repeat(np.arange(W), T), P)
+
+    df = pd.DataFrame({
+        "Date": np.tile(dates.to_numpy(), P * W),
+        "Product": np.asarray(products, dtype=object)[p_idx],
+        "Category": static["category"][p_idx],
+        "Country": static["wh_country"][w_idx],
+        "State": static["wh_region"][w_idx],
+        "CostCenter": static["wh_cost_center"][w_idx],
+        "WarehouseID": static["wh_id"][w_idx],
+        "WarehouseType": static["wh_type"][w_idx],
+        "StorageCondition": static["wh_storage"][w_idx],
+        "InventoryStatus": inv_status,
+        "OpeningStock": opening.ravel(),
+        "Receipts": receipts.ravel(),
+        "Sales": sales.ravel(),
+        "Adjustments": adjustments.ravel(),
+        "ClosingStock": closing.ravel(),
+        "UnitCost": unit_cost.ravel(),
+        "InventoryValue": inventory_value.ravel(),
+        "CarryingCost": carrying_cost.ravel(),
+        "ReorderLevel": np.repeat(static["reorder_level"].ravel(), T),
+        "SafetyStock": np.repeat(static["safety_stock"].ravel(), T),
+        "AgingDays": aging_days.ravel(),
+        "HoldingDays": holding_days.ravel(),
+        "StockTurnoverRatio": stock_turnover.ravel(),
+    })
 
     # inject outliers into InventoryValue for realism
     df = inject_outliers_vectorized(
-        df, ['InventoryValue'], freq=outlier_freq, mag=outlier_mag, seed=seed + 4
+        df, ['InventoryValue'], **outlier_options(state_config), rng=rng
     )
 
     # Add derived classification - Inventory Health
@@ -108,4 +153,35 @@ def generate_inventory_snapshots(state_config: TAppStateConfig, faker: Faker = F
         default="Unknown"
     )
 
+    return df, closing[..., -1]
+
+
+def generate_inventory_snapshots(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "Inventory_Snapshots")
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
+    if not state_config["products"] or len(dates) == 0:
+        return pd.DataFrame()
+
+    static, initial_opening = _inventory_setup(state_config, rng)
+    df, _ = _inventory_chunk(state_config, dates, static, initial_opening, rng)
     return df
+
+
+def iter_inventory_snapshots(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {},
+                             rng: np.random.Generator | None = None, periods_per_chunk: int = DEF_PERIODS_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """
+    Streams the snapshots `periods_per_chunk` periods at a time; each chunk opens
+    with the closing stock of the previous one, so the roll-forward is unbroken.
+    """
+    rng = rng if rng is not None else dataset_rng(state_config, "Inventory_Snapshots")
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
+    if not state_config["products"] or len(dates) == 0:
+        return
+
+    static, opening = _inventory_setup(state_config, rng)
+    for chunk_rng, chunk_dates in iter_date_chunks(rng, dates, periods_per_chunk):
+        df, opening = _inventory_chunk(
+            state_config, chunk_dates, static, opening, chunk_rng)
+        yield df
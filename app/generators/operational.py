@@ -1,48 +1,70 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict, Iterator
 import pandas as pd
 import numpy as np
 
-from app.helpers.general import date_range
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.general import date_range, iter_date_chunks, rand_regions
+from app.helpers.rng import dataset_rng
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_operational_dataset(state_config: TAppStateConfig, faker: Faker, generated: Dict[str, pd.DataFrame] = {}):
-    industry = state_config["industry"]
-    start_date = state_config["start_date"]
-    end_date = state_config["end_date"]
-    freq = state_config["frequency"]
-    dates = date_range(start_date, end_date, freq)
-    countries = state_config["countries"]
-    default_regions = state_config["country_config"]
-    industry_config = state_config["industry_kpi"].get(industry)
-    rows = []
+
+def _operational_template(state_config: TAppStateConfig):
+    industry_config = state_config["industry_kpi"].get(state_config["industry"])
     if industry_config is None:
-        return pd.DataFrame()
-    kpi_template = industry_config.get("operational")
+        return None
+    return industry_config.get("operational")
+
+
+def _operational_chunk(state_config: TAppStateConfig, dates: pd.DatetimeIndex, kpi_template, rng: np.random.Generator) -> pd.DataFrame:
+    """One KPI row per period, every KPI drawn as a whole column."""
+    n = len(dates)
+    country = rng.choice(state_config["countries"], size=n).astype(object)
+    df = pd.DataFrame({
+        "Industry": state_config["industry"],
+        "Date": dates.to_numpy(),
+        "Country": country,
+        "State": rand_regions(rng, country, state_config["country_config"]),
+    })
+    for cfg in kpi_template:
+        cname = cfg.get("name", "Unknown")
+        ctype = cfg.get("type", "range")
+        if ctype == "choice":
+            options = cfg.get("options", ["unknown"])
+            df[cname] = pd.Categorical(rng.choice(options, size=n),
+                                       categories=list(dict.fromkeys(options)))
+        elif ctype == "range":
+            if cfg.get("float", True):
+                df[cname] = rng.uniform(
+                    cfg.get("min", 0), cfg.get("max", 1), size=n)
+            else:
+                df[cname] = rng.integers(
+                    int(cfg.get("min", 0)), int(cfg.get("max", 100)), size=n)
+        else:
+            df[cname] = np.nan
+    return df
+
+
+def generate_operational_dataset(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "Operational_Dataset")
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
+    kpi_template = _operational_template(state_config)
     if kpi_template is None:
         return pd.DataFrame()
-    for d in dates:
-        country = np.random.choice(countries)
-        region = np.random.choice(
-            default_regions.get(country, ["Unknown"]))
-        row = {"Industry": industry, "Date": d.date(
-        ), "Country": country, "State": region}
-        for cfg in kpi_template:
-            cname = cfg.get("name", "Unknown")
-            ctype = cfg.get("type", "range")
-            if cfg.get("type") is None:
-                row[cname] = np.nan
-            if ctype == "choice":
-                row[cname] = np.random.choice(
-                    cfg.get("options", ["unknown"]))
-            elif ctype == "range":
-                allow_float = cfg.get("float", True)
-                row[cname] = float(np.random.uniform(
-                    cfg.get("min", 0), cfg.get("max", 1))) if allow_float else int(np.random.randint(
-                        int(cfg.get("min", 0)), int(cfg.get("max", 100))
-                    ))
-            else:
-                row[cname] = np.nan
-        rows.append(row)
-    return pd.DataFrame(rows)
+    return _operational_chunk(state_config, dates, kpi_template, rng)
+
+
+def iter_operational_dataset(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {},
+                             rng: np.random.Generator | None = None, periods_per_chunk: int = DEF_PERIODS_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """Streams the KPI rows `periods_per_chunk` periods at a time."""
+    rng = rng if rng is not None else dataset_rng(state_config, "Operational_Dataset")
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
+    kpi_template = _operational_template(state_config)
+    if kpi_template is None:
+        return
+    for chunk_rng, chunk_dates in iter_date_chunks(rng, dates, periods_per_chunk):
+        yield _operational_chunk(state_config, chunk_dates, kpi_template, chunk_rng)
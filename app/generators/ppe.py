@@ -1,102 +1,220 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict
 import pandas as pd
 import numpy as np
-import uuid
 
 from app.helpers.config import DEFAULT_START_DATE, DEFAULT_END_DATE
-from app.mods import inject_outliers_vectorized
+from app.helpers.distributions import categorical_sampler
+from app.helpers.faker_pool import get_faker_pool, sample_pool_indices
+from app.helpers.general import rand_dates_between, rand_numeric_ids, rand_regions
+from app.helpers.rng import dataset_rng
+from app.mods import inject_outliers_vectorized, outlier_options
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_ppe_register(state_config: TAppStateConfig, faker: Faker = Faker(), generated: Dict[str, pd.DataFrame] = {}):
+# Assets per block when broadcasting the assets x months schedule (bounds peak memory)
+SCHEDULE_CHUNK_ASSETS = 20_000
+
+
+def accumulated_depreciation(cost, salvage, life_years, method, age_months, usage_share=None):
+    """
+    Accumulated depreciation after `age_months` for SLM, WDV and usage-based methods.
+    All arguments broadcast, so (n, 1) asset columns against an (n, M) age matrix yield the full schedule.
+    `usage_share` is the cumulative share of lifetime usage consumed; when omitted, usage is assumed
+    to accrue evenly over the useful life (its expected value).
+    """
+    salvage = np.minimum(salvage, cost)
+    depreciable = cost - salvage
+    life_share = np.minimum(age_months / (life_years * 12), 1)
+    slm = depreciable * life_share
+    residual_ratio = np.divide(salvage, cost, out=np.ones(
+        np.broadcast(salvage, cost).shape), where=cost > 0)
+    wdv_rate = 1 - residual_ratio ** (1 / life_years)
+    wdv = cost - np.maximum(cost * (1 - wdv_rate) ** (age_months / 12), salvage)
+    usage = depreciable * (life_share if usage_share is None else np.minimum(usage_share, 1))
+    return np.select([method == "SLM", method == "WDV"], [slm, wdv], default=usage)
+
+
+def _month_index(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[M]").astype(np.int64)
+
+
+def _asset_basis(state_config: TAppStateConfig, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Acquisition date, cost, useful life, method and salvage value of every asset, drawn first from
+    the register's stream. The schedule redraws them from the same stream, so it depreciates the
+    clean cost even after the register's outliers have distorted its Cost column.
+    """
+    start_date = pd.to_datetime(
+        state_config["start_date"] or DEFAULT_START_DATE)
+    end_date = pd.to_datetime(state_config["end_date"] or DEFAULT_END_DATE)
+    n = state_config["total_assets"]
+    acq_date = rand_dates_between(rng, start_date, end_date, n)
+    cost = rng.integers(50000, 5000000, size=n).astype(float)
+    useful_life = categorical_sampler(state_config, "PPE_Register.UsefulLifeYears").sample(rng, n)
+    method = categorical_sampler(state_config, "PPE_Register.DepreciationMethod").categorical(rng, n)
+    salvage_value = np.round(cost * rng.uniform(0.01, 0.15, size=n), 2)
+    return {"acq_date": acq_date, "cost": cost, "useful_life": useful_life, "method": method,
+            "salvage_value": salvage_value}
+
+
+def generate_ppe_register(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "PPE_Register")
     seed = state_config["seed"]
-    np.random.seed(seed)
-    start_date = pd.to_datetime(state_config["start_date"])
-    end_date = pd.to_datetime(state_config["end_date"])
-    total_assets = state_config["total_assets"]
+    start_date = pd.to_datetime(
+        state_config["start_date"] or DEFAULT_START_DATE)
+    end_date = pd.to_datetime(state_config["end_date"] or DEFAULT_END_DATE)
+    n = state_config["total_assets"]
     countries = state_config["countries"]
     default_regions = state_config["country_config"]
-    outlier_freq = state_config["outlier_frequency"]
-    outlier_mag = state_config["outlier_magnitude"]
-
-    asset_types = ["Building", "Plant & Machinery", "Office Equipment",
-                   "Furniture", "Vehicles", "Computers", "Leasehold Improvements"]
-    ownership_types = ["Owned", "Leased",
-                       "Joint Venture Asset", "Under Construction"]
-    condition_status = ["Good", "Needs Maintenance", "Damaged", "Disposed"]
-    depreciation_methods = ["SLM", "WDV", "Usage-based"]
-    capex_sources = ["Internal Funds", "Bank Loan",
-                     "Parent Funding", "Lease Liability"]
-    departments = ["Finance", "Ops", "Sales", "R&D", "HR", "IT"]
-
-    rows = []
-    for _ in range(total_assets):
-        acq_date = faker.date_between(start_date=start_date, end_date=end_date) if start_date and end_date else faker.date_between(
-            start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE)
-        cost = float(round(np.random.randint(50000, 5000000), 2))
-        useful_life = np.random.choice([3, 5, 7, 10, 15, 20])
-        years_used = max(0, (pd.to_datetime(end_date) -
-                         pd.to_datetime(acq_date)).days / 365.25)
-        acc_dep = min(cost, cost / useful_life * years_used)
-        carrying_val = max(cost - acc_dep, 0)
-
-        country = np.random.choice(countries)
-        region = np.random.choice(default_regions.get(country, ["Unknown"]))
-        department = np.random.choice(departments)
-
-        # 🔹 Region-based cost center
-        cc_number = np.random.randint(1, 11)  # 1 to 10
-        cost_center = f"{region.replace(' ', '')[:10]}-CC-{cc_number:02d}"
-
-        # Extended numerical features
-        salvage_value = round(cost * np.random.uniform(0.01, 0.15), 2)
-        insurance_value = round(cost * np.random.uniform(0.8, 1.2), 2)
-        reval_increase = round(np.random.uniform(
-            0, 0.3) * cost if np.random.rand() < 0.2 else 0, 2)
-        impairment_loss = round(np.random.uniform(
-            0, 0.2) * carrying_val if np.random.rand() < 0.1 else 0, 2)
-        repair_cost = round(np.random.uniform(0, 0.05) *
-                            cost if np.random.rand() < 0.3 else 0, 2)
-        maintenance_cost_ytd = round(np.random.uniform(0, 0.03) * cost, 2)
-
-        dep_rate = round(acc_dep / cost if cost else 0, 4)
-        book_to_insurance_ratio = round(
-            carrying_val / insurance_value if insurance_value else 0, 4)
-
-        rows.append({
-            "AssetID": f"ASSET_{str(uuid.uuid4().int)[:8]}",
-            "AssetDesc": faker.word().capitalize(),
-            "AssetType": np.random.choice(asset_types),
-            "Department": department,
-            "CostCenter": cost_center,
-            "OwnershipType": np.random.choice(ownership_types),
-            "ConditionStatus": np.random.choice(condition_status),
-            "DepreciationMethod": np.random.choice(depreciation_methods),
-            "CapexSource": np.random.choice(capex_sources),
-            "Country": country,
-            "State": region,
-
-            "AcquisitionDate": acq_date,
-            "UsefulLifeYears": useful_life,
-            "YearsUsed": round(years_used, 2),
-            "Cost": cost,
-            "AccumulatedDepreciation": round(acc_dep, 2),
-            "CarryingValue": round(carrying_val, 2),
-            "SalvageValue": salvage_value,
-            "InsuranceValue": insurance_value,
-            "RevaluationIncrease": reval_increase,
-            "ImpairmentLoss": impairment_loss,
-            "RepairCost": repair_cost,
-            "MaintenanceCostYTD": maintenance_cost_ytd,
-            "DepreciationRate": dep_rate,
-            "BookToInsuranceRatio": book_to_insurance_ratio,
-            "IsImpaired": int(impairment_loss > 0),
-            "IsRevalued": int(reval_increase > 0),
-            "IsDisposed": int(np.random.rand() < 0.05),
-        })
-
-    df = pd.DataFrame(rows)
+
+    if n <= 0:
+        return pd.DataFrame()
+
+    def draw(column):
+        return categorical_sampler(state_config, f"PPE_Register.{column}").categorical(rng, n)
+
+    basis = _asset_basis(state_config, rng)
+    acq_date, cost, useful_life = basis["acq_date"], basis["cost"], basis["useful_life"]
+    method, salvage_value = basis["method"], basis["salvage_value"]
+    years_used = np.maximum(
+        0, (np.datetime64(end_date.date(), "D") - acq_date).astype(np.int64) / 365.25)
+
+    # Ties to the closing line of the depreciation schedule (expected usage for usage-based assets)
+    age_months = _month_index(end_date) - _month_index(acq_date) + 1
+    acc_dep = accumulated_depreciation(
+        cost, salvage_value, useful_life, method, age_months)
+    carrying_val = np.maximum(cost - acc_dep, 0)
+
+    country = rng.choice(countries, size=n).astype(object)
+    region = rand_regions(rng, country, default_regions)
+    department = draw("Department")
+
+    # 🔹 Region-based cost center
+    cc_number = pd.Series(rng.integers(1, 11, size=n))  # 1 to 10
+    cost_center = (pd.Series(region).str.replace(" ", "").str[:10] + "-CC-" +
+                   cc_number.astype(str).str.zfill(2))
+
+    # Extended numerical features
+    insurance_value = np.round(cost * rng.uniform(0.8, 1.2, size=n), 2)
+    reval_increase = np.round(np.where(rng.random(n) < 0.2, rng.uniform(
+        0, 0.3, size=n) * cost, 0), 2)
+    impairment_loss = np.round(np.where(rng.random(n) < 0.1, rng.uniform(
+        0, 0.2, size=n) * carrying_val, 0), 2)
+    repair_cost = np.round(np.where(rng.random(n) < 0.3, rng.uniform(
+        0, 0.05, size=n) * cost, 0), 2)
+    maintenance_cost_ytd = np.round(
+        rng.uniform(0, 0.03, size=n) * cost, 2)
+
+    dep_rate = np.round(np.divide(acc_dep, cost, out=np.zeros(
+        n), where=cost != 0), 4)
+    book_to_insurance_ratio = np.round(np.divide(
+        carrying_val, insurance_value, out=np.zeros(n), where=insurance_value != 0), 4)
+
+    pool = get_faker_pool(state_config["faker_locale"], seed)
+    asset_desc = pd.Series(
+        pool["word"][sample_pool_indices(rng, pool, "word", n)]).str.capitalize()
+
+    df = pd.DataFrame({
+        "AssetID": rand_numeric_ids(rng, "ASSET", n),
+        "AssetDesc": asset_desc,
+        "AssetType": draw("AssetType"),
+        "Department": department,
+        "CostCenter": cost_center,
+        "OwnershipType": draw("OwnershipType"),
+        "ConditionStatus": draw("ConditionStatus"),
+        "DepreciationMethod": method,
+        "CapexSource": draw("CapexSource"),
+        "Country": country,
+        "State": region,
+
+        "AcquisitionDate": acq_date.astype("datetime64[ns]"),
+        "UsefulLifeYears": useful_life,
+        "YearsUsed": np.round(years_used, 2),
+        "Cost": cost,
+        "AccumulatedDepreciation": np.round(acc_dep, 2),
+        "CarryingValue": np.round(carrying_val, 2),
+        "SalvageValue": salvage_value,
+        "InsuranceValue": insurance_value,
+        "RevaluationIncrease": reval_increase,
+        "ImpairmentLoss": impairment_loss,
+        "RepairCost": repair_cost,
+        "MaintenanceCostYTD": maintenance_cost_ytd,
+        "DepreciationRate": dep_rate,
+        "BookToInsuranceRatio": book_to_insurance_ratio,
+        "IsImpaired": (impairment_loss > 0).astype(int),
+        "IsRevalued": (reval_increase > 0).astype(int),
+        "IsDisposed": (rng.random(n) < 0.05).astype(int),
+    })
+
     df = inject_outliers_vectorized(
-        df, ['Cost', 'CarryingValue', 'AccumulatedDepreciation'], freq=outlier_freq, mag=outlier_mag, seed=seed + 2)
+        df, ['Cost', 'CarryingValue', 'AccumulatedDepreciation'], **outlier_options(state_config), rng=rng)
     return df
+
+
+def generate_ppe_depreciation_schedule(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    """
+    Per-asset, per-month depreciation schedule for the PPE register, from each asset's
+    acquisition month to the end of the reporting window. Built by broadcasting assets x months.
+    Cost, salvage, life, method and acquisition date come from the register's clean basis rather
+    than its (possibly outlier-injected) columns.
+    """
+    rng = rng if rng is not None else dataset_rng(state_config, "PPE_Depreciation_Schedule")
+    register_df = generated.get("PPE_Register", pd.DataFrame())
+    if register_df.empty:
+        return pd.DataFrame()
+
+    start_date = pd.to_datetime(
+        state_config["start_date"] or DEFAULT_START_DATE)
+    end_date = pd.to_datetime(state_config["end_date"] or DEFAULT_END_DATE)
+    periods = pd.period_range(start_date, end_date, freq="M")
+    period_ends = periods.to_timestamp(how="end").normalize().to_numpy()
+    month_idx = _month_index(period_ends)
+    basis = _asset_basis(state_config, dataset_rng(state_config, "PPE_Register"))
+
+    chunks = []
+    for lo in range(0, len(register_df), SCHEDULE_CHUNK_ASSETS):
+        reg = register_df.iloc[lo:lo + SCHEDULE_CHUNK_ASSETS]
+        block = slice(lo, lo + SCHEDULE_CHUNK_ASSETS)
+        cost = basis["cost"][block, None]
+        salvage = basis["salvage_value"][block, None]
+        life = np.asarray(basis["useful_life"][block], dtype=float)[:, None]
+        method = np.asarray(basis["method"][block], dtype=object)[:, None]
+
+        # Age in months at each period end; depreciation starts in the acquisition month
+        ages = month_idx[None, :] - \
+            _month_index(basis["acq_date"][block])[:, None] + 1
+        active = ages >= 1
+        ages = np.maximum(ages, 0)
+
+        # Usage-based assets consume a gamma-distributed share of lifetime usage each month
+        monthly_usage = rng.gamma(
+            4.0, 1 / (4.0 * life * 12), size=ages.shape) * active
+        usage_share = np.cumsum(monthly_usage, axis=1)
+
+        acc = accumulated_depreciation(
+            cost, salvage, life, method, ages, usage_share)
+        prev_acc = accumulated_depreciation(
+            cost, salvage, life, method, np.maximum(ages - 1, 0), usage_share - monthly_usage)
+
+        rows, cols = np.nonzero(active)
+        chunks.append(pd.DataFrame({
+            "AssetID": reg["AssetID"].to_numpy()[rows],
+            "PeriodEnd": period_ends[cols],
+            "AssetType": reg["AssetType"].to_numpy()[rows],
+            "Department": reg["Department"].to_numpy()[rows],
+            "CostCenter": reg["CostCenter"].to_numpy()[rows],
+            "DepreciationMethod": method[rows, 0],
+            "UsefulLifeYears": reg["UsefulLifeYears"].to_numpy()[rows],
+            "AgeMonths": ages[rows, cols],
+            "Cost": cost[rows, 0],
+            "OpeningBookValue": np.round(cost[rows, 0] - prev_acc[rows, cols], 2),
+            "UsageShare": np.where(method[rows, 0] == "Usage-based",
+                                   np.round(monthly_usage[rows, cols], 5), np.nan),
+            "DepreciationCharge": np.round(acc[rows, cols] - prev_acc[rows, cols], 2),
+            "AccumulatedDepreciation": np.round(acc[rows, cols], 2),
+            "ClosingBookValue": np.round(cost[rows, 0] - acc[rows, cols], 2),
+        }))
+
+    return pd.concat(chunks, ignore_index=True)
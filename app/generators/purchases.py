@@ -1,100 +1,120 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict, Iterator
 import pandas as pd
 import numpy as np
-import uuid
 
-from app.helpers.general import date_range
-from app.mods import inject_outliers_vectorized
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.distributions import categorical_sampler
+from app.helpers.general import date_range, iter_date_chunks
+from app.mods import inject_outliers_vectorized, outlier_options
+from app.helpers.rng import dataset_rng
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_purchases(state_config: TAppStateConfig, faker: Faker = Faker(), generated: Dict[str, pd.DataFrame] = {}):
-    seed = state_config["seed"]
-    np.random.seed(seed)
-    industry = state_config["industry"]
-    products = state_config["products"]
-    start_date = state_config["start_date"]
-    end_date = state_config["end_date"]
-    freq = state_config["frequency"]
-    outlier_freq = state_config["outlier_frequency"]
-    outlier_mag = state_config["outlier_magnitude"]
-    dates = date_range(start_date, end_date, freq)
+
+def _purchases_setup(state_config: TAppStateConfig, generated: Dict[str, pd.DataFrame], rng: np.random.Generator):
+    """Purchase periods and the number of vendors billed per period, or None when there is nothing to buy."""
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
     vendors_df = generated.get("Vendor_Master", pd.DataFrame())
-    purchases_per_period = np.random.randint(10, 20)
-    rows = []
+    purchases_per_period = rng.integers(10, 20)
 
     if vendors_df.empty:
-        return pd.DataFrame()
+        return None
+    return dates, vendors_df, min(len(vendors_df), purchases_per_period)
+
+
+def _purchases_chunk(state_config: TAppStateConfig, dates: pd.DatetimeIndex, vendors_df: pd.DataFrame, n_sample: int,
+                     rng: np.random.Generator) -> pd.DataFrame:
+    industry = state_config["industry"]
+    products = state_config["products"]
+
+    # --- Purchase grid: periods x vendors, a fresh vendor sample every period ---
+    n = len(dates) * n_sample
+    vendor_pos = np.concatenate([rng.choice(len(vendors_df), size=n_sample, replace=False)
+                                 for _ in range(len(dates))]) if n else np.empty(0, dtype=np.int64)
+    period_dates = np.repeat(dates.to_numpy(), n_sample)
+
+    vendor_choices = rng.choice(products, size=n)
+    base_amounts = rng.integers(2000, 250000, size=n)
+
+    # Categorical enhancements, drawn as codes straight into categoricals
+    def draw(column):
+        return categorical_sampler(state_config, f"Purchases.{column}").categorical(rng, n)
+    purchase_types = draw("PurchaseType")
+    procurement_channels = draw("ProcurementChannel")
+    priority_levels = draw("PriorityLevel")
+    payment_modes = draw("PaymentMode")
+    contract_terms = draw("ContractTerm")
+
+    # Numerical enhancements
+    unit_count = rng.integers(1, 100, size=n)
+    unit_price = base_amounts / unit_count
+    discounts = np.round(rng.uniform(0, 0.25, size=n), 3)
+    tax_rates = categorical_sampler(state_config, "Purchases.TaxRate").sample(rng, n)
+    freight_charges = rng.integers(200, 5000, size=n)
+    service_fees = rng.integers(100, 2000, size=n)
+    cost_amounts = (base_amounts * (1 - discounts) *
+                    (1 + tax_rates)) + freight_charges + service_fees
+    margin_pct = np.round(rng.normal(0.15, 0.05, n), 3).clip(0.01, 0.3)
+    margin_amount = cost_amounts * margin_pct
+    invoice_weight = np.round(rng.uniform(0.5, 100.0, n), 2)
+    purchase_ids = rng.integers(
+        10**11, 10**12, size=n, dtype=np.int64).astype(str)
+    invoice_dates = period_dates + \
+        rng.integers(0, 5, size=n) * np.timedelta64(1, "D")
+
+    vendors = vendors_df[["VendorID", "VendorType",
+                          "Country", "State"]].to_numpy()[vendor_pos]
+
+    df = pd.DataFrame({
+        "Industry": industry,
+        "Product": vendor_choices,
+        "Date": invoice_dates,
+        "PurchaseInvoiceID": purchase_ids,
+        "VendorID": vendors[:, 0],
+        "VendorType": vendors[:, 1],
+        "Country": vendors[:, 2],
+        "State": vendors[:, 3],
+        "PurchaseType": purchase_types,
+        "ProcurementChannel": procurement_channels,
+        "PriorityLevel": priority_levels,
+        "PaymentMode": payment_modes,
+        "ContractTerm": contract_terms,
+        "UnitCount": unit_count,
+        "UnitPrice": np.round(unit_price, 2),
+        "DiscountRate": discounts,
+        "TaxRate": tax_rates,
+        "FreightCharge": freight_charges.astype(float),
+        "ServiceFee": service_fees.astype(float),
+        "CostAmount": np.round(cost_amounts, 2),
+        "MarginAmount": np.round(margin_amount, 2),
+        "MarginPct": margin_pct,
+        "InvoiceWeight": invoice_weight,
+        "PurchaseAmount": np.round(cost_amounts + margin_amount, 2),
+    })
 
-    for d in dates:
-        period_vendors = vendors_df.sample(
-            n=min(len(vendors_df), purchases_per_period), random_state=seed)
-
-        vendor_choices = np.random.choice(products, size=len(period_vendors))
-        base_amounts = np.random.randint(
-            2000, 250000, size=len(period_vendors))
-
-        # Categorical enhancements
-        purchase_types = np.random.choice(
-            ["Standard", "Return", "CreditNote", "Adjustment"], size=len(period_vendors), p=[0.7, 0.1, 0.1, 0.1])
-        procurement_channels = np.random.choice(
-            ["Direct", "Distributor", "Online", "Auction"], size=len(period_vendors), p=[0.5, 0.3, 0.15, 0.05])
-        priority_levels = np.random.choice(
-            ["High", "Medium", "Low"], size=len(period_vendors), p=[0.2, 0.6, 0.2])
-        payment_modes = np.random.choice(
-            ["BankTransfer", "Cheque", "CreditCard", "UPI", "Cash"], size=len(period_vendors), p=[0.5, 0.2, 0.15, 0.1, 0.05])
-        contract_terms = np.random.choice(
-            ["One-Time", "Annual", "Quarterly", "Project-Based"], size=len(period_vendors), p=[0.5, 0.2, 0.2, 0.1])
-
-        # Numerical enhancements
-        unit_count = np.random.randint(1, 100, size=len(period_vendors))
-        unit_price = base_amounts / unit_count
-        discounts = np.round(np.random.uniform(
-            0, 0.25, size=len(period_vendors)), 3)
-        tax_rates = np.random.choice(
-            [0.05, 0.12, 0.18], size=len(period_vendors), p=[0.2, 0.3, 0.5])
-        freight_charges = np.random.randint(
-            200, 5000, size=len(period_vendors))
-        service_fees = np.random.randint(100, 2000, size=len(period_vendors))
-        cost_amounts = (base_amounts * (1 - discounts) *
-                        (1 + tax_rates)) + freight_charges + service_fees
-        margin_pct = np.round(np.random.normal(
-            0.15, 0.05, len(period_vendors)), 3).clip(0.01, 0.3)
-        margin_amount = cost_amounts * margin_pct
-        invoice_weight = np.round(np.random.uniform(
-            0.5, 100.0, len(period_vendors)), 2)
-
-        for i, vend in enumerate(period_vendors.itertuples(index=False)):
-            invoice_date = d + pd.Timedelta(days=int(np.random.randint(0, 5)))
-            rows.append({
-                "Industry": industry,
-                "Product": vendor_choices[i],
-                "Date": invoice_date.date(),
-                "PurchaseInvoiceID": str(uuid.uuid4().int)[:12],
-                "VendorID": vend.VendorID,
-                "VendorType": vend.VendorType,
-                "Country": vend.Country,
-                "State": vend.State,
-                "PurchaseType": purchase_types[i],
-                "ProcurementChannel": procurement_channels[i],
-                "PriorityLevel": priority_levels[i],
-                "PaymentMode": payment_modes[i],
-                "ContractTerm": contract_terms[i],
-                "UnitCount": unit_count[i],
-                "UnitPrice": float(round(unit_price[i], 2)),
-                "DiscountRate": discounts[i],
-                "TaxRate": tax_rates[i],
-                "FreightCharge": float(freight_charges[i]),
-                "ServiceFee": float(service_fees[i]),
-                "CostAmount": float(round(cost_amounts[i], 2)),
-                "MarginAmount": float(round(margin_amount[i], 2)),
-                "MarginPct": margin_pct[i],
-                "InvoiceWeight": invoice_weight[i],
-                "PurchaseAmount": float(round(cost_amounts[i] + margin_amount[i], 2))
-            })
-
-    df = pd.DataFrame(rows)
     df = inject_outliers_vectorized(
-        df, ['PurchaseAmount'], freq=outlier_freq, mag=outlier_mag, seed=seed+7)
+        df, ['PurchaseAmount'], **outlier_options(state_config), rng=rng)
     return df
+
+
+def generate_purchases(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "Purchases")
+    setup = _purchases_setup(state_config, generated, rng)
+    if setup is None:
+        return pd.DataFrame()
+    return _purchases_chunk(state_config, *setup, rng)
+
+
+def iter_purchases(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {},
+                   rng: np.random.Generator | None = None, periods_per_chunk: int = DEF_PERIODS_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """Streams the purchases `periods_per_chunk` periods at a time."""
+    rng = rng if rng is not None else dataset_rng(state_config, "Purchases")
+    setup = _purchases_setup(state_config, generated, rng)
+    if setup is None:
+        return
+    dates, vendors_df, n_sample = setup
+    for chunk_rng, chunk_dates in iter_date_chunks(rng, dates, periods_per_chunk):
+        yield _purchases_chunk(state_config, chunk_dates, vendors_df, n_sample, chunk_rng)
@@ -1,148 +1,187 @@
-from typing import Dict
-from faker import Faker
+from typing import TYPE_CHECKING, Dict, Iterator
 import pandas as pd
 import numpy as np
-import uuid
 
-from app.mods import inject_outliers_vectorized
-from app.helpers.general import date_range
+from app.mods import inject_outliers_vectorized, outlier_options
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.distributions import categorical_sampler
+from app.helpers.general import date_range, iter_date_chunks
+from app.helpers.rng import dataset_rng
+from app.helpers.sampling import WeightedSampler
 from app.types import TAppStateConfig
 
+if TYPE_CHECKING:
+    from faker import Faker
 
-def generate_revenue_invoices(state_config: TAppStateConfig, faker: Faker = Faker(), generated: Dict[str, pd.DataFrame] = {}):
-    seed = state_config["seed"]
-    np.random.seed(seed)
-    industry = state_config["industry"]
+
+# Customer activity: each customer's share of invoices is a Pareto draw (shape ~1.16 gives
+# the classic 80/20 concentration) scaled by how much its segment typically buys
+ACTIVITY_PARETO_SHAPE = 1.16
+SEGMENT_ACTIVITY = {"Enterprise": 3.0, "Government": 2.0,
+                    "SME": 1.0, "Startup": 0.7, "NGO": 0.5}
+CUSTOMER_COLUMNS = ["CustomerID", "CustomerSegment", "Country", "State"]
+
+
+def customer_activity(rng: np.random.Generator, segments: pd.Series) -> np.ndarray:
+    """Purchase intensity of every customer (relative weights, one per row of the master)."""
+    codes, names = pd.factorize(segments)
+    segment_weight = np.array([SEGMENT_ACTIVITY.get(s, 1.0) for s in names] + [1.0])[codes]  # -1 (missing) -> 1.0
+    return (1 + rng.pareto(ACTIVITY_PARETO_SHAPE, size=len(segments))) * segment_weight
+
+
+def _revenue_setup(state_config: TAppStateConfig, generated: Dict[str, pd.DataFrame], rng: np.random.Generator):
+    """
+    Billing periods, invoices per product and period, the customer columns and a sampler over
+    customers weighted by their activity, or None when there is nothing to bill.
+    """
     products = state_config["products"]
-    start_date = state_config["start_date"]
-    end_date = state_config["end_date"]
-    freq = state_config["frequency"]
-    dates = date_range(start_date, end_date, freq)
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
     customers_df = generated.get("Customer_Master", pd.DataFrame())
-    outlier_freq = state_config["outlier_frequency"]
-    outlier_mag = state_config["outlier_magnitude"]
-    invoice_per_product_per_period = np.random.randint(10, 20)
-    rows = []
+    invoice_per_product_per_period = int(rng.integers(10, 20))
 
-    if customers_df.empty:
-        return pd.DataFrame()
+    if customers_df.empty or not products or len(dates) == 0:
+        return None
+
+    customers = customers_df[CUSTOMER_COLUMNS]
+    sampler = WeightedSampler(customer_activity(rng, customers_df["CustomerSegment"]))
+    return dates, invoice_per_product_per_period, customers, sampler
+
+
+def _revenue_chunk(state_config: TAppStateConfig, dates: pd.DatetimeIndex, n_invoices: int, customers: pd.DataFrame,
+                   sampler: WeightedSampler, rng: np.random.Generator) -> pd.DataFrame:
+    industry = state_config["industry"]
+    products = state_config["products"]
+
+    # --- Invoice grid: products x periods x invoices, flattened product-major ---
+    n_periods = len(dates)
+    n = len(products) * n_periods * n_invoices
+
+    product_col = np.repeat(np.asarray(products, dtype=object),
+                            n_periods * n_invoices)
+    period_dates = np.tile(np.repeat(dates.to_numpy(), n_invoices), len(products))
+    # Every invoice's customer at once, by activity
+    cust_pos = sampler.draw(rng, n)
+
+    base_amounts = rng.integers(5000, 200000, size=n)
+
+    # Synthetic categorical dimensions, drawn as codes straight into categoricals
+    def draw(column):
+        return categorical_sampler(state_config, f"Revenue_Invoices.{column}").categorical(rng, n)
+    sales_channels = draw("SalesChannel")
+    contract_types = draw("ContractType")
+    payment_modes = draw("PaymentMode")
+    salesperson_tiers = draw("SalespersonTier")
+    invoice_types = draw("InvoiceType")
+    promotion_applied = draw("PromotionApplied")
+    customer_tiers = draw("CustomerTier")
+    market_segments = draw("MarketSegment")
+
+    # Synthetic numerical enrichments
+    unit_count = rng.integers(1, 50, size=n)
+    unit_price = base_amounts / unit_count
+    discounts = np.round(rng.uniform(0, 0.25, size=n), 3)
+    tax_rates = categorical_sampler(state_config, "Revenue_Invoices.TaxRate").sample(rng, n)
+    freight_charges = rng.integers(200, 5000, size=n)
+    service_fees = rng.integers(100, 2000, size=n)
+    profit_margin_pct = np.round(rng.normal(
+        0.25, 0.08, n), 3).clip(0.05, 0.6)
+    customer_ltv = rng.integers(10000, 500000, size=n)
+    invoice_weight = np.round(rng.uniform(0.5, 50.0, n), 2)
+
+    net_amounts = base_amounts * (1 - discounts)
+    taxed_amounts = net_amounts * (1 + tax_rates)
+    total_amounts = taxed_amounts + freight_charges + service_fees
+    costs = total_amounts * (1 - profit_margin_pct)
+    margin_amount = total_amounts - costs
+    total_discount_amount = base_amounts * discounts
+    tax_amount = net_amounts * tax_rates
+
+    # --- Dates, credit terms & payment behaviour ---
+    day = np.timedelta64(1, "D")
+    invoice_dates = period_dates + rng.integers(0, 5, size=n) * day
+    credit_days = categorical_sampler(state_config, "Revenue_Invoices.CreditDays").sample(rng, n)
+    due_dates = invoice_dates + credit_days * day
+    pay_flag = draw("PaymentStatus")
+    is_paid = pay_flag == "Paid"
+    is_partial = pay_flag == "PartiallyPaid"
+
+    paid_delay = rng.poisson(lam=5, size=n)
+    partial_delay = rng.integers(1, 60, size=n)
+    partial_share = rng.uniform(0.3, 0.9, size=n)
+    payment_dates = np.where(
+        is_paid, due_dates + paid_delay * day,
+        np.where(is_partial, due_dates + partial_delay * day, np.datetime64("NaT")))
+    paid_amount = np.where(
+        is_paid, total_amounts,
+        np.where(is_partial, total_amounts * partial_share, 0.0))
+
+    invoice_ids = rng.integers(
+        10**11, 10**12, size=n, dtype=np.int64).astype(str)
+
+    # Only the billed rows of the master are materialized
+    customers = {col: customers[col].take(cust_pos).to_numpy() for col in CUSTOMER_COLUMNS}
+
+    df = pd.DataFrame({
+        "Industry": industry,
+        "Product": product_col,
+        "Date": invoice_dates,
+        "InvoiceID": invoice_ids,
+        "CustomerID": customers["CustomerID"],
+        "CustomerSegment": customers["CustomerSegment"],
+        "Country": customers["Country"],
+        "State": customers["State"],
+        "SalesChannel": sales_channels,
+        "ContractType": contract_types,
+        "PaymentMode": payment_modes,
+        "SalespersonTier": salesperson_tiers,
+        "InvoiceType": invoice_types,
+        "PromotionApplied": promotion_applied,
+        "CustomerTier": customer_tiers,
+        "MarketSegment": market_segments,
+        "UnitCount": unit_count,
+        "UnitPrice": np.round(unit_price, 2),
+        "TotalDiscountAmount": np.round(total_discount_amount, 2),
+        "TaxAmount": np.round(tax_amount, 2),
+        "FreightCharge": freight_charges.astype(float),
+        "ServiceFee": service_fees.astype(float),
+        "CostAmount": np.round(costs, 2),
+        "MarginAmount": np.round(margin_amount, 2),
+        "ProfitMarginPct": profit_margin_pct,
+        "CustomerLTV": customer_ltv.astype(float),
+        "InvoiceWeight": invoice_weight,
+        "InvoiceAmount": np.round(total_amounts, 2),
+        "DueDate": due_dates,
+        "PaymentDate": payment_dates,
+        "PaidAmount": np.round(paid_amount, 2),
+        "PaymentStatus": pay_flag,
+    })
 
-    for product in products:
-        for d in dates:
-            n_sample = min(len(customers_df), invoice_per_product_per_period)
-            period_customers = customers_df.sample(
-                n=n_sample, replace=False, random_state=seed)
-
-            base_amounts = np.random.randint(
-                5000, 200000, size=len(period_customers))
-
-            # Synthetic categorical dimensions
-            sales_channels = np.random.choice(
-                ["Online", "Retail", "Distributor", "Direct", "Partner"], size=len(period_customers), p=[0.25, 0.25, 0.2, 0.2, 0.1])
-            contract_types = np.random.choice(
-                ["Subscription", "One-Time", "Retainer", "Volume-Based"], size=len(period_customers), p=[0.4, 0.3, 0.2, 0.1])
-            payment_modes = np.random.choice(
-                ["BankTransfer", "CreditCard", "Cheque", "UPI", "Cash"], size=len(period_customers), p=[0.5, 0.25, 0.1, 0.1, 0.05])
-            salesperson_tiers = np.random.choice(
-                ["Junior", "Mid", "Senior", "KeyAccount"], size=len(period_customers), p=[0.3, 0.4, 0.25, 0.05])
-            invoice_types = np.random.choice(
-                ["Standard", "CreditNote", "DebitNote", "Adjustment"], size=len(period_customers), p=[0.7, 0.1, 0.1, 0.1])
-            promotion_applied = np.random.choice(
-                ["None", "Seasonal", "Loyalty", "Referral"], size=len(period_customers), p=[0.6, 0.2, 0.1, 0.1])
-            customer_tiers = np.random.choice(
-                ["Platinum", "Gold", "Silver", "Bronze"], size=len(period_customers), p=[0.1, 0.3, 0.4, 0.2])
-            market_segments = np.random.choice(
-                ["B2B", "B2C", "Mixed"], size=len(period_customers), p=[0.5, 0.4, 0.1])
-
-            # Synthetic numerical enrichments
-            unit_count = np.random.randint(1, 50, size=len(period_customers))
-            unit_price = base_amounts / unit_count
-            discounts = np.round(np.random.uniform(
-                0, 0.25, size=len(period_customers)), 3)
-            tax_rates = np.random.choice([0.05, 0.12, 0.18], size=len(
-                period_customers), p=[0.2, 0.3, 0.5])
-            freight_charges = np.random.randint(
-                200, 5000, size=len(period_customers))
-            service_fees = np.random.randint(
-                100, 2000, size=len(period_customers))
-            profit_margin_pct = np.round(np.random.normal(
-                0.25, 0.08, len(period_customers)), 3).clip(0.05, 0.6)
-            customer_ltv = np.random.randint(
-                10000, 500000, size=len(period_customers))
-            invoice_weight = np.round(np.random.uniform(
-                0.5, 50.0, len(period_customers)), 2)
-
-            net_amounts = base_amounts * (1 - discounts)
-            taxed_amounts = net_amounts * (1 + tax_rates)
-            total_amounts = taxed_amounts + freight_charges + service_fees
-            costs = total_amounts * (1 - profit_margin_pct)
-            margin_amount = total_amounts - costs
-            total_discount_amount = base_amounts * discounts
-            tax_amount = net_amounts * tax_rates
-            net_revenue = net_amounts
-            gross_revenue = base_amounts
-
-            for i, cust in enumerate(period_customers.itertuples(index=False)):
-                invoice_date = d + \
-                    pd.Timedelta(days=int(np.random.randint(0, 5)))
-                credit_days = int(np.random.choice(
-                    [30, 45, 60, 90], p=[0.6, 0.2, 0.15, 0.05]))
-                due_date = invoice_date + pd.Timedelta(days=credit_days)
-                pay_flag = np.random.choice(
-                    ["Paid", "PartiallyPaid", "Unpaid"], p=[0.7, 0.15, 0.15])
-
-                if pay_flag == "Paid":
-                    payment_date = due_date + \
-                        pd.Timedelta(days=int(np.random.poisson(lam=5)))
-                    paid_amount = total_amounts[i]
-                elif pay_flag == "PartiallyPaid":
-                    payment_date = due_date + \
-                        pd.Timedelta(days=int(np.random.randint(1, 60)))
-                    paid_amount = total_amounts[i] * \
-                        np.random.uniform(0.3, 0.9)
-                else:
-                    payment_date, paid_amount = pd.NaT, 0.0
-
-                rows.append({
-                    "Industry": industry,
-                    "Product": product,
-                    "Date": invoice_date.date(),
-                    "InvoiceID": str(uuid.uuid4().int)[:12],
-                    "CustomerID": cust.CustomerID,
-                    "CustomerSegment": cust.CustomerSegment,
-                    "Country": cust.Country,
-                    "State": cust.State,
-                    "SalesChannel": sales_channels[i],
-                    "ContractType": contract_types[i],
-                    "PaymentMode": payment_modes[i],
-                    "SalespersonTier": salesperson_tiers[i],
-                    "InvoiceType": invoice_types[i],
-                    "PromotionApplied": promotion_applied[i],
-                    "CustomerTier": customer_tiers[i],
-                    "MarketSegment": market_segments[i],
-                    "UnitCount": unit_count[i],
-                    "UnitPrice": float(round(unit_price[i], 2)),
-                    "TotalDiscountAmount": float(round(total_discount_amount[i], 2)),
-                    "TaxAmount": float(round(tax_amount[i], 2)),
-                    "FreightCharge": float(freight_charges[i]),
-                    "ServiceFee": float(service_fees[i]),
-                    "CostAmount": float(round(costs[i], 2)),
-                    "MarginAmount": float(round(margin_amount[i], 2)),
-                    "ProfitMarginPct": profit_margin_pct[i],
-                    "CustomerLTV": float(customer_ltv[i]),
-                    "InvoiceWeight": invoice_weight[i],
-                    "InvoiceAmount": float(round(total_amounts[i], 2)),
-                    "DueDate": due_date.date(),
-                    "PaymentDate": (payment_date.date() if pd.notna(payment_date) else pd.NaT),
-                    "PaidAmount": float(round(paid_amount, 2)),
-                    "PaymentStatus": pay_flag,
-                })
-
-    df = pd.DataFrame(rows)
     df = inject_outliers_vectorized(
-        df, ['InvoiceAmount'], freq=outlier_freq, mag=outlier_mag, seed=seed)
+        df, ['InvoiceAmount'], **outlier_options(state_config), rng=rng)
 
     if not df.empty:
         df["Outstanding"] = df["InvoiceAmount"] - df["PaidAmount"]
 
     return df
+
+
+def generate_revenue_invoices(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {}, rng: np.random.Generator | None = None):
+    rng = rng if rng is not None else dataset_rng(state_config, "Revenue_Invoices")
+    setup = _revenue_setup(state_config, generated, rng)
+    if setup is None:
+        return pd.DataFrame()
+    dates, n_invoices, customers, sampler = setup
+    return _revenue_chunk(state_config, dates, n_invoices, customers, sampler, rng)
+
+
+def iter_revenue_invoices(state_config: TAppStateConfig, faker: "Faker | None" = None, generated: Dict[str, pd.DataFrame] = {},
+                          rng: np.random.Generator | None = None, periods_per_chunk: int = DEF_PERIODS_PER_CHUNK) -> Iterator[pd.DataFrame]:
+    """Streams the invoices `periods_per_chunk` billing periods at a time."""
+    rng = rng if rng is not None else dataset_rng(state_config, "Revenue_Invoices")
+    setup = _revenue_setup(state_config, generated, rng)
+    if setup is None:
+        return
+    dates, n_invoices, customers, sampler = setup
+    for chunk_rng, chunk_dates in iter_date_chunks(rng, dates, periods_per_chunk):
+        yield _revenue_chunk(state_config, chunk_dates, n_invoices, customers, sampler, chunk_rng)
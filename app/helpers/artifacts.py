@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import weakref
+import zipfile
+from typing import Dict, Tuple
+import pandas as pd
+
+from app.helpers.export import dataset_filename
+from app.helpers.writer import write_dataset
+
+# ----------------------------
+# Download artifacts
+# ----------------------------
+
+
+class ArtifactStore:
+    """
+    Serialized download files for one set of generated frames, built lazily on first request
+    and memoized on disk in a private temp folder. Each dataset is serialized once per
+    format/codec; the ZIP bundle is assembled from those same files. `reset()` (called when
+    new data is generated) discards everything; the folder is removed with the store.
+    """
+
+    def __init__(self):
+        self.generation = None
+        self._dir = tempfile.mkdtemp(prefix="dataverse-artifacts-")
+        self._paths: Dict[Tuple, str] = {}
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._dir, True)
+
+    def reset(self, generation):
+        """Points the store at a new generation of frames, dropping artifacts of the previous one."""
+        if generation == self.generation:
+            return
+        self.generation = generation
+        for path in self._paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._paths.clear()
+
+    def dataset_path(self, name: str, df: pd.DataFrame, fmt: str, compression: str | None) -> str:
+        key = (name, fmt, compression)
+        if key not in self._paths:
+            path = os.path.join(self._dir, fmt, str(compression), dataset_filename(name, fmt))
+            write_dataset(df, path, fmt, compression)
+            self._paths[key] = path
+        return self._paths[key]
+
+    def bundle_path(self, frames: Dict[str, pd.DataFrame], fmt: str, compression: str | None) -> str:
+        key = ("__bundle__", tuple(frames), fmt, compression)
+        if key not in self._paths:
+            path = os.path.join(self._dir, fmt, str(compression), "synthetic_datasets.zip")
+            # Columnar files are already compressed; deflating them again only costs time
+            zip_mode = zipfile.ZIP_DEFLATED if fmt == "csv" else zipfile.ZIP_STORED
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with zipfile.ZipFile(path + ".tmp", "w", compression=zip_mode) as zf:
+                for name, df in frames.items():
+                    zf.write(self.dataset_path(name, df, fmt, compression),
+                             arcname=dataset_filename(name, fmt))
+            os.replace(path + ".tmp", path)
+            self._paths[key] = path
+        return self._paths[key]
+
+    def cleanup(self):
+        self._finalizer()
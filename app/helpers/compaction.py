@@ -0,0 +1,64 @@
+from typing import Iterable, List
+import numpy as np
+import pandas as pd
+
+from app.types import TCustomColumnEntry, TDatasetSchema
+
+# ----------------------------
+# Compact in-memory representation
+# ----------------------------
+# Enumerated text columns become `category`, date-like columns `datetime64`, and numeric
+# columns the narrowest dtype that represents every value exactly. Values never change.
+
+
+def downcast_numeric(s: pd.Series) -> pd.Series:
+    """Smallest integer dtype that holds the range, or float32 when every float survives the round trip."""
+    if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s) or s.empty:
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="integer")
+    if s.dtype == np.float64:
+        values = s.to_numpy()
+        with np.errstate(over="ignore"):
+            narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return pd.Series(narrow, index=s.index, name=s.name)
+    return s
+
+
+def widen_numeric(s: pd.Series, floating: bool = False) -> pd.Series:
+    """
+    Back to 64-bit before arithmetic that may leave the compact range (scenarios, outliers).
+    `floating` promotes integers to float64 as well, for scaling by fractional factors.
+    """
+    if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s) and not floating:
+        return s.astype(np.int64)
+    return s.astype(np.float64)
+
+
+def compact_frame(df: pd.DataFrame, categorical: Iterable[str] = (), datetimes: Iterable[str] = (),
+                  downcast: bool = True) -> pd.DataFrame:
+    """`downcast=False` leaves numeric dtypes alone, e.g. for chunks that must share one file schema."""
+    if df.empty:
+        return df
+    df = df.copy()
+    categorical, datetimes = set(categorical), set(datetimes)
+    for col in df.columns:
+        s = df[col]
+        if col in datetimes and not pd.api.types.is_datetime64_any_dtype(s):
+            df[col] = pd.to_datetime(s, errors="coerce")
+        elif col in categorical and not isinstance(s.dtype, pd.CategoricalDtype):
+            df[col] = s.astype("category")
+        elif downcast and pd.api.types.is_numeric_dtype(s):
+            df[col] = downcast_numeric(s)
+    return df
+
+
+def compact_dataset(df: pd.DataFrame, schema: TDatasetSchema | None, custom_columns: List[TCustomColumnEntry] = (),
+                    downcast: bool = True) -> pd.DataFrame:
+    """Compacts a generated dataset using its declared schema; `choice` custom columns are enumerations too."""
+    schema = schema or {"categorical": [], "datetime": []}
+    choice_cols = [col for col, cfg in custom_columns if cfg.get("type") == "choice"]
+    return compact_frame(df, [*schema["categorical"], *choice_cols], schema["datetime"], downcast)
@@ -1,19 +1,8 @@
 import os
-import sys
-import json
-from typing import Any, List, Tuple, Dict
+from typing import Any, List, Tuple
 import pandas as pd
-import streamlit as st
 
-from app.helpers.countries import get_country_states_dict
-from app.types import TIndustryConfig
-
-
-@st.cache_data
-def load_industry_kpi() -> Dict[str, TIndustryConfig]:
-    with open(INDUSTRY_KPIS_DIR, "r", encoding="utf-8") as f:
-        dump = json.load(f)
-    return dump
+from app.helpers.reference_data import load_reference_data
 
 
 # ----------------------------
@@ -21,11 +10,18 @@ def load_industry_kpi() -> Dict[str, TIndustryConfig]:
 # ----------------------------
 APP_MAIN_TITLE = "Shan's Dataverse"
 APP_TITLE = "📈 Enhanced Data Cockpit — Finance + Ops"
-BASE_DIR = os.path.dirname(os.path.abspath(
-    str(sys.modules["__main__"].__file__)))
+# Project root (two levels above this package), so headless entry points resolve the same folders as the app
+BASE_DIR = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
 PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 INDUSTRY_KPIS_DIR = os.path.join(STATIC_DIR, "industries.json")
+REFERENCE_DATA_DIR = os.path.join(STATIC_DIR, "reference_data.json")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+FAKER_POOL_DIR = os.path.join(CACHE_DIR, "faker_pools")
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+DATASET_CACHE_DIR = os.path.join(CACHE_DIR, "datasets")
+RUN_PROFILE_DIR = os.path.join(CACHE_DIR, "run_profiles")
 
 os.makedirs(PROFILES_DIR, exist_ok=True)
 
@@ -35,10 +31,11 @@ os.makedirs(PROFILES_DIR, exist_ok=True)
 DEFAULT_START_DATE = "2020-01-01"
 DEFAULT_END_DATE = "2022-12-31"
 
-# Load JSON
-INDUSTRY_KPIS = load_industry_kpi()
+# Industry templates and country -> provinces, from the compiled reference data
+_REFERENCE_DATA = load_reference_data(REFERENCE_DATA_DIR, INDUSTRY_KPIS_DIR)
+INDUSTRY_KPIS = _REFERENCE_DATA["industries"]
 
-DEFAULT_REGIONS = get_country_states_dict()
+DEFAULT_REGIONS = _REFERENCE_DATA["regions"]
 
 # Default Region Choices
 DEFAULT_REGION_CHOICE = {
@@ -52,8 +49,17 @@ DEF_SEED = 42
 DEF_FAKER_LOCALE = 'en_IN'
 DEF_OUTLIER_FREQ = 0.05
 DEF_OUTLIER_MAG = 2
+DEF_OUTLIER_MODEL = 'multiplier'
+DEF_OUTLIER_LABELS = False
 DEF_START_DATE = pd.to_datetime(DEFAULT_START_DATE).date()
 DEF_END_DATE = pd.to_datetime(DEFAULT_END_DATE).date()
+FAKER_POOL_SIZE = 20_000
+DEF_PERIODS_PER_CHUNK = 12
+DATASET_CACHE_MAX_MB = 1024
+# Estimated peak memory a run may use before it is streamed or refused (0 = no limit)
+DEF_MEMORY_BUDGET_MB = 2048
+# Bump whenever generator output changes, so fingerprints from older code never match
+DATASET_CACHE_VERSION = 6
 
 PROFILE_CONFIG: List[Tuple[str, str, Any]] = [
     ('key_industry', 'industry', DEF_INDUSTRY),
@@ -66,11 +72,15 @@ PROFILE_CONFIG: List[Tuple[str, str, Any]] = [
     ('key_faker_locale', 'faker_locale', DEF_FAKER_LOCALE),
     ('key_outlier_freq', 'outlier_frequency', DEF_OUTLIER_FREQ),
     ('key_outlier_mag', 'outlier_magnitude', DEF_OUTLIER_MAG),
+    ('key_outlier_model', 'outlier_model', DEF_OUTLIER_MODEL),
+    ('key_outlier_labels', 'outlier_labels', DEF_OUTLIER_LABELS),
     ('key_custom_columns', 'custom_columns', {}),
     ('key_scenarios', 'scenarios', []),
+    ('key_categorical_distributions', 'categorical_distributions', {}),
     ('key_total_customers', 'total_customers', 200),
     ('key_total_vendors', 'total_vendors', 500),
     ('key_total_assets', 'total_assets', 500),
+    ('key_total_warehouses', 'total_warehouses', 5),
 ]
 
 STATE_CONFIG: List[Tuple[str, str, Any]] = [
@@ -1,14 +1,17 @@
-from countryinfo import CountryInfo
-import streamlit as st
+from functools import lru_cache
 
 from typing import Dict
 
 
-@st.cache_data
+@lru_cache(maxsize=1)
 def get_country_states_dict() -> Dict[str, list[str]]:
     """
     Returns a dictionary mapping countries to their states/provinces.
+    Reads countryinfo's per-country files; the app loads the compiled copy from
+    app.helpers.reference_data instead.
     """
+    from countryinfo import CountryInfo
+
     country = CountryInfo()
     countries = country.all()
 
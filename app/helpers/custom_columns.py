@@ -0,0 +1,111 @@
+from typing import Callable, List
+import pandas as pd
+import numpy as np
+
+from app.helpers.profiling import StageProfiler, profile_stage
+from app.helpers.rng import custom_column_rng, seeded_modules
+from app.helpers.safe_eval import formula_column, formula_names, rowwise_frame_eval, uses_window_functions, vectorized_eval
+from app.types import TCustomColumnEntry
+
+
+def custom_column_waves(cfg_list: List[TCustomColumnEntry], base_columns=()) -> List[List[TCustomColumnEntry]]:
+    """
+    Groups custom columns into waves by their formula dependencies: every column only reads
+    base columns or columns of earlier waves, so new columns may be listed in any order.
+    Columns overriding a base column keep list semantics: formulas listed before the override
+    read the base value, formulas listed after it read the override. Cyclic formulas keep their
+    list order, one per wave, and fail (or fall back) exactly as they did before ordering.
+    """
+    base_columns = set(base_columns)
+    position = {col: i for i, (col, _) in enumerate(cfg_list)}
+    deps = {col: set() for col, _ in cfg_list}
+    for i, (col, col_cfg) in enumerate(cfg_list):
+        expr = col_cfg.get('expr', '') if col_cfg.get('type') == 'formula' else ''
+        for name in (formula_names(expr) & position.keys()) - {col} if expr else ():
+            if name not in base_columns or position[name] < i:
+                deps[col].add(name)
+            else:  # a later override must wait until this formula has read the base value
+                deps[name].add(col)
+
+    waves, done, pending = [], set(), list(cfg_list)
+    while pending:
+        wave = [entry for entry in pending if deps[entry[0]] <= done]
+        if not wave:
+            wave = [pending[0]]
+        waves.append(wave)
+        done |= {col for col, _ in wave}
+        pending = [entry for entry in pending if entry not in wave]
+    return waves
+
+
+def _custom_column_values(df: pd.DataFrame, col: str, col_cfg: dict, rng: np.random.Generator, columns: dict,
+                          on_warning: Callable[[str], None] | None):
+    ctype = col_cfg.get('type')
+    if ctype == 'choice':
+        opts = col_cfg.get('options', [])
+        return rng.choice(opts, size=len(df)) if opts else np.nan
+    if ctype == 'range':
+        mn, mx = float(col_cfg.get('min', 0)), float(col_cfg.get('max', 1))
+        return rng.uniform(mn, mx, size=len(df))
+    if ctype == 'formula':
+        expr = col_cfg.get('expr', '')
+        if not expr:
+            return np.nan
+        modules = seeded_modules(rng)
+        try:  # Attempt vectorized evaluation
+            return vectorized_eval(expr, df, modules, columns)
+        except Exception as e:
+            error = e
+        try:  # Conditionals / math.* rewritten into numpy calls
+            return vectorized_eval(expr, df, modules, columns, rewrite=True)
+        except Exception:
+            pass
+        if uses_window_functions(expr):  # Window functions have no row-wise form
+            if on_warning is not None:
+                on_warning(
+                    f"Formula for '{col}' failed: {error}. Column left empty.")
+            return np.nan
+        # Last resort: slower row-wise evaluation
+        if on_warning is not None:
+            on_warning(
+                f"Formula for '{col}' failed vectorized eval: {error}. Falling back to row-wise.")
+        return rowwise_frame_eval(expr, df, modules)
+    return np.nan
+
+
+def apply_custom_columns_vectorized(df: pd.DataFrame, ds_name: str, cfg_list: List[TCustomColumnEntry], seed: int,
+                                    on_warning: Callable[[str], None] | None = None, chunk: int | None = None,
+                                    profiler: StageProfiler | None = None):
+    """
+    Applies the custom column configs of a dataset to a dataframe.
+    Columns are evaluated in dependency waves (see `custom_column_waves`); the formulas of a wave
+    share one set of column arrays and their results are assigned together.
+    Each column draws from its own stream derived from (seed, ds_name, column), plus the
+    chunk number when the dataset is streamed.
+    Does not touch Streamlit, so it can run in worker processes; warnings go to `on_warning`.
+    With a `profiler`, every column is recorded as its own stage.
+    """
+    if not cfg_list or df.empty:
+        return df
+
+    df = df.reset_index(drop=True)
+    base_columns = list(df.columns)
+    for wave in custom_column_waves(cfg_list, base_columns):
+        columns = {}
+        for col, col_cfg in wave:
+            if col_cfg.get('type') == 'formula':
+                for name in formula_names(col_cfg.get('expr', '')):
+                    if name in df.columns and name not in columns:
+                        columns[name] = formula_column(df[name])
+        values = {}
+        for col, col_cfg in wave:
+            with profile_stage(profiler, "custom_column", ds_name, col, chunk) as stage:
+                values[col] = _custom_column_values(
+                    df, col, col_cfg, custom_column_rng(seed, ds_name, col, chunk), columns, on_warning)
+                stage.output(values[col])
+        df = df.assign(**values)
+
+    # New columns follow the configured order, whatever order the waves produced them in
+    order = base_columns + list(dict.fromkeys(
+        col for col, _ in cfg_list if col not in base_columns))
+    return df if list(df.columns) == order else df[order]
@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List
+import pandas as pd
+
+from app.generators import generator_config_keys
+from app.helpers.config import DATASET_CACHE_VERSION
+from app.helpers.distributions import dataset_overrides
+from app.types import TAppStateConfig
+
+# ----------------------------
+# Fingerprints
+# ----------------------------
+# A dataset's fingerprint covers exactly what its generator reads from the state config,
+# its custom columns and the fingerprints of its inputs, so a change anywhere upstream
+# (e.g. Revenue_Invoices for Debtors) invalidates everything downstream of it.
+
+
+def _config_value(state_config: TAppStateConfig, key: str, dataset: str):
+    if key == "country_config":
+        # Only the regions of the selected countries are ever read
+        return {c: state_config["country_config"].get(c) for c in state_config["countries"]}
+    if key == "categorical_distributions":
+        # Only the overrides of the dataset's own distributions are ever read
+        return dataset_overrides(state_config, dataset)
+    return state_config.get(key)
+
+
+def _digest(payload) -> str:
+    canonical = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def base_fingerprint(state_config: TAppStateConfig, dataset: str, input_fingerprints: Dict[str, str]) -> str:
+    """Fingerprint of the raw generator output (before custom columns)."""
+    return _digest({
+        "version": DATASET_CACHE_VERSION,
+        "dataset": dataset,
+        "config": {k: _config_value(state_config, k, dataset) for k in generator_config_keys.get(dataset, [])},
+        "inputs": input_fingerprints,
+    })
+
+
+def dataset_fingerprint(state_config: TAppStateConfig, dataset: str, base_fp: str) -> str:
+    """Fingerprint of the finished dataset: its generator output plus its custom columns."""
+    custom_columns = state_config["custom_columns"].get(dataset, [])
+    if not custom_columns:
+        return base_fp
+    return _digest({"base": base_fp, "custom_columns": custom_columns})
+
+
+def dataset_fingerprints(state_config: TAppStateConfig, datasets: List[str], deps: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+    """{dataset: {"base": fp, "final": fp}} for datasets listed in dependency order."""
+    fps: Dict[str, Dict[str, str]] = {}
+    for ds in datasets:
+        base = base_fingerprint(
+            state_config, ds, {d: fps[d]["final"] for d in deps[ds]})
+        fps[ds] = {"base": base, "final": dataset_fingerprint(state_config, ds, base)}
+    return fps
+
+
+# ----------------------------
+# Frame cache
+# ----------------------------
+
+
+class DatasetCache:
+    """
+    In-process LRU cache of generated frames keyed by fingerprint, bounded by memory.
+    With a `spill_dir`, evicted frames are pickled to disk (dtypes intact) and promoted back on a hit;
+    `flush()` writes everything still in memory, so the cache can persist across runs.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._frames or (self.spill_dir is not None and os.path.exists(self._spill_path(key)))
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return self._frames[key]
+        if self.spill_dir is not None and os.path.exists(self._spill_path(key)):
+            df = pd.read_pickle(self._spill_path(key))
+            self.put(key, df)
+            self.hits += 1
+            return df
+        self.misses += 1
+        return None
+
+    def put(self, key: str, df: pd.DataFrame):
+        if key in self._frames:
+            self._frames.move_to_end(key)
+            return
+        self._frames[key] = df
+        self._sizes[key] = int(df.memory_usage(deep=True).sum())
+        self._evict()
+
+    def _evict(self):
+        while len(self._frames) > 1 and sum(self._sizes.values()) > self.max_bytes:
+            key, df = self._frames.popitem(last=False)
+            self._sizes.pop(key)
+            self._spill(key, df)
+
+    def _spill(self, key: str, df: pd.DataFrame):
+        if self.spill_dir is None or os.path.exists(self._spill_path(key)):
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        tmp = self._spill_path(key) + ".tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, self._spill_path(key))
+
+    def flush(self):
+        """Writes every in-memory frame to the spill directory (no-op without one)."""
+        for key, df in self._frames.items():
+            self._spill(key, df)
+
+    def clear(self):
+        self._frames.clear()
+        self._sizes.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._sizes.values())
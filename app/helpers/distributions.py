@@ -0,0 +1,127 @@
+import json
+from functools import lru_cache
+from typing import Dict, List
+
+from app.helpers.sampling import CategoricalSampler
+from app.types import TAppStateConfig, TCategoricalDistribution
+
+# ----------------------------
+# Named categorical distributions
+# ----------------------------
+# Every fixed mix the generators draw from is registered here as "<Dataset>.<Column>" ->
+# values and weights (None = uniform). A sampler is built once per distinct mix and cached,
+# so each batch is one vectorized draw of integer codes that become a pandas Categorical
+# without materializing the strings. Profiles retune a mix under "categorical_distributions":
+#   "categorical_distributions": {
+#       "Revenue_Invoices.PaymentStatus": {"weights": [0.5, 0.25, 0.25]},
+#       "Revenue_Invoices.CreditDays": {"values": [30, 60], "weights": [0.8, 0.2]}}
+# Weights need not sum to 1. Some values carry meaning (e.g. "Paid" or "SLM"), so changing
+# the values of those distributions changes how the rows built on them behave.
+
+PAYMENT_TERMS = ["Immediate", "15 Days", "30 Days", "45 Days", "60 Days"]
+BUSINESS_TYPES = ["Private Limited", "LLP", "Proprietor", "Public Limited", "Government", "NGO"]
+TAX_CATEGORIES = ["Regular", "Composition", "Exempt"]
+TAX_RATES = [0.05, 0.12, 0.18]
+
+
+def _dist(values: list, weights: List[float] | None = None) -> TCategoricalDistribution:
+    return {"values": values, "weights": weights}
+
+
+CATEGORICAL_DISTRIBUTIONS: Dict[str, TCategoricalDistribution] = {
+    "Customer_Master.CustomerSegment": _dist(["SME", "Enterprise", "Startup", "Government", "NGO"]),
+    "Customer_Master.ListingStatus": _dist(["Listed", "Unlisted"], [0.2, 0.8]),
+    "Customer_Master.BusinessType": _dist(BUSINESS_TYPES),
+    "Customer_Master.PaymentTerms": _dist(PAYMENT_TERMS, [0.05, 0.25, 0.4, 0.2, 0.1]),
+    "Customer_Master.IsRelatedParty": _dist(["Yes", "No"], [0.1, 0.9]),
+    "Customer_Master.TaxCategory": _dist(TAX_CATEGORIES, [0.7, 0.2, 0.1]),
+    "Customer_Master.EntityCategory": _dist(["Corporate", "Individual", "Partnership", "Trust"], [0.6, 0.2, 0.15, 0.05]),
+    "Customer_Master.AccountStatus": _dist(["Active", "Suspended", "Dormant", "Blacklisted"], [0.85, 0.05, 0.08, 0.02]),
+
+    "Vendor_Master.VendorType": _dist(["Raw Material", "Services", "Consulting", "Logistics", "Technology", "Facilities"]),
+    "Vendor_Master.ListingStatus": _dist(["Listed", "Unlisted"], [0.15, 0.85]),
+    "Vendor_Master.BusinessType": _dist(BUSINESS_TYPES),
+    "Vendor_Master.PaymentTerms": _dist(PAYMENT_TERMS, [0.05, 0.25, 0.4, 0.2, 0.1]),
+    "Vendor_Master.IsPreferredVendor": _dist(["Yes", "No"], [0.3, 0.7]),
+    "Vendor_Master.TaxCategory": _dist(TAX_CATEGORIES, [0.7, 0.2, 0.1]),
+
+    "PPE_Register.UsefulLifeYears": _dist([3, 5, 7, 10, 15, 20]),
+    "PPE_Register.DepreciationMethod": _dist(["SLM", "WDV", "Usage-based"]),
+    "PPE_Register.Department": _dist(["Finance", "Ops", "Sales", "R&D", "HR", "IT"]),
+    "PPE_Register.AssetType": _dist(["Building", "Plant & Machinery", "Office Equipment", "Furniture", "Vehicles",
+                                     "Computers", "Leasehold Improvements"]),
+    "PPE_Register.OwnershipType": _dist(["Owned", "Leased", "Joint Venture Asset", "Under Construction"]),
+    "PPE_Register.ConditionStatus": _dist(["Good", "Needs Maintenance", "Damaged", "Disposed"]),
+    "PPE_Register.CapexSource": _dist(["Internal Funds", "Bank Loan", "Parent Funding", "Lease Liability"]),
+
+    "Revenue_Invoices.SalesChannel": _dist(["Online", "Retail", "Distributor", "Direct", "Partner"],
+                                           [0.25, 0.25, 0.2, 0.2, 0.1]),
+    "Revenue_Invoices.ContractType": _dist(["Subscription", "One-Time", "Retainer", "Volume-Based"], [0.4, 0.3, 0.2, 0.1]),
+    "Revenue_Invoices.PaymentMode": _dist(["BankTransfer", "CreditCard", "Cheque", "UPI", "Cash"],
+                                          [0.5, 0.25, 0.1, 0.1, 0.05]),
+    "Revenue_Invoices.SalespersonTier": _dist(["Junior", "Mid", "Senior", "KeyAccount"], [0.3, 0.4, 0.25, 0.05]),
+    "Revenue_Invoices.InvoiceType": _dist(["Standard", "CreditNote", "DebitNote", "Adjustment"], [0.7, 0.1, 0.1, 0.1]),
+    "Revenue_Invoices.PromotionApplied": _dist(["None", "Seasonal", "Loyalty", "Referral"], [0.6, 0.2, 0.1, 0.1]),
+    "Revenue_Invoices.CustomerTier": _dist(["Platinum", "Gold", "Silver", "Bronze"], [0.1, 0.3, 0.4, 0.2]),
+    "Revenue_Invoices.MarketSegment": _dist(["B2B", "B2C", "Mixed"], [0.5, 0.4, 0.1]),
+    "Revenue_Invoices.TaxRate": _dist(TAX_RATES, [0.2, 0.3, 0.5]),
+    "Revenue_Invoices.CreditDays": _dist([30, 45, 60, 90], [0.6, 0.2, 0.15, 0.05]),
+    "Revenue_Invoices.PaymentStatus": _dist(["Paid", "PartiallyPaid", "Unpaid"], [0.7, 0.15, 0.15]),
+
+    "Purchases.PurchaseType": _dist(["Standard", "Return", "CreditNote", "Adjustment"], [0.7, 0.1, 0.1, 0.1]),
+    "Purchases.ProcurementChannel": _dist(["Direct", "Distributor", "Online", "Auction"], [0.5, 0.3, 0.15, 0.05]),
+    "Purchases.PriorityLevel": _dist(["High", "Medium", "Low"], [0.2, 0.6, 0.2]),
+    "Purchases.PaymentMode": _dist(["BankTransfer", "Cheque", "CreditCard", "UPI", "Cash"], [0.5, 0.2, 0.15, 0.1, 0.05]),
+    "Purchases.ContractTerm": _dist(["One-Time", "Annual", "Quarterly", "Project-Based"], [0.5, 0.2, 0.2, 0.1]),
+    "Purchases.TaxRate": _dist(TAX_RATES, [0.2, 0.3, 0.5]),
+
+    "Debtors.BusinessSegment": _dist(["Enterprise", "Mid-Market", "SME", "Startup"]),
+    "Debtors.ContractType": _dist(["Fixed", "Time & Material", "Retainer", "Ad-hoc"]),
+    "Debtors.CollectionTrend": _dist(["Up", "Stable", "Down"]),
+    "Debtors.AutoDebitEnabled": _dist(["Yes", "No"], [0.6, 0.4]),
+
+    "Inventory_Snapshots.WarehouseType": _dist(["Central", "Regional", "Transit", "3PL", "Vendor Managed"]),
+    "Inventory_Snapshots.StorageCondition": _dist(["Ambient", "Cold Storage", "Hazardous", "Dry", "Climate Controlled"]),
+    "Inventory_Snapshots.Category": _dist(["Raw Material", "WIP", "Finished Goods", "Consumables"]),
+    "Inventory_Snapshots.InventoryStatus": _dist(["Available", "Reserved", "In Transit", "Damaged", "Blocked"]),
+}
+
+
+def dataset_overrides(state_config: TAppStateConfig, dataset: str) -> Dict[str, dict]:
+    """The profile's overrides of `dataset`'s distributions (all a cached dataset's fingerprint needs)."""
+    overrides = state_config.get("categorical_distributions") or {}
+    return {name: overrides[name] for name in sorted(overrides) if name.split(".", 1)[0] == dataset}
+
+
+@lru_cache(maxsize=256)
+def _build_sampler(name: str, override_json: str) -> CategoricalSampler:
+    override = json.loads(override_json)
+    dist = {**CATEGORICAL_DISTRIBUTIONS[name], **override}
+    if "values" in override and "weights" not in override:
+        dist["weights"] = None  # new values without weights are drawn uniformly
+    try:
+        return CategoricalSampler(dist["values"], dist["weights"])
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Categorical distribution '{name}': {e}") from None
+
+
+def categorical_sampler(state_config: TAppStateConfig, name: str) -> CategoricalSampler:
+    """The cached sampler of distribution `name`, with the profile's override applied."""
+    override = (state_config.get("categorical_distributions") or {}).get(name) or {}
+    return _build_sampler(name, json.dumps(override, sort_keys=True))
+
+
+def distribution_errors(state_config: TAppStateConfig) -> List[str]:
+    """Problems with the profile's overrides (unknown names, mismatched or invalid weights), for up-front reporting."""
+    errors = []
+    for name, override in (state_config.get("categorical_distributions") or {}).items():
+        if name not in CATEGORICAL_DISTRIBUTIONS:
+            errors.append(f"Unknown categorical distribution '{name}'.")
+        elif not isinstance(override, dict) or not override.keys() <= {"values", "weights"}:
+            errors.append(f"Categorical distribution '{name}' takes only 'values' and/or 'weights'.")
+        else:
+            try:
+                categorical_sampler(state_config, name)
+            except ValueError as e:
+                errors.append(str(e))
+    return errors
@@ -0,0 +1,203 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.generators import chunk_generator_config, chunk_input_columns, generator_config
+from app.generators.revenue import ACTIVITY_PARETO_SHAPE
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.general import date_range
+from app.helpers.scheduler import dataset_dependencies
+from app.types import TAppStateConfig, TDatasetEstimate, TRunPlan
+
+# ----------------------------
+# Pre-flight size estimates
+# ----------------------------
+# Expected rows of every dataset follow from the state config alone (e.g. invoices are
+# products x periods x 10-19 invoices per product and period), so the size of a run can
+# be checked against a memory budget before anything is generated. Bytes per row were
+# measured on compacted frames (`frame`) and as the peak traced while generating
+# (`peak`, which includes the frame itself); they are estimates, not guarantees.
+
+ROW_BYTES: Dict[str, Tuple[int, int]] = {
+    "Customer_Master": (270, 1900),
+    "Vendor_Master": (265, 1750),
+    "PPE_Register": (190, 1000),
+    "PPE_Depreciation_Schedule": (90, 340),
+    "Revenue_Invoices": (175, 1150),
+    "Purchases": (135, 800),
+    "Debtors": (190, 300),
+    "Inventory_Snapshots": (66, 700),
+    "Operational_Dataset": (24, 350),
+}
+# Debtors aggregates a copy of the invoices, so its peak follows the invoice count
+# (less when streaming, where only the kept invoice columns are copied)
+DEBTORS_PEAK_BYTES_PER_INVOICE = 310
+DEBTORS_STREAM_PEAK_BYTES_PER_INVOICE = 110
+# Bytes per row of the columns kept from a streamed dataset for its dependants (chunk_input_columns)
+KEPT_ROW_BYTES = {"Revenue_Invoices": 48}
+# Each operational KPI / custom column adds about one 8-byte value per row (twice that while computed)
+COLUMN_BYTES = 8
+
+INVOICES_PER_PERIOD = (10, 19)  # invoices per product and period (rng.integers(10, 20))
+PURCHASES_PER_PERIOD = (10, 19)
+
+
+def _expected_sample(population: int, bounds: Tuple[int, int]) -> Tuple[float, int]:
+    lo, hi = bounds
+    return min(population, (lo + hi) / 2), min(population, hi)
+
+
+def _distinct_customers(customers: int, invoices: float, classes: int = 1000) -> float:
+    """Expected distinct customers among `invoices` activity-weighted draws, over Pareto quantile classes."""
+    if not customers:
+        return 0.0
+    classes = min(customers, classes)
+    weights = (1 - (np.arange(classes) + 0.5) / classes) ** (-1 / ACTIVITY_PARETO_SHAPE)
+    per_class = customers / classes
+    p = weights / (weights.sum() * per_class)  # draw probability of one customer in each class
+    return float(per_class * -np.expm1(-invoices * p).sum())
+
+
+def estimate_rows(state_config: TAppStateConfig, datasets: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Expected and maximum rows of each selected dataset (inputs that are not selected count as empty)."""
+    dates = date_range(state_config["start_date"],
+                       state_config["end_date"], state_config["frequency"])
+    periods = len(dates)
+    months = dates.to_period("M").nunique() if periods else 0
+    window_months = len(pd.period_range(
+        state_config["start_date"], state_config["end_date"], freq="M"))
+    products = len(state_config["products"])
+    customers = state_config["total_customers"] if "Customer_Master" in datasets else 0
+    vendors = state_config["total_vendors"] if "Vendor_Master" in datasets else 0
+    assets = state_config["total_assets"]
+
+    invoices = sum(INVOICES_PER_PERIOD) / 2 * products * periods if customers else 0
+    max_invoices = INVOICES_PER_PERIOD[1] * products * periods if customers else 0
+    bought, max_bought = _expected_sample(vendors, PURCHASES_PER_PERIOD)
+    kpis = (state_config["industry_kpi"].get(state_config["industry"]) or {}).get("operational")
+    rows = {
+        "Customer_Master": (customers, customers),
+        "Vendor_Master": (vendors, vendors),
+        "PPE_Register": (assets, assets),
+        # assets are acquired uniformly over the window and scheduled from their acquisition month
+        "PPE_Depreciation_Schedule": (assets * (window_months + 1) / 2, assets * window_months)
+        if "PPE_Register" in datasets else (0, 0),
+        "Revenue_Invoices": (invoices, max_invoices),
+        "Purchases": (periods * bought, periods * max_bought),
+        # one row per billed customer and calendar month; invoices go to customers by activity
+        "Debtors": (months * _distinct_customers(customers, invoices / months),
+                    months * min(customers, np.ceil(max_invoices / months)))
+        if "Revenue_Invoices" in datasets and months else (0, 0),
+        "Inventory_Snapshots": (products * max(1, int(state_config.get("total_warehouses", 5))) * periods,) * 2,
+        "Operational_Dataset": (periods, periods) if kpis is not None else (0, 0),
+    }
+    return {ds: (int(round(rows[ds][0])), int(rows[ds][1])) for ds in generator_config if ds in datasets}
+
+
+def _column_bytes(state_config: TAppStateConfig, ds: str) -> int:
+    extra = len(state_config["custom_columns"].get(ds, []))
+    if ds == "Operational_Dataset":
+        extra += len((state_config["industry_kpi"].get(state_config["industry"]) or {}).get("operational") or [])
+    return extra * COLUMN_BYTES
+
+
+def estimate_datasets(state_config: TAppStateConfig, datasets: List[str]) -> Dict[str, TDatasetEstimate]:
+    """Rows, frame size and generation peak of each selected dataset; sizes use the maximum row count."""
+    rows = estimate_rows(state_config, datasets)
+    out: Dict[str, TDatasetEstimate] = {}
+    for ds, (expected, most) in rows.items():
+        frame, peak = ROW_BYTES[ds]
+        extra = _column_bytes(state_config, ds)
+        peak_bytes = most * (peak + 2 * extra)
+        if ds == "Debtors":
+            peak_bytes += rows.get("Revenue_Invoices", (0, 0))[1] * DEBTORS_PEAK_BYTES_PER_INVOICE
+        out[ds] = {"rows": expected, "max_rows": most,
+                   "frame_mb": most * (frame + extra) / 2**20, "peak_mb": peak_bytes / 2**20}
+    return out
+
+
+def memory_peak_mb(estimates: Dict[str, TDatasetEstimate]) -> float:
+    """In-memory run: every finished frame stays alive while the next dataset is generated."""
+    held = peak = 0.0
+    for est in estimates.values():
+        peak = max(peak, held + est["peak_mb"])
+        held += est["frame_mb"]
+    return peak
+
+
+def stream_peak_mb(state_config: TAppStateConfig, estimates: Dict[str, TDatasetEstimate],
+                   periods_per_chunk: int) -> float:
+    """
+    Streaming run (see stream_generators): chunked datasets are held one block of periods at a time,
+    other datasets in full, and inputs are released once every dependant has been written.
+    """
+    datasets = list(estimates)
+    deps = dataset_dependencies(datasets)
+    periods = len(date_range(state_config["start_date"],
+                             state_config["end_date"], state_config["frequency"]))
+    share = min(periods_per_chunk, periods) / periods if periods else 0.0
+    kept: Dict[str, float] = {}
+    done = set()
+    peak = 0.0
+    for ds, est in estimates.items():
+        if ds in chunk_generator_config:
+            working = est["peak_mb"] * share
+            keep = est["max_rows"] * KEPT_ROW_BYTES[ds] / 2**20 if ds in chunk_input_columns else est["frame_mb"]
+        else:
+            working = est["peak_mb"]
+            keep = est["frame_mb"]
+            if ds == "Debtors" and "Revenue_Invoices" in estimates:
+                working -= estimates["Revenue_Invoices"]["max_rows"] * (
+                    DEBTORS_PEAK_BYTES_PER_INVOICE - DEBTORS_STREAM_PEAK_BYTES_PER_INVOICE) / 2**20
+        peak = max(peak, sum(kept.values()) + working)
+        if any(ds in deps[d] for d in datasets):
+            kept[ds] = keep
+        done.add(ds)
+        for d in list(kept):
+            if all(d not in deps[dep] or dep in done for dep in datasets):
+                del kept[d]
+    return peak
+
+
+def plan_run(state_config: TAppStateConfig, datasets: List[str], budget_mb: float | None,
+             streaming: bool = False, periods_per_chunk: int = DEF_PERIODS_PER_CHUNK) -> TRunPlan:
+    """
+    Decides how a run fits `budget_mb`: in memory when it fits, otherwise streamed with the largest
+    periods-per-chunk (at most the requested one) that fits, otherwise refused.
+    A budget of 0 / None never streams or refuses on its own.
+    """
+    estimates = estimate_datasets(state_config, datasets)
+    memory_mb = memory_peak_mb(estimates)
+    plan: TRunPlan = {"mode": "stream" if streaming else "memory",
+                      "periods_per_chunk": periods_per_chunk if streaming else None,
+                      "memory_mb": memory_mb, "stream_mb": None, "budget_mb": budget_mb or None, "reason": ""}
+    if streaming:
+        plan["stream_mb"] = stream_peak_mb(state_config, estimates, periods_per_chunk)
+    if not budget_mb:
+        return plan
+    if not streaming and memory_mb <= budget_mb:
+        return plan
+
+    # Peak memory only grows with the chunk size, so the largest chunk that fits is found by bisection
+    lo, hi = 1, max(1, int(periods_per_chunk))
+    smallest_mb = stream_peak_mb(state_config, estimates, lo)
+    if smallest_mb > budget_mb:
+        plan.update(mode="refuse", periods_per_chunk=None, stream_mb=smallest_mb,
+                    reason=f"Even streaming one period at a time needs ~{smallest_mb:,.1f} MB "
+                           f"(budget {budget_mb:,.6g} MB). Reduce the entity counts, products or date range.")
+        return plan
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if stream_peak_mb(state_config, estimates, mid) <= budget_mb:
+            lo = mid
+        else:
+            hi = mid - 1
+    plan.update(mode="stream", periods_per_chunk=lo, stream_mb=stream_peak_mb(state_config, estimates, lo))
+    if not streaming:
+        plan["reason"] = (f"An in-memory run needs ~{memory_mb:,.1f} MB (budget {budget_mb:,.6g} MB); "
+                          f"streaming {lo} period(s) per chunk instead.")
+    elif lo < periods_per_chunk:
+        plan["reason"] = (f"{periods_per_chunk} periods per chunk would exceed the {budget_mb:,.6g} MB budget; "
+                          f"using {lo} instead.")
+    return plan
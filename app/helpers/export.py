@@ -0,0 +1,133 @@
+import io
+import importlib.util
+from typing import Dict, List
+import pandas as pd
+
+from app.types import TExportFormat
+
+# ----------------------------
+# Dataset export formats
+# ----------------------------
+# CSV needs nothing beyond pandas. Parquet and Arrow IPC go through pyarrow, which is an
+# optional dependency imported only when a columnar format is actually used.
+
+EXPORT_FORMATS: Dict[str, TExportFormat] = {
+    "csv": {"label": "CSV", "extension": "csv", "codecs": ["none"]},
+    "parquet": {"label": "Parquet", "extension": "parquet", "codecs": ["zstd", "snappy", "gzip", "brotli", "lz4", "none"]},
+    "arrow": {"label": "Arrow IPC", "extension": "arrow", "codecs": ["zstd", "lz4", "none"]},
+}
+
+# String columns whose distinct values make up at most this share of the rows are dictionary-encoded
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Parquet / Arrow export needs pyarrow. Install it with `pip install pyarrow`.") from e
+    return pyarrow
+
+
+def available_export_formats() -> List[str]:
+    """Formats usable in this environment; columnar formats need pyarrow installed."""
+    has_arrow = importlib.util.find_spec("pyarrow") is not None
+    return [fmt for fmt in EXPORT_FORMATS if fmt == "csv" or has_arrow]
+
+
+def dataset_filename(name: str, fmt: str = "csv") -> str:
+    return f"{name}.{EXPORT_FORMATS[fmt]['extension']}"
+
+
+def dictionary_columns(df: pd.DataFrame, max_ratio: float = DICTIONARY_MAX_RATIO) -> List[str]:
+    """Low-cardinality string (or categorical) columns worth storing as dictionary indices."""
+    cols = []
+    n = max(len(df), 1)
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            cols.append(col)
+        elif pd.api.types.is_string_dtype(s) and s.nunique(dropna=True) / n <= max_ratio:
+            cols.append(col)
+    return cols
+
+
+class DictionaryEncoder:
+    """
+    Converts frames to Arrow tables with the chosen columns dictionary-encoded.
+    Dictionaries only ever grow (new values are appended), so consecutive chunks of the
+    same dataset share index meaning and can be written as dictionary deltas.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.schema = None
+        self._dictionaries = {}
+
+    def encode(self, df: pd.DataFrame):
+        pa = require_pyarrow()
+        import pyarrow.compute as pc
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for col in self.columns:
+            if col not in table.column_names:
+                continue
+            i = table.schema.get_field_index(col)
+            values = table.column(i).combine_chunks()
+            if pa.types.is_dictionary(values.type):
+                values = values.dictionary_decode()
+            values = values.cast(pa.string())
+            known = self._dictionaries.get(col, pa.array([], pa.string()))
+            uniques = pc.drop_null(pc.unique(values))
+            known = pa.concat_arrays(
+                [known, uniques.filter(pc.invert(pc.is_in(uniques, value_set=known)))])
+            self._dictionaries[col] = known
+            indices = pc.index_in(values, value_set=known).cast(pa.int32())
+            table = table.set_column(
+                i, col, pa.DictionaryArray.from_arrays(indices, known))
+
+        if self.schema is None:
+            self.schema = table.schema
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        return table
+
+
+def resolve_codec(compression: str | None) -> str | None:
+    return None if compression in (None, "none") else compression
+
+
+def serialize_dataset(df: pd.DataFrame, fmt: str = "csv", compression: str | None = None) -> bytes:
+    """Serializes a dataset once, in the requested format, for downloads and bundles."""
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+
+    pa = require_pyarrow()
+    table = DictionaryEncoder(dictionary_columns(df)).encode(df)
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, buf, compression=resolve_codec(compression) or "none")
+    elif fmt == "arrow":
+        with pa.ipc.new_file(buf, table.schema, options=pa.ipc.IpcWriteOptions(compression=resolve_codec(compression))) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown export format '{fmt}'.")
+    return buf.getvalue()
+
+
+def read_preview(path: str, fmt: str = "csv", nrows: int = 50) -> pd.DataFrame:
+    """First rows of a written dataset, without loading the whole file."""
+    if fmt == "csv":
+        return pd.read_csv(path, nrows=nrows)
+    pa = require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        batch = next(parquet_file.iter_batches(batch_size=nrows), None)
+        return batch.to_pandas() if batch is not None else parquet_file.schema_arrow.empty_table().to_pandas()
+    reader = pa.ipc.open_file(path)
+    if reader.num_record_batches == 0:
+        return reader.schema.empty_table().to_pandas()
+    return reader.get_batch(0).slice(0, nrows).to_pandas()
@@ -0,0 +1,60 @@
+import os
+from functools import lru_cache
+from typing import Dict
+import numpy as np
+
+from app.helpers.config import FAKER_POOL_DIR, FAKER_POOL_SIZE
+
+# ----------------------------
+# Pre-generated Faker value pools
+# ----------------------------
+POOL_FIELDS = ("company", "name", "phone", "word")
+
+
+def _build_pool(locale: str, seed: int, size: int) -> Dict[str, np.ndarray]:
+    from faker import Faker
+
+    faker = Faker(locale)
+    faker.seed_instance(seed)
+    return {
+        "company": np.array([faker.company() for _ in range(size)]),
+        "name": np.array([faker.name() for _ in range(size)]),
+        "phone": np.array([faker.phone_number() for _ in range(size)]),
+        "word": np.array([faker.word() for _ in range(size)]),
+    }
+
+
+def _derive_fields(pool: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Adds the vectorized string derivations the masters need (domain, email local part)."""
+    company = pool["company"]
+    domain = np.char.add(np.char.lower(np.char.replace(
+        np.char.replace(company, " ", ""), ",", "")), ".com")
+    first_name = np.char.lower(np.char.partition(pool["name"], " ")[:, 0])
+    return pool | {"domain": domain, "first_name": first_name}
+
+
+@lru_cache(maxsize=8)
+def get_faker_pool(locale: str, seed: int, size: int = FAKER_POOL_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Returns per-locale pools of companies, names, phones and words (plus derived fields).
+    Pools are generated once per (locale, seed, size), cached on disk and in-process.
+    """
+    path = os.path.join(FAKER_POOL_DIR, f"{locale}_{seed}_{size}.npz")
+    pool = None
+    if os.path.exists(path):
+        with np.load(path) as data:
+            if set(POOL_FIELDS) <= set(data.files):
+                pool = {k: data[k] for k in POOL_FIELDS}
+    if pool is None:
+        pool = _build_pool(locale, seed, size)
+        os.makedirs(FAKER_POOL_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, **pool)
+        os.replace(tmp_path, path)
+    return _derive_fields(pool)
+
+
+def sample_pool_indices(rng: np.random.Generator, pool: Dict[str, np.ndarray], field: str, n: int) -> np.ndarray:
+    """Random positions into `pool[field]`; index several fields with the same draw to keep them aligned."""
+    return rng.integers(0, len(pool[field]), size=n)
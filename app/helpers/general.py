@@ -1,7 +1,5 @@
-from typing import List
+from typing import Dict, Iterator, List, Tuple
 import numpy as np
-from faker import Faker
-import random
 import uuid
 import pandas as pd
 
@@ -10,11 +8,30 @@ import pandas as pd
 # ----------------------------
 
 
-def set_seed(seed: int, locale=None) -> Faker:
-    np.random.seed(seed)
-    random.seed(seed)
-    Faker.seed(seed)
-    return Faker(locale) if locale else Faker()
+class LazyFaker:
+    """
+    A seeded Faker that is only built (and `faker` only imported) on first use. Generators draw
+    from the pre-built pools in app.helpers.faker_pool, so most runs never touch it.
+    """
+
+    def __init__(self, seed: int, locale=None):
+        self._seed = seed
+        self._locale = locale
+        self._faker = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._faker is None:
+            from faker import Faker
+
+            self._faker = Faker(self._locale) if self._locale else Faker()
+            self._faker.seed_instance(self._seed)
+        return getattr(self._faker, name)
+
+
+def make_faker(seed: int, locale=None) -> LazyFaker:
+    return LazyFaker(seed, locale)
 
 
 def rand_ids(prefix, n) -> List[str]:
@@ -23,3 +40,51 @@ def rand_ids(prefix, n) -> List[str]:
 
 def date_range(start, end, freq):
     return pd.date_range(start=start, end=end, freq=freq)
+
+
+def iter_date_chunks(rng: np.random.Generator, dates: pd.DatetimeIndex, periods_per_chunk: int) -> Iterator[Tuple[np.random.Generator, pd.DatetimeIndex]]:
+    """
+    Splits `dates` into consecutive blocks of `periods_per_chunk` periods, pairing each block with
+    its own child stream spawned from `rng` so a chunk's draws do not depend on how many came before it.
+    """
+    periods_per_chunk = max(1, int(periods_per_chunk))
+    starts = range(0, len(dates), periods_per_chunk)
+    for chunk_rng, lo in zip(rng.spawn(len(starts)), starts):
+        yield chunk_rng, dates[lo:lo + periods_per_chunk]
+
+
+def rand_numeric_ids(rng: np.random.Generator, prefix, n, digits=8) -> np.ndarray:
+    """Draws `n` unique `<prefix>_<digits>` ids in one pass."""
+    low, high = 10 ** (digits - 1), 10 ** digits
+    if n > high - low:
+        raise ValueError(
+            f"Cannot draw {n} unique {digits}-digit ids for '{prefix}'.")
+    ids = np.unique(rng.integers(low, high, size=n, dtype=np.int64))
+    while len(ids) < n:
+        extra = rng.integers(low, high, size=n - len(ids), dtype=np.int64)
+        ids = np.unique(np.concatenate([ids, extra]))
+    rng.shuffle(ids)
+    return np.char.add(f"{prefix}_", ids.astype(str)).astype(object)
+
+
+def rand_regions(rng: np.random.Generator, countries: np.ndarray, regions_map: Dict[str, List[str]]) -> np.ndarray:
+    """Picks a random region for every country in `countries`, one draw per distinct country."""
+    regions = np.empty(len(countries), dtype=object)
+    for country in np.unique(countries):
+        mask = countries == country
+        regions[mask] = rng.choice(
+            regions_map.get(country) or ["Unknown"], size=int(mask.sum()))
+    return regions
+
+
+def rand_dates_between(rng: np.random.Generator, start, end, n=None) -> np.ndarray:
+    """
+    Uniform random dates in the closed interval [start, end] as datetime64[D].
+    `start` / `end` may be scalars or arrays (broadcast element-wise).
+    """
+    start = np.asarray(start, dtype="datetime64[D]")
+    end = np.asarray(end, dtype="datetime64[D]")
+    size = n if n is not None else np.broadcast(start, end).shape
+    span = (end - start).astype(np.int64) + 1
+    offsets = np.floor(rng.uniform(0, 1, size=size) * span).astype(np.int64)
+    return start + offsets.astype("timedelta64[D]")
@@ -0,0 +1,156 @@
+from typing import Callable, Dict
+import numpy as np
+
+# ----------------------------
+# Vectorized identifier kernels (PAN / GSTIN / CIN / LEI)
+# ----------------------------
+# Identifiers are built as (n, width) uint8 matrices of ASCII codes and viewed
+# as fixed-width byte strings, so a whole batch is generated without per-row Python.
+
+LETTERS = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+DIGITS = np.frombuffer(b"0123456789", dtype=np.uint8)
+ALNUM = np.frombuffer(b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)
+
+CIN_OWNERSHIP_MAP: Dict[str, str] = {
+    "Private Limited": "PTC",
+    "Public Limited": "PLC",
+    "LLP": "LLP",
+    "Proprietor": "PRT",
+    "Government": "GOV",
+    "NGO": "NGO"
+}
+
+
+def _random_codes(rng: np.random.Generator, alphabet: np.ndarray, n: int, k: int) -> np.ndarray:
+    return alphabet[rng.integers(0, len(alphabet), size=(n, k))]
+
+
+def _digit_codes(values: np.ndarray, width: int) -> np.ndarray:
+    """Zero-padded decimal digits of `values` as an (n, width) code matrix."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return ((np.asarray(values, dtype=np.int64)[:, None] // powers) % 10 + 48).astype(np.uint8)
+
+
+def _lookup_codes(labels: np.ndarray, width: int, to_code: Callable[[str], str]) -> np.ndarray:
+    """Maps each distinct label once through `to_code` and broadcasts the result back to rows."""
+    uniques, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    table = np.array([to_code(u).encode("ascii")[:width].ljust(width, b"X")
+                     for u in uniques], dtype=f"S{width}")
+    return table.view(np.uint8).reshape(-1, width)[inverse]
+
+
+def _to_strings(codes: np.ndarray) -> np.ndarray:
+    codes = np.ascontiguousarray(codes, dtype=np.uint8)
+    return codes.view(f"S{codes.shape[1]}").ravel().astype(str)
+
+
+def _make_unique(codes: np.ndarray, redraw: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Redraws rows (selected by a boolean mask) that duplicate an earlier row until the batch is collision-free."""
+    while True:
+        keys = np.ascontiguousarray(codes).view(f"S{codes.shape[1]}").ravel()
+        _, first = np.unique(keys, return_index=True)
+        dup = np.ones(len(keys), dtype=bool)
+        dup[first] = False
+        if not dup.any():
+            return codes
+        codes[dup] = redraw(dup)
+
+
+def _alnum_values(codes: np.ndarray) -> np.ndarray:
+    """Base-36 value of each ASCII code (0-9 -> 0-9, A-Z -> 10-35)."""
+    codes = codes.astype(np.int64)
+    return np.where(codes >= 65, codes - 55, codes - 48)
+
+
+# ----------------------------
+# Check characters
+# ----------------------------
+def gstin_check_codes(body: np.ndarray) -> np.ndarray:
+    """GSTIN check character for each 14-char body (mod-36 weighted sum, weights 1/2 alternating)."""
+    values = _alnum_values(body)
+    weights = np.where(np.arange(body.shape[1]) % 2 == 0, 1, 2)
+    products = values * weights
+    total = (products // 36 + products % 36).sum(axis=1)
+    return ALNUM[(36 - total % 36) % 36]
+
+
+def lei_check_codes(body: np.ndarray) -> np.ndarray:
+    """ISO 17442 / ISO 7064 MOD 97-10 check digits for each 18-char LEI body, as (n, 2) codes."""
+    values = _alnum_values(body)
+    rem = np.zeros(len(body), dtype=np.int64)
+    for j in range(body.shape[1]):
+        v = values[:, j]
+        rem = np.where(v >= 10, rem * 100 + v, rem * 10 + v) % 97
+    check = 98 - (rem * 100) % 97
+    return _digit_codes(check, 2)
+
+
+# ----------------------------
+# Batch generators
+# ----------------------------
+def batch_pan(rng: np.random.Generator, n: int, unique: bool = True) -> np.ndarray:
+    """`n` PANs: 5 letters, 4 digits, 1 letter."""
+    def draw(m):
+        return np.hstack([_random_codes(rng, LETTERS, m, 5), _random_codes(rng, DIGITS, m, 4), _random_codes(rng, LETTERS, m, 1)])
+    codes = draw(n)
+    if unique:
+        codes = _make_unique(codes, lambda mask: draw(int(mask.sum())))
+    return _to_strings(codes)
+
+
+def batch_gstin(rng: np.random.Generator, pans: np.ndarray, state_codes: np.ndarray | None = None) -> np.ndarray:
+    """
+    15-char GSTINs: <2-digit-state><PAN><entity-no><Z><check-char>, with a valid check character.
+    Unique whenever the PANs are unique.
+    """
+    n = len(pans)
+    if state_codes is None:
+        state_codes = rng.integers(1, 39, size=n)
+    pan_codes = np.asarray(pans, dtype="S10").view(np.uint8).reshape(n, 10)
+    entity = ALNUM[rng.integers(1, 4, size=(n, 1))]
+    body = np.hstack([_digit_codes(state_codes, 2), pan_codes,
+                     entity, np.full((n, 1), ord("Z"), dtype=np.uint8)])
+    return _to_strings(np.hstack([body, gstin_check_codes(body)[:, None]]))
+
+
+def _cin_region_code(region: str) -> str:
+    region_alpha = "".join([c for c in (region or "") if c.isascii() and c.isalpha()][:2]).upper()
+    return region_alpha if len(region_alpha) == 2 else "XX"
+
+
+def batch_cin(rng: np.random.Generator, listing_chars: np.ndarray, regions: np.ndarray, business_types: np.ndarray,
+              reg_dates: np.ndarray, unique: bool = True) -> np.ndarray:
+    """
+    Synthetic CINs following the pattern:
+    <L/U><5-digit-industry><2-char-region-approx><4-digit-year><3-char-ownership><6-digit-regno>
+    - Not validating against MCA; just following the pattern for synthetic realism.
+    """
+    n = len(listing_chars)
+    years = np.asarray(reg_dates, dtype="datetime64[Y]").astype(np.int64) + 1970
+    fixed = np.hstack([
+        np.asarray(listing_chars, dtype="S1").view(np.uint8).reshape(n, 1),
+        _digit_codes(rng.integers(10000, 100000, size=n), 5),
+        _lookup_codes(regions, 2, _cin_region_code),
+        _digit_codes(years, 4),
+        _lookup_codes(business_types, 3,
+                      lambda b: CIN_OWNERSHIP_MAP.get(b, "PTC")),
+    ])
+
+    def draw(m):
+        return _digit_codes(rng.integers(1, 1000000, size=m), 6)
+    codes = np.hstack([fixed, draw(n)])
+    if unique:
+        codes = _make_unique(codes, lambda mask: np.hstack(
+            [fixed[mask], draw(int(mask.sum()))]))
+    return _to_strings(codes)
+
+
+def batch_lei(rng: np.random.Generator, n: int, unique: bool = True) -> np.ndarray:
+    """20-char LEIs: 18 alphanumeric characters plus valid MOD 97-10 check digits."""
+    def draw(m):
+        body = _random_codes(rng, ALNUM, m, 18)
+        return np.hstack([body, lei_check_codes(body)])
+    codes = draw(n)
+    if unique:
+        codes = _make_unique(codes, lambda mask: draw(int(mask.sum())))
+    return _to_strings(codes)
@@ -5,6 +5,7 @@ import pandas as pd
 from typing import cast, List
 
 from app.helpers.config import PROFILE_CONFIG, PROFILES_DIR, STATE_CONFIG
+from app.helpers.profile_loader import read_profile
 from app.types import TProfileConfig
 
 
@@ -35,9 +36,7 @@ def list_profiles() -> List[str]:
 
 
 def load_profile(fname: str) -> None:
-    path = os.path.join(PROFILES_DIR, fname)
-    with open(path) as fh:
-        payload = json.load(fh)
+    payload = read_profile(os.path.join(PROFILES_DIR, fname))
     for prof_item in PROFILE_CONFIG:
         state_key, json_key, alt_result = prof_item
         if state_key in ['key_start_date', 'key_end_date']:
@@ -0,0 +1,41 @@
+import os
+import json
+from typing import cast
+import pandas as pd
+
+from app.helpers.config import PROFILES_DIR, STATE_CONFIG
+from app.types import TAppStateConfig
+
+# ----------------------------
+# Streamlit-free profile loading
+# ----------------------------
+
+
+def resolve_profile_path(name_or_path: str) -> str:
+    """Accepts a path to a profile JSON, or the bare name of a profile saved under PROFILES_DIR."""
+    if os.path.isfile(name_or_path):
+        return name_or_path
+    fname = name_or_path if name_or_path.endswith('.json') else f"{name_or_path}.json"
+    path = os.path.join(PROFILES_DIR, fname)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Profile '{name_or_path}' not found.")
+    return path
+
+
+def read_profile(path: str) -> dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def state_config_from_profile(payload: dict) -> TAppStateConfig:
+    """
+    Builds the same state config the UI hands to the generators, straight from a profile payload.
+    Keys missing from the profile fall back to the app defaults.
+    """
+    config = {}
+    for state_key, json_key, alt_result in STATE_CONFIG:
+        value = payload.get(json_key, alt_result)
+        if state_key in ['key_start_date', 'key_end_date']:
+            value = pd.to_datetime(value).strftime('%Y-%m-%d')
+        config[json_key] = value
+    return cast(TAppStateConfig, config)
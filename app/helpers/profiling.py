@@ -0,0 +1,176 @@
+import cProfile
+import json
+import os
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from app.types import TStageRecord
+
+# ----------------------------
+# Per-stage run instrumentation
+# ----------------------------
+# A StageProfiler records one entry per stage of a generation run: each generator call,
+# each custom column and each scenario (plus the scenario plan's deferred write-back).
+# Entries carry wall / CPU time, rows produced, the stage's peak traced memory above what
+# was live when it started, and the size of what it produced. One stage can additionally
+# be run under cProfile and dumped as a .prof file (open with pstats or snakeviz).
+# Profilers only hold plain data, so worker processes fill a `child()` and send its
+# records back to be merged.
+
+
+class _Stage:
+    def __init__(self, record: TStageRecord):
+        self.record = record
+        self.discarded = False
+
+    def discard(self):
+        """Drops the record (e.g. the final, empty pull from an exhausted chunk iterator)."""
+        self.discarded = True
+
+    def output(self, value):
+        """Records rows and size of what the stage produced (frame, series, array or list)."""
+        if isinstance(value, pd.DataFrame):
+            self.record["rows"] = len(value)
+            self.record["output_mb"] = float(value.memory_usage(deep=True).sum()) / 2**20
+        elif isinstance(value, pd.Series):
+            self.record["rows"] = len(value)
+            self.record["output_mb"] = float(value.memory_usage(deep=True)) / 2**20
+        elif isinstance(value, np.ndarray):
+            self.record["rows"] = len(value) if value.ndim else 1
+            self.record["output_mb"] = value.nbytes / 2**20
+        elif hasattr(value, "__len__"):
+            self.record["rows"] = len(value)
+
+
+class _NullStage:
+    def output(self, value):
+        pass
+
+    def discard(self):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage_key(kind: str, dataset: str, name: str | None = None) -> str:
+    """'generator:Revenue_Invoices', 'custom_column:Revenue_Invoices:Margin', 'scenario:Purchases:0:shock', ..."""
+    return ":".join(p for p in (kind, dataset, name) if p is not None)
+
+
+def scenario_stage_name(position: int, sc: dict) -> str:
+    return f"{position}:{sc.get('name') or sc['type']}"
+
+
+def run_stage_keys(datasets: List[str], custom_columns: dict, scenarios: list) -> List[str]:
+    """Keys of the stages a run over `datasets` will record, for picking one to cProfile."""
+    keys = [stage_key("generator", ds) for ds in datasets]
+    keys += [stage_key("custom_column", ds, col) for ds in datasets for col, _ in custom_columns.get(ds, [])]
+    keys += [stage_key("scenario", sc.get("target_dataset"), scenario_stage_name(i, sc))
+             for i, sc in enumerate(scenarios) if sc.get("target_dataset") in datasets]
+    return keys
+
+
+class StageProfiler:
+    def __init__(self, memory: bool = True, profile_stage: str | None = None, profile_dir: str | None = None):
+        self.memory = memory
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.records: List[TStageRecord] = []
+
+    def child(self) -> "StageProfiler":
+        """Empty profiler with the same settings, for a worker process."""
+        return StageProfiler(self.memory, self.profile_stage, self.profile_dir)
+
+    def merge(self, records: List[TStageRecord]):
+        self.records.extend(records)
+
+    @contextmanager
+    def stage(self, kind: str, dataset: str, name: str | None = None, chunk: int | None = None) -> Iterator[_Stage]:
+        key = stage_key(kind, dataset, name)
+        record: TStageRecord = {"stage": key, "kind": kind, "dataset": dataset, "name": name, "chunk": chunk,
+                                "wall_s": 0.0, "cpu_s": 0.0, "rows": None, "peak_mb": None, "output_mb": None,
+                                "profile_path": None}
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            live_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile_stage == key and chunk in (None, 0) else None
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        stage = _Stage(record)
+        try:
+            yield stage
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            if self.memory:
+                record["peak_mb"] = max(
+                    tracemalloc.get_traced_memory()[1] - live_before, 0) / 2**20
+            if tracing:
+                tracemalloc.stop()
+            if profiler is not None and not stage.discarded:
+                record["profile_path"] = self._dump(profiler, key)
+            if not stage.discarded:
+                self.records.append(record)
+
+    def _dump(self, profiler: cProfile.Profile, key: str) -> str:
+        out_dir = self.profile_dir or os.getcwd()
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, re.sub(r"[^\w.-]+", "_", key) + ".prof")
+        profiler.dump_stats(path)
+        return path
+
+    def summary(self) -> List[dict]:
+        """Stages aggregated over streamed chunks, slowest first."""
+        rows: Dict[str, dict] = {}
+        for r in self.records:
+            s = rows.setdefault(r["stage"], {"stage": r["stage"], "kind": r["kind"], "dataset": r["dataset"],
+                                             "name": r["name"], "calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                             "rows": None, "peak_mb": None, "output_mb": None})
+            s["calls"] += 1
+            s["wall_s"] += r["wall_s"]
+            s["cpu_s"] += r["cpu_s"]
+            if r["rows"] is not None:
+                s["rows"] = (s["rows"] or 0) + r["rows"]
+            if r["output_mb"] is not None:
+                s["output_mb"] = (s["output_mb"] or 0.0) + r["output_mb"]
+            if r["peak_mb"] is not None:
+                s["peak_mb"] = max(s["peak_mb"] or 0.0, r["peak_mb"])
+        return sorted(rows.values(), key=lambda s: -s["wall_s"])
+
+    def report(self) -> dict:
+        return {
+            "total_wall_s": sum(r["wall_s"] for r in self.records),
+            "profiled_stage": self.profile_stage,
+            "summary": self.summary(),
+            "stages": self.records,
+        }
+
+    def write_report(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=2, default=float)
+
+
+@contextmanager
+def profile_stage(profiler: StageProfiler | None, kind: str, dataset: str, name: str | None = None,
+                  chunk: int | None = None) -> Iterator[_Stage]:
+    """`profiler.stage(...)`, or a no-op when profiling is off."""
+    if profiler is None:
+        yield _NULL_STAGE
+    else:
+        with profiler.stage(kind, dataset, name, chunk) as stage:
+            yield stage
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, List, TypedDict
+
+from app.types import TIndustryConfig
+
+# ----------------------------
+# Precompiled reference data
+# ----------------------------
+# The industry KPI templates (static/industries.json) and the country -> provinces map
+# (from countryinfo, which reads one JSON file per country) are compiled into a single
+# artifact so startup, and every worker process, loads them with one read:
+#   python -m app.helpers.reference_data
+# The artifact records the size and mtime of the industries.json it was built from, so the
+# usual startup is that one read plus a stat. Only when those differ (an edit, or just a fresh
+# checkout) is industries.json read and compared by content hash; if the content changed too,
+# the data is built in memory instead (importing countryinfo) and nothing is written: only the
+# build step above updates the artifact.
+
+REFERENCE_DATA_VERSION = 2
+
+
+class TReferenceData(TypedDict):
+    version: int
+    industries_sha256: str
+    industries_stat: List[int]
+    industries: Dict[str, TIndustryConfig]
+    regions: Dict[str, List[str]]
+
+
+def _read_industries(industries_path: str) -> dict:
+    with open(industries_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def industries_digest(industries: dict) -> str:
+    """Hash of the parsed templates, so line endings or formatting of the file do not count as changes."""
+    canonical = json.dumps(industries, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def industries_stat(industries_path: str) -> List[int] | None:
+    """[size, mtime_ns] of the templates file: a cheap check that it is the one the artifact was built from."""
+    try:
+        st = os.stat(industries_path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def build_reference_data(industries_path: str) -> TReferenceData:
+    from app.helpers.countries import get_country_states_dict
+
+    industries = _read_industries(industries_path)
+    return {"version": REFERENCE_DATA_VERSION, "industries_sha256": industries_digest(industries),
+            "industries_stat": industries_stat(industries_path), "industries": industries,
+            "regions": get_country_states_dict()}
+
+
+def write_reference_data(data: TReferenceData, path: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _read_artifact(path: str) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def load_reference_data(path: str, industries_path: str) -> TReferenceData:
+    """The compiled artifact, or the data built in memory if the artifact is missing or out of date."""
+    data = _read_artifact(path)
+    if data is None or data.get("version") != REFERENCE_DATA_VERSION:
+        return build_reference_data(industries_path)
+    if data.get("industries_stat") == industries_stat(industries_path):
+        return data
+    # Size or mtime differ, which a checkout alone causes: only a content change counts
+    if data.get("industries_sha256") == industries_digest(_read_industries(industries_path)):
+        return data
+    return build_reference_data(industries_path)
+
+
+def main() -> int:
+    from app.helpers.config import INDUSTRY_KPIS_DIR, REFERENCE_DATA_DIR
+
+    write_reference_data(build_reference_data(INDUSTRY_KPIS_DIR), REFERENCE_DATA_DIR)
+    print(f"Reference data -> {REFERENCE_DATA_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
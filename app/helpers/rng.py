@@ -0,0 +1,66 @@
+import random
+import zlib
+import numpy as np
+
+from app.types import TAppStateConfig
+
+# ----------------------------
+# Independent random streams
+# ----------------------------
+# Every dataset, scenario and custom column draws from its own PCG64 stream derived
+# from (seed, *keys) through np.random.SeedSequence. Streams never touch the global
+# np.random / random state, so results do not depend on call order or scheduling.
+
+
+def _key_int(key) -> int:
+    # crc32 is stable across processes (unlike hash(), which is salted per interpreter)
+    return zlib.crc32(str(key).encode("utf-8"))
+
+
+def stream_seed_sequence(seed: int, *keys) -> np.random.SeedSequence:
+    """SeedSequence for the stream identified by `keys` under the root `seed`."""
+    return np.random.SeedSequence(entropy=int(seed), spawn_key=tuple(_key_int(k) for k in keys))
+
+
+def make_rng(seed: int, *keys) -> np.random.Generator:
+    return np.random.Generator(np.random.PCG64(stream_seed_sequence(seed, *keys)))
+
+
+def dataset_rng(state_config: TAppStateConfig, dataset: str) -> np.random.Generator:
+    return make_rng(state_config["seed"], "dataset", dataset)
+
+
+def _chunk_keys(chunk: int | None) -> tuple:
+    # Whole-dataset runs keep their original stream; streamed chunks each get a sub-stream
+    return () if chunk is None else ("chunk", chunk)
+
+
+def scenario_rng(seed: int, position: int, scenario: dict, chunk: int | None = None) -> np.random.Generator:
+    """Stream for the scenario at `position`; a scenario-level 'seed' overrides the root seed."""
+    return make_rng(scenario.get("seed", seed), "scenario", position, scenario.get("type"), scenario.get("target_dataset"),
+                    *_chunk_keys(chunk))
+
+
+def custom_column_rng(seed: int, dataset: str, column: str, chunk: int | None = None) -> np.random.Generator:
+    return make_rng(seed, "custom_column", dataset, column, *_chunk_keys(chunk))
+
+
+class SeededNumpy:
+    """
+    Stand-in for the `np` module inside formulas: everything resolves to numpy,
+    except `np.random`, which is a RandomState bound to the caller's stream.
+    """
+
+    def __init__(self, rng: np.random.Generator):
+        self.random = np.random.RandomState(rng.bit_generator)
+
+    def __getattr__(self, name):
+        return getattr(np, name)
+
+
+def seeded_modules(rng: np.random.Generator) -> dict:
+    """`np` / `random` replacements for formula evaluation, both drawing from `rng`."""
+    return {
+        "np": SeededNumpy(rng),
+        "random": random.Random(int(rng.integers(0, 2**63))),
+    }
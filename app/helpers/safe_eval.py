@@ -1,9 +1,13 @@
 import pandas as pd
 import numpy as np
 import ast
+from functools import lru_cache
 import math
 import random
 
+from app.helpers.compaction import widen_numeric
+from app.helpers.window_functions import WINDOW_FUNCTIONS
+
 
 # ----------------------------
 # AST-based validation (restricts constructs)
@@ -17,15 +21,20 @@ ALLOWED_MODULES = {
 
 
 class VectorSafeVisitor(ast.NodeVisitor):
-    """Allow arithmetic, calls, names, attributes (only for allowed modules), subscript, tuples, lists."""
+    """
+    Allow arithmetic, comparisons, conditionals, calls (incl. keyword arguments and the window
+    functions), names, attributes (only for allowed modules), subscript, tuples, lists.
+    """
     ALLOWED_NODES = (
         ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Div, ast.Name, ast.Mult, ast.Add, ast.Sub,
-        ast.Load, ast.Call, ast.Attribute, ast.Subscript, ast.Index, ast.Slice,
-        ast.Tuple, ast.List, ast.Dict, ast.BoolOp, ast.Compare, ast.IfExp
+        ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd, ast.Not,
+        ast.Load, ast.Call, ast.keyword, ast.Attribute, ast.Subscript, ast.Index, ast.Slice,
+        ast.Tuple, ast.List, ast.Dict, ast.BoolOp, ast.And, ast.Or, ast.Compare, ast.IfExp,
+        ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn
     )
 
     def __init__(self, allowed_names):
-        self.allowed_names = set(allowed_names) | set(ALLOWED_MODULES.keys())
+        self.allowed_names = set(allowed_names) | set(ALLOWED_MODULES.keys()) | set(WINDOW_FUNCTIONS)
 
     def generic_visit(self, node):
         if not isinstance(node, self.ALLOWED_NODES):
@@ -53,44 +62,222 @@ class VectorSafeVisitor(ast.NodeVisitor):
 
 
 def validate_formula_ast(expr, allowed_names):
-    node = ast.parse(expr, mode="eval")
-    visitor = VectorSafeVisitor(allowed_names)
-    visitor.visit(node)
+    compile_formula(expr, frozenset(allowed_names))
     return True
 
+
 # ----------------------------
-# Vectorized formula evaluation
+# Compiled formula cache
 # ----------------------------
+# Each expression is parsed, structurally validated and compiled once per process; the
+# column-name check is cached per (expression, column set). Repeated generations and
+# row-wise fallbacks reuse the same code object.
+
+class FormulaScanner(VectorSafeVisitor):
+    """Structural validation that records referenced names instead of checking them."""
+
+    def __init__(self):
+        super().__init__(())
+        self.names = set()
+
+    def visit_Name(self, node):
+        self.names.add(node.id)
+        ast.NodeVisitor.generic_visit(self, node)
+
+
+# math functions with an elementwise numpy equivalent (name in numpy when it differs)
+MATH_TO_NUMPY = {
+    "fabs": "fabs", "floor": "floor", "ceil": "ceil", "trunc": "trunc", "sqrt": "sqrt", "exp": "exp",
+    "expm1": "expm1", "log1p": "log1p", "log10": "log10", "log2": "log2", "pow": "power",
+    "sin": "sin", "cos": "cos", "tan": "tan", "asin": "arcsin", "acos": "arccos", "atan": "arctan",
+    "atan2": "arctan2", "sinh": "sinh", "cosh": "cosh", "tanh": "tanh", "hypot": "hypot",
+    "degrees": "degrees", "radians": "radians", "copysign": "copysign",
+    "isnan": "isnan", "isinf": "isinf", "isfinite": "isfinite",
+}
+
 
+def _np_attr(func: str) -> ast.Attribute:
+    return ast.Attribute(value=ast.Name(id="np", ctx=ast.Load()), attr=func, ctx=ast.Load())
 
-def vectorized_eval(expr: str, df: pd.DataFrame):
+
+def _np_call(func: str, *args) -> ast.Call:
+    return ast.Call(func=_np_attr(func), args=list(args), keywords=[])
+
+
+class VectorizeTransformer(ast.NodeTransformer):
     """
-    Try to evaluate expr in a vectorized manner by providing numpy arrays for columns.
-    If it fails (due to uses of Python-only constructs), raise an Exception so caller can fallback.
+    Rewrites scalar-only constructs into elementwise numpy calls: conditionals become np.where,
+    boolean operators and chained comparisons become logical ufuncs, `in` becomes np.isin and
+    math.* functions map to their numpy counterparts. `changed` records whether anything was rewritten.
     """
-    allowed_names = list(df.columns)
-    validate_formula_ast(expr, allowed_names)
 
-    local_vars = {c: df[c].to_numpy() for c in df.columns} | ALLOWED_MODULES
+    def __init__(self):
+        self.changed = False
+
+    def _rewrite(self, node):
+        self.changed = True
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return self._rewrite(_np_call("where", node.test, node.body, node.orelse))
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        func = "logical_and" if isinstance(node.op, ast.And) else "logical_or"
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = _np_call(func, result, value)
+        return self._rewrite(result)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._rewrite(_np_call("logical_not", node.operand))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1 and not isinstance(node.ops[0], (ast.In, ast.NotIn)):
+            return node
+        parts, left = [], node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, ast.In):
+                parts.append(_np_call("isin", left, right))
+            elif isinstance(op, ast.NotIn):
+                parts.append(_np_call("logical_not", _np_call("isin", left, right)))
+            else:
+                parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        result = parts[0]
+        for part in parts[1:]:
+            result = _np_call("logical_and", result, part)
+        return self._rewrite(result)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "math":
+            if func.attr == "log" and len(node.args) == 2 and not node.keywords:
+                return self._rewrite(ast.BinOp(left=_np_call("log", node.args[0]), op=ast.Div(),
+                                               right=_np_call("log", node.args[1])))
+            if func.attr == "log" and len(node.args) == 1:
+                return self._rewrite(_np_call("log", *node.args))
+            if func.attr in MATH_TO_NUMPY:
+                return self._rewrite(ast.Call(func=_np_attr(MATH_TO_NUMPY[func.attr]),
+                                              args=node.args, keywords=node.keywords))
+        return node
+
+
+class CompiledFormula:
+    def __init__(self, expr: str, code, names: frozenset, vectorized=None):
+        self.expr = expr
+        self.code = code
+        self.names = names  # referenced columns and window functions (module names excluded)
+        self.vectorized = vectorized  # code with scalar-only constructs rewritten, None when nothing changed
+
 
+@lru_cache(maxsize=1024)
+def _parse_formula(expr: str) -> CompiledFormula:
+    node = ast.parse(expr, mode="eval")
+    scanner = FormulaScanner()
+    scanner.visit(node)
+    names = frozenset(scanner.names - set(ALLOWED_MODULES))
+    code = compile(node, '<formula>', 'eval')
+
+    # Validation runs on the user's expression; the rewrite only introduces np.* calls
+    transformer = VectorizeTransformer()
+    rewritten = ast.fix_missing_locations(transformer.visit(node))
+    vectorized = compile(rewritten, '<vec_formula>', 'eval') if transformer.changed else None
+    return CompiledFormula(expr, code, names, vectorized)
+
+
+@lru_cache(maxsize=4096)
+def compile_formula(expr: str, columns: frozenset) -> CompiledFormula:
+    """Validated, compiled `expr` for a frame with `columns`; raises ValueError like the validator."""
+    formula = _parse_formula(expr)
+    for name in sorted(formula.names):
+        if name not in columns and name not in WINDOW_FUNCTIONS:
+            raise ValueError(
+                f"Use of name '{name}' is not allowed in formulas.")
+    return formula
+
+
+def formula_names(expr: str) -> frozenset:
+    """Column (and window function) names referenced by `expr` (empty when it does not parse or validate)."""
     try:
-        # Evaluate safely (no builtins)
-        result = eval(compile(ast.parse(expr, mode="eval"), '<vec_expr>', 'eval'), {
-                      "__builtins__": None}, local_vars)
-    except Exception as e:
-        raise
+        return _parse_formula(expr).names
+    except (SyntaxError, ValueError):
+        return frozenset()
+
+
+def uses_window_functions(expr: str) -> bool:
+    return not formula_names(expr).isdisjoint(WINDOW_FUNCTIONS)
+
+
+def run_formula(formula: CompiledFormula, local_vars: dict, vectorized: bool = False):
+    # Evaluate safely (no builtins)
+    return eval(formula.vectorized if vectorized else formula.code, {"__builtins__": None}, local_vars)
+
+# ----------------------------
+# Vectorized formula evaluation
+# ----------------------------
+
 
-    if hasattr(result, '__len__') and not isinstance(result, (str, bytes)) and len(result) == len(df):
+def formula_result(result, n: int) -> pd.Series:
+    if hasattr(result, '__len__') and not isinstance(result, (str, bytes)) and len(result) == n:
         return pd.Series(result)
     else:  # Handle scalar result
-        return pd.Series([result] * len(df))
+        return pd.Series([result] * n)
+
+
+def formula_column(s: pd.Series) -> np.ndarray:
+    """A column as formulas see it: compacted integers are widened back to 64-bit so arithmetic cannot wrap."""
+    return widen_numeric(s).to_numpy()
+
+
+def _formula_columns(formula: CompiledFormula, df: pd.DataFrame, columns: dict | None) -> dict:
+    # Columns shadow window functions of the same name
+    columns = columns or {}
+    return {c: columns[c] if c in columns else formula_column(df[c]) for c in formula.names if c in df.columns}
+
+
+def vectorized_eval(expr: str, df: pd.DataFrame, modules: dict | None = None, columns: dict | None = None,
+                    rewrite: bool = False):
+    """
+    Try to evaluate expr in a vectorized manner by providing numpy arrays for columns.
+    If it fails (due to uses of Python-only constructs), raise an Exception so caller can fallback.
+    `modules` overrides entries of ALLOWED_MODULES (e.g. seeded `np` / `random` from app.helpers.rng).
+    `columns` optionally supplies already-extracted column arrays, shared across formulas.
+    `rewrite` evaluates the numpy rewrite of the expression (see VectorizeTransformer); both branches
+    of a conditional are computed, so floating-point warnings from the discarded side are silenced.
+    """
+    formula = compile_formula(expr, frozenset(df.columns))
+    if rewrite and formula.vectorized is None:
+        raise ValueError("Formula has no vectorizable rewrite.")
+    local_vars = WINDOW_FUNCTIONS | _formula_columns(formula, df, columns) | ALLOWED_MODULES | (modules or {})
+    if rewrite:
+        with np.errstate(all="ignore"):
+            return formula_result(run_formula(formula, local_vars, vectorized=True), len(df))
+    return formula_result(run_formula(formula, local_vars), len(df))
 
 # ----------------------------
 # Safe fallback row-wise evaluator
 # ----------------------------
 
 
-def rowwise_safe_eval(expr: str, row: dict):
-    validate_formula_ast(expr, list(row.keys()))
-    local_vars = row | ALLOWED_MODULES
-    return eval(compile(ast.parse(expr, mode="eval"), '<row_expr>', 'eval'), {"__builtins__": None}, local_vars)
+def rowwise_safe_eval(expr: str, row: dict, modules: dict | None = None):
+    formula = compile_formula(expr, frozenset(row.keys()))
+    local_vars = WINDOW_FUNCTIONS | row | ALLOWED_MODULES | (modules or {})
+    return run_formula(formula, local_vars)
+
+
+def rowwise_frame_eval(expr: str, df: pd.DataFrame, modules: dict | None = None) -> list:
+    """Last resort: evaluates `expr` once per row, binding only the columns it references."""
+    formula = compile_formula(expr, frozenset(df.columns))
+    names = sorted(n for n in formula.names if n in df.columns)
+    env = ALLOWED_MODULES | (modules or {})
+    if not names:
+        return [run_formula(formula, WINDOW_FUNCTIONS | env) for _ in range(len(df))]
+    # Series.tolist boxes values the way to_dict(orient='records') does (Timestamps, Python scalars)
+    return [run_formula(formula, WINDOW_FUNCTIONS | dict(zip(names, values)) | env) for values in zip(*(df[c].tolist() for c in names))]
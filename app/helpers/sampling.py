@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Weighted integer sampling
+# ----------------------------
+# Weights are turned into a cumulative table once; every batch is then one vectorized
+# searchsorted over uniform draws, so drawing n codes costs O(n log k) no matter how
+# often it happens, with none of rng.choice's per-call validation of `p`.
+
+
+class WeightedSampler:
+    """Draws integer codes 0..k-1 in proportion to fixed, non-negative weights."""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0:
+            raise ValueError("Weights must be a non-empty 1-D sequence.")
+        if not np.isfinite(weights).all() or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("Weights must be finite, non-negative and not all zero.")
+        cdf = np.cumsum(weights)
+        self.cdf = cdf / cdf[-1]
+        self.cdf[-1] = 1.0  # no rounding gap above the last code
+
+    def __len__(self):
+        return len(self.cdf)
+
+    @property
+    def probabilities(self) -> np.ndarray:
+        return np.diff(self.cdf, prepend=0.0)
+
+    def draw(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        # side="right" skips zero-weight codes, whose cdf step is empty
+        return np.searchsorted(self.cdf, rng.random(size), side="right")
+
+
+class CategoricalSampler(WeightedSampler):
+    """
+    Draws from a fixed set of values, as integer codes, as a pandas Categorical built straight
+    from the codes, or as the values themselves. Without weights every value is equally likely.
+    """
+
+    def __init__(self, values, weights=None):
+        values = np.asarray(values)
+        if values.dtype.kind in "USO":
+            values = values.astype(object)
+        if len(set(values.tolist())) != len(values):
+            raise ValueError("Values must be distinct.")
+        self.uniform = weights is None
+        weights = np.ones(len(values)) if weights is None else weights
+        if len(weights) != len(values):
+            raise ValueError(f"Got {len(weights)} weight(s) for {len(values)} value(s).")
+        super().__init__(weights)
+        self.values = values
+        self.dtype = pd.CategoricalDtype(values)
+
+    def draw(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.uniform:
+            # uniform codes come straight from rng.integers (the stream rng.choice(values, size) uses)
+            return rng.integers(0, len(self), size=size)
+        return super().draw(rng, size)
+
+    def categorical(self, rng: np.random.Generator, size: int) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.draw(rng, size), dtype=self.dtype)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return self.values[self.draw(rng, size)]
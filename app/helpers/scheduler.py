@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Tuple
+import pandas as pd
+
+from app.generators import generator_config, generator_inputs, generator_schemas
+from app.helpers.compaction import compact_dataset
+from app.helpers.custom_columns import apply_custom_columns_vectorized
+from app.helpers.dataset_cache import DatasetCache, dataset_fingerprints
+from app.helpers.general import make_faker
+from app.helpers.profiling import StageProfiler, profile_stage
+from app.helpers.rng import dataset_rng
+from app.types import TAppStateConfig
+
+# ----------------------------
+# Dependency-aware generator scheduling
+# ----------------------------
+
+
+def run_dataset(dskey: str, state_config: TAppStateConfig, inputs: Dict[str, pd.DataFrame],
+                base: pd.DataFrame | None = None,
+                profiler: StageProfiler | None = None) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+    """
+    Generates one dataset from its declared inputs, compacted to its schema, then adds its custom columns.
+    Pass a previously generated `base` to only redo the custom columns.
+    Module-level and Streamlit-free so it can run in a worker process; returns (base, frame, warnings).
+    """
+    seed = state_config["seed"]
+    schema = generator_schemas.get(dskey)
+    if base is None:
+        faker = make_faker(seed, locale=state_config["faker_locale"])
+        with profile_stage(profiler, "generator", dskey) as stage:
+            base = generator_config[dskey](
+                state_config, faker, inputs, dataset_rng(state_config, dskey))
+            stage.output(base)
+        base = compact_dataset(base, schema)
+
+    warnings: List[str] = []
+    custom_columns = state_config["custom_columns"].get(dskey, [])
+    if not custom_columns or base.empty:
+        return base, base, warnings
+    df = apply_custom_columns_vectorized(
+        base, dskey, custom_columns, seed, on_warning=warnings.append, profiler=profiler)
+    new_cols = [col for col, _ in custom_columns if col in df.columns]
+    df[new_cols] = compact_dataset(df[new_cols], schema, custom_columns)
+    return base, df, warnings
+
+
+def _run_dataset_profiled(dskey: str, state_config: TAppStateConfig, inputs: Dict[str, pd.DataFrame],
+                          profiler: StageProfiler):
+    """Worker-side run_dataset; the stage records travel back with the result."""
+    return run_dataset(dskey, state_config, inputs, profiler=profiler), profiler.records
+
+
+def dataset_dependencies(datasets: List[str]) -> Dict[str, List[str]]:
+    """Inputs of each selected dataset, restricted to datasets that are also selected."""
+    return {ds: [d for d in generator_inputs.get(ds, []) if d in datasets] for ds in datasets}
+
+
+def run_generators(state_config: TAppStateConfig, datasets: List[str], max_workers: int | None = None,
+                   on_dataset_done: Callable[[str], None] | None = None,
+                   cache: DatasetCache | None = None,
+                   profiler: StageProfiler | None = None) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+    """
+    Runs the selected generators as a DAG: independent datasets run concurrently on a
+    process pool and each dependant is submitted as soon as its inputs are finished.
+    With max_workers=1 everything runs in-process, in dependency order.
+
+    With a `cache`, datasets whose fingerprint is unchanged are reused as-is, datasets whose
+    only change is their custom columns are finished from the cached generator output, and
+    only the rest (plus everything downstream of them) is regenerated.
+    A `profiler` records every generator and custom-column stage, including those run in workers.
+    Returns the frames (in generator_config order) and any warnings raised along the way.
+    """
+    datasets = [ds for ds in generator_config if ds in datasets]
+    deps = dataset_dependencies(datasets)
+    fps = dataset_fingerprints(state_config, datasets, deps) if cache is not None else {}
+    generated: Dict[str, pd.DataFrame] = {}
+    warnings: List[str] = []
+
+    def _finish(dskey, result):
+        base, df, ds_warnings = result
+        if cache is not None:
+            cache.put(fps[dskey]["base"], base)
+            cache.put(fps[dskey]["final"], df)
+        generated[dskey] = df
+        warnings.extend(ds_warnings)
+        if on_dataset_done is not None:
+            on_dataset_done(dskey)
+
+    def _ready():
+        return [ds for ds in datasets if ds not in generated and all(d in generated for d in deps[ds])]
+
+    if cache is not None:
+        for dskey in datasets:
+            df = cache.get(fps[dskey]["final"])
+            if df is not None:
+                generated[dskey] = df
+                if on_dataset_done is not None:
+                    on_dataset_done(dskey)
+        for dskey in datasets:
+            if dskey not in generated and fps[dskey]["base"] != fps[dskey]["final"]:
+                base = cache.get(fps[dskey]["base"])
+                if base is not None:
+                    _finish(dskey, run_dataset(dskey, state_config, {}, base, profiler))
+
+    pending = len(datasets) - len(generated)
+    max_workers = max_workers or min(pending, os.cpu_count() or 1)
+    if pending and max_workers <= 1:
+        while len(generated) < len(datasets):
+            for dskey in _ready():
+                _finish(dskey, run_dataset(dskey, state_config, {
+                        d: generated[d] for d in deps[dskey]}, profiler=profiler))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            _run_dag(executor, state_config, datasets, deps, generated, _ready, _finish, profiler)
+
+    return {ds: generated[ds] for ds in datasets}, warnings
+
+
+def _run_dag(executor: Executor, state_config, datasets, deps, generated, ready, finish,
+             profiler: StageProfiler | None = None):
+    running: Dict[Future, str] = {}
+    submitted = set()
+
+    def _submit_ready():
+        for dskey in ready():
+            if dskey not in submitted:
+                submitted.add(dskey)
+                inputs = {d: generated[d] for d in deps[dskey]}
+                if profiler is None:
+                    future = executor.submit(run_dataset, dskey, state_config, inputs)
+                else:
+                    future = executor.submit(_run_dataset_profiled, dskey, state_config, inputs, profiler.child())
+                running[future] = dskey
+
+    _submit_ready()
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            if profiler is not None:
+                result, records = result
+                profiler.merge(records)
+            finish(running.pop(future), result)
+        _submit_ready()
@@ -0,0 +1,122 @@
+import itertools
+import os
+from typing import Callable, Dict, Iterator, List, Tuple
+import pandas as pd
+
+from app.generators import generator_config, generator_schemas, chunk_generator_config, chunk_input_columns
+from app.helpers.config import DEF_PERIODS_PER_CHUNK
+from app.helpers.compaction import compact_dataset
+from app.helpers.custom_columns import apply_custom_columns_vectorized
+from app.helpers.export import dataset_filename
+from app.helpers.general import make_faker
+from app.helpers.profiling import StageProfiler, profile_stage
+from app.helpers.rng import dataset_rng
+from app.helpers.safe_eval import uses_window_functions
+from app.helpers.scheduler import dataset_dependencies, run_dataset
+from app.helpers.writer import ChunkWriter
+from app.mods import compile_scenarios
+from app.types import TAppStateConfig, TStreamedOutput
+
+# ----------------------------
+# Streaming generation (bounded memory)
+# ----------------------------
+# Fact datasets are generated a block of periods at a time; every chunk gets its custom
+# columns and scenarios and is written to disk before the next one is built, so peak
+# memory follows the chunk size rather than the total row count.
+
+
+def _profiled_chunks(chunks: Iterator[pd.DataFrame], profiler: StageProfiler | None,
+                     dskey: str) -> Iterator[pd.DataFrame]:
+    """Yields the chunks, recording the generator work behind each one as a stage."""
+    if profiler is None:
+        yield from chunks
+        return
+    for k in itertools.count():
+        with profiler.stage("generator", dskey, chunk=k) as stage:
+            chunk = next(chunks, None)
+            if chunk is None:
+                stage.discard()
+            else:
+                stage.output(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def stream_generators(state_config: TAppStateConfig, datasets: List[str], out_dir: str,
+                      periods_per_chunk: int = DEF_PERIODS_PER_CHUNK, fmt: str = "csv", compression: str | None = None,
+                      on_dataset_done: Callable[[str], None] | None = None,
+                      profiler: StageProfiler | None = None) -> Tuple[Dict[str, TStreamedOutput], List[str]]:
+    """
+    Generates the selected datasets straight to `<out_dir>/<dataset>.<ext>` (CSV, Parquet or
+    Arrow IPC), in dependency order.
+    Streamed datasets only keep the columns their dependants need (see chunk_input_columns);
+    everything else is released as soon as it has been written.
+    Returns the written files (in generator_config order) and any warnings raised along the way.
+    A `profiler` records every stage, per chunk for streamed datasets.
+    """
+    datasets = [ds for ds in generator_config if ds in datasets]
+    deps = dataset_dependencies(datasets)
+    dependants = {ds: [d for d in datasets if ds in deps[d]] for ds in datasets}
+    seed = state_config["seed"]
+    scenarios = state_config["scenarios"]
+    kept: Dict[str, pd.DataFrame] = {}
+    outputs: Dict[str, TStreamedOutput] = {}
+    warnings: List[str] = []
+
+    for sc in scenarios:
+        if sc.get('target_dataset') not in datasets:
+            warnings.append(
+                f"Scenario '{sc.get('name')}' targets '{sc.get('target_dataset')}', which was not generated. Skipping.")
+
+    for dskey in datasets:
+        inputs = {d: kept[d] for d in deps[dskey]}
+        path = os.path.join(out_dir, dataset_filename(dskey, fmt))
+        plan = compile_scenarios(scenarios, dskey)
+
+        with ChunkWriter(path, fmt, compression) as writer:
+            if dskey in chunk_generator_config:
+                keep_cols = chunk_input_columns.get(dskey)
+                pieces = []
+                faker = make_faker(seed, locale=state_config["faker_locale"])
+                chunks = _profiled_chunks(chunk_generator_config[dskey](
+                    state_config, faker, inputs, dataset_rng(state_config, dskey), periods_per_chunk), profiler, dskey)
+                custom_columns = state_config["custom_columns"].get(dskey, [])
+                for col, col_cfg in custom_columns:
+                    if col_cfg.get('type') == 'formula' and uses_window_functions(col_cfg.get('expr', '')):
+                        warnings.append(
+                            f"Custom column '{col}' of {dskey} uses window functions; when streaming they restart at every chunk.")
+                schema = generator_schemas.get(dskey)
+                for k, chunk in enumerate(chunks):
+                    chunk = apply_custom_columns_vectorized(
+                        chunk, dskey, custom_columns, seed, on_warning=warnings.append, chunk=k, profiler=profiler)
+                    # Numeric dtypes stay as generated: a width picked per chunk (int8 here, int16 there)
+                    # would not match the schema the Parquet / Arrow file was opened with
+                    chunk = compact_dataset(chunk, schema, custom_columns, downcast=False)
+                    if dependants[dskey]:
+                        pieces.append(chunk[keep_cols] if keep_cols else chunk)
+                    writer.write(plan.apply(chunk, seed, chunk=k, profiler=profiler))
+                if dependants[dskey]:
+                    # Chunk categoricals carry their own categories, so the union is compacted again
+                    kept[dskey] = compact_dataset(pd.concat(
+                        pieces, ignore_index=True), schema, custom_columns) if pieces else pd.DataFrame()
+            else:
+                _, df, ds_warnings = run_dataset(dskey, state_config, inputs, profiler=profiler)
+                warnings.extend(ds_warnings)
+                if dependants[dskey]:
+                    kept[dskey] = df
+                writer.write(plan.apply(df, seed, profiler=profiler))
+
+        outputs[dskey] = {"path": path, "format": fmt,
+                          "rows": writer.rows, "chunks": writer.chunks}
+
+        # Release inputs nobody else is waiting for
+        done = set(outputs)
+        for d in list(kept):
+            if all(dep in done for dep in dependants[d]):
+                del kept[d]
+
+        if on_dataset_done is not None:
+            on_dataset_done(dskey)
+
+    return outputs, warnings
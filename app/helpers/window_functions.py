@@ -0,0 +1,115 @@
+from typing import Callable, Dict
+import pandas as pd
+import numpy as np
+
+# ----------------------------
+# Window & group functions for formulas
+# ----------------------------
+# Whitelisted primitives callable from custom-column formulas, e.g.
+#   lag(InvoiceAmount, 1, CustomerID, order_by=Date)    previous invoice of the same customer
+#   InvoiceAmount / group_sum(InvoiceAmount, Product)
+# Each takes whole columns and runs as one pandas groupby / shift / rolling / transform; `by`
+# is a key column or a list of them. Sequential functions (lag, lead, diff, cumsum, rolling_*)
+# walk the rows in frame order unless `order_by` names the column(s) to walk them in: rows are
+# stably sorted by it (ties keep frame order), computed, and the results put back in frame
+# order. Generated frames are not always chronological (Revenue_Invoices is product-major), so
+# pass order_by=Date for anything over time. They cannot run row-wise.
+
+
+def _series(x, func: str) -> pd.Series:
+    if np.ndim(x) == 0:
+        raise ValueError(
+            f"{func}() needs whole columns and cannot be evaluated row-wise.")
+    return pd.Series(np.asarray(x))
+
+
+def _keys(by, func: str) -> list:
+    return [_series(b, func) for b in (by if isinstance(by, (list, tuple)) else [by])]
+
+
+def _grouped(s: pd.Series, keys: list):
+    return s.groupby(keys, sort=False, dropna=False)
+
+
+def _sequential(x, by, order_by, func: str, compute: Callable) -> np.ndarray:
+    """Run `compute(series, keys)` (keys None when ungrouped) over the rows in `order_by` order."""
+    s = _series(x, func)
+    keys = None if by is None else _keys(by, func)
+    if order_by is None:
+        return compute(s, keys).to_numpy()
+    sort_keys = _keys(order_by, func)
+    order = pd.DataFrame(dict(enumerate(sort_keys))).sort_values(
+        list(range(len(sort_keys))), kind="stable").index.to_numpy()
+    s = s.iloc[order].reset_index(drop=True)
+    keys = None if keys is None else [k.iloc[order].reset_index(drop=True) for k in keys]
+    result = compute(s, keys).to_numpy()
+    out = np.empty_like(result)
+    out[order] = result
+    return out
+
+
+def lag(x, periods: int = 1, by=None, order_by=None) -> np.ndarray:
+    return _sequential(x, by, order_by, "lag", lambda s, keys: (
+        s.shift(periods) if keys is None else _grouped(s, keys).shift(periods)))
+
+
+def lead(x, periods: int = 1, by=None, order_by=None) -> np.ndarray:
+    return _sequential(x, by, order_by, "lead", lambda s, keys: (
+        s.shift(-periods) if keys is None else _grouped(s, keys).shift(-periods)))
+
+
+def diff(x, periods: int = 1, by=None, order_by=None) -> np.ndarray:
+    return _sequential(x, by, order_by, "diff", lambda s, keys: (
+        s.diff(periods) if keys is None else _grouped(s, keys).diff(periods)))
+
+
+def cumsum(x, by=None, order_by=None) -> np.ndarray:
+    return _sequential(x, by, order_by, "cumsum", lambda s, keys: (
+        s.cumsum() if keys is None else _grouped(s, keys).cumsum()))
+
+
+def _rolling(x, window: int, by, order_by, min_periods: int, agg: str, func: str) -> np.ndarray:
+    def compute(s: pd.Series, keys):
+        if keys is None:
+            return getattr(s.rolling(window, min_periods=min_periods), agg)()
+        rolled = getattr(_grouped(s, keys).rolling(window, min_periods=min_periods), agg)()
+        # groupby().rolling() prefixes the group keys to the index; restore row order
+        return rolled.droplevel(list(range(len(keys)))).reindex(s.index)
+    return _sequential(x, by, order_by, func, compute)
+
+
+def rolling_mean(x, window: int, by=None, min_periods: int = 1, order_by=None) -> np.ndarray:
+    return _rolling(x, window, by, order_by, min_periods, "mean", "rolling_mean")
+
+
+def rolling_sum(x, window: int, by=None, min_periods: int = 1, order_by=None) -> np.ndarray:
+    return _rolling(x, window, by, order_by, min_periods, "sum", "rolling_sum")
+
+
+def _group_transform(agg: str) -> Callable:
+    func = f"group_{agg}"
+
+    def transform(x, by) -> np.ndarray:
+        return _grouped(_series(x, func), _keys(by, func)).transform(agg).to_numpy()
+    transform.__name__ = func
+    return transform
+
+
+def group_count(by) -> np.ndarray:
+    keys = _keys(by, "group_count")
+    return keys[0].groupby(keys, sort=False, dropna=False).transform("size").to_numpy()
+
+
+WINDOW_FUNCTIONS: Dict[str, Callable] = {
+    "lag": lag,
+    "lead": lead,
+    "diff": diff,
+    "cumsum": cumsum,
+    "rolling_mean": rolling_mean,
+    "rolling_sum": rolling_sum,
+    "group_sum": _group_transform("sum"),
+    "group_mean": _group_transform("mean"),
+    "group_min": _group_transform("min"),
+    "group_max": _group_transform("max"),
+    "group_count": group_count,
+}
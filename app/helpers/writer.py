@@ -0,0 +1,83 @@
+import os
+import pandas as pd
+
+from app.helpers.export import DictionaryEncoder, dictionary_columns, serialize_dataset, resolve_codec, require_pyarrow
+
+# ----------------------------
+# Incremental dataset writers
+# ----------------------------
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a single CSV, Parquet or Arrow IPC file as they arrive.
+    CSV writes the header once; Parquet writes one row group per chunk; Arrow writes one
+    record batch per chunk, with dictionary deltas for newly seen values.
+    Only the current chunk is ever held in memory.
+    """
+
+    def __init__(self, path: str, fmt: str = "csv", compression: str | None = None):
+        self.path = path
+        self.fmt = fmt
+        self.compression = resolve_codec(compression)
+        self.rows = 0
+        self.chunks = 0
+        self._columns = None
+        self._encoder = None
+        self._writer = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8", newline="") if fmt == "csv" else None
+
+    def write(self, df: pd.DataFrame):
+        if len(df.columns) == 0:
+            return
+        if self._columns is None:
+            self._columns = list(df.columns)
+        elif list(df.columns) != self._columns:
+            # Keep the file rectangular if a chunk comes back with columns in another order
+            df = df.reindex(columns=self._columns)
+
+        if self.fmt == "csv":
+            df.to_csv(self._file, index=False, header=self.chunks == 0)
+        else:
+            if self._encoder is None:
+                # Encoding is decided on the first chunk, which is representative of the rest
+                self._encoder = DictionaryEncoder(dictionary_columns(df))
+            table = self._encoder.encode(df)
+            if self._writer is None:
+                self._writer = self._open_columnar(table.schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+        self.chunks += 1
+
+    def _open_columnar(self, schema):
+        pa = require_pyarrow()
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, schema, compression=self.compression or "none")
+        if self.fmt == "arrow":
+            return pa.ipc.new_file(self.path, schema, options=pa.ipc.IpcWriteOptions(
+                compression=self.compression, emit_dictionary_deltas=True))
+        raise ValueError(f"Unknown export format '{self.fmt}'.")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(df: pd.DataFrame, path: str, fmt: str = "csv", compression: str | None = None):
+    """Writes a fully materialized dataset in one go."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+    with open(path, "wb") as fh:
+        fh.write(serialize_dataset(df, fmt, compression))
@@ -2,4 +2,5 @@ from app.mods.shock import apply_shock
 from app.mods.seasonal import apply_seasonal
 from app.mods.fraud_outliers import inject_fraud_outliers
 from app.mods.correlation import apply_correlation
-from app.mods.outliers import inject_outliers_vectorized
+from app.mods.outliers import inject_outliers_vectorized, outlier_options, OUTLIER_MODELS, OUTLIER_LABEL_COL
+from app.mods.scenario import apply_dataset_scenarios, compile_scenarios, ScenarioPlan
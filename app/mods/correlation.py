@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
 
+from app.helpers.compaction import widen_numeric
 
-def apply_correlation(df: pd.DataFrame, source_col: str, target_col: str, coef: float, noise_factor=0.1, seed=None):
-    if seed is not None:
-        np.random.seed(seed)
+
+def apply_correlation(df: pd.DataFrame, source_col: str, target_col: str, coef: float, noise_factor=0.1, seed=None, rng=None):
+    rng = rng if rng is not None else np.random.default_rng(seed)
 
     df = df.copy()
     if source_col not in df.columns or target_col not in df.columns:
@@ -15,8 +16,8 @@ def apply_correlation(df: pd.DataFrame, source_col: str, target_col: str, coef:
         return df
 
     # normalize source
-    source = df[source_col]
-    target = df[target_col]
+    source = widen_numeric(df[source_col])
+    target = widen_numeric(df[target_col])
 
     source_std = source.std()
     target_std = target.std()
@@ -26,7 +27,7 @@ def apply_correlation(df: pd.DataFrame, source_col: str, target_col: str, coef:
     source_norm = (source - source.mean()) / source_std
 
     # noise scaled by target std
-    noise = np.random.normal(0, target_std * noise_factor, len(df))
+    noise = rng.normal(0, target_std * noise_factor, len(df))
 
     # apply correlation
     correlated = target + coef * source_norm * target_std + noise
@@ -1,15 +1,17 @@
 import pandas as pd
 import numpy as np
 
+from app.helpers.compaction import widen_numeric
 
-def inject_fraud_outliers(df: pd.DataFrame, column: str, pct: float, multiplier: float, seed=None):
+
+def inject_fraud_outliers(df: pd.DataFrame, column: str, pct: float, multiplier: float, seed=None, rng=None):
     df = df.copy()
-    if seed is not None:
-        np.random.seed(seed)
+    rng = rng if rng is not None else np.random.default_rng(seed)
     n = len(df)
     k = max(1, int(np.floor(pct * n)))
     if column not in df.columns or n == 0:
         return df
-    idx = np.random.choice(df.index, size=k, replace=False)
+    idx = rng.choice(df.index, size=k, replace=False)
+    df[column] = widen_numeric(df[column], floating=True)
     df.loc[idx, column] = df.loc[idx, column] * multiplier
     return df
@@ -1,47 +1,97 @@
 import numpy as np
+import pandas as pd
 
+from app.helpers.compaction import widen_numeric
 
-def inject_outliers_vectorized(df, cols, freq=0.01, mag=3.0, method="multiplier", seed=None):
-    if seed is not None:
-        np.random.seed(seed)
-    df = df.copy()
+# Anomaly models:
+# - multiplier:  x * (1 ± (f - 1)),  f ~ U(mag, 1.5 mag)
+# - additive:    x ± f * mean|x|
+# - heavy_tail:  like multiplier, with f = mag * (1 + Pareto(1.5)), so a few spikes are extreme
+# - level_shift: one contiguous run of rows shifted by ± f * mean|x| (a regime change, not point spikes)
+OUTLIER_MODELS = ["multiplier", "additive", "heavy_tail", "level_shift"]
+# Ground-truth column marking the rows an injection touched
+OUTLIER_LABEL_COL = "IsInjectedOutlier"
+
+
+def outlier_options(state_config) -> dict:
+    """Keyword arguments for `inject_outliers_vectorized` from the app / profile config."""
+    return {
+        "freq": state_config["outlier_frequency"],
+        "mag": state_config["outlier_magnitude"],
+        "method": state_config.get("outlier_model", "multiplier"),
+        "label_col": OUTLIER_LABEL_COL if state_config.get("outlier_labels") else None,
+    }
+
+
+def _draw_factors(rng: np.random.Generator, k: int, m: int, mag: float, method: str):
+    """(k, m) magnitudes and signs, drawn column by column."""
+    factors = np.empty((k, m))
+    signs = np.empty((k, m))
+    for j in range(m):
+        if method == "heavy_tail":
+            factors[:, j] = mag * (1 + rng.pareto(1.5, size=k))
+        else:
+            factors[:, j] = rng.uniform(mag, mag * 1.5, size=k)
+        signs[:, j] = rng.choice([-1, 1], size=k)
+    if method == "level_shift":  # one magnitude and direction per column for the whole run
+        factors[:] = factors[0]
+        signs[:] = signs[0]
+    return factors, signs
+
+
+def inject_outliers_vectorized(df, cols, freq=0.01, mag=3.0, method="multiplier", seed=None, rng=None,
+                               label_col: str | None = None):
+    """
+    Injects outliers into the numeric `cols` of `df` at the same `freq * n` rows.
+    Works positionally: the sampled rows of all target columns form one (k, columns) matrix and the
+    results are written into one owned copy per target column on a shallow copy of the frame, so the
+    rest of the frame is never copied. Non-negative columns stay non-negative
+    and integer columns stay integer. With `label_col`, the touched rows are flagged in a boolean
+    column (OR-ed with any existing flags), as ground truth for anomaly detection.
+    """
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    df = df.copy(deep=False)
     n = len(df)
     if n == 0 or len(cols) == 0:
         return df
 
     # number of outliers
     k = max(1, int(np.floor(freq * n)))
-    idx = np.random.choice(df.index, size=k, replace=False)
-
-    for col in cols:
-        if col not in df.columns:
-            continue
-        series = df[col]
-
-        # skip non-numeric columns
-        if not np.issubdtype(series.dtype, np.number):
-            continue
-
-        # Generate outlier factors
-        factors = np.random.uniform(mag, mag * 1.5, size=k)
-        # Randomly decide positive or negative outliers
-        signs = np.random.choice([-1, 1], size=k)
-
-        if method == "multiplier":
-            outliers = series.loc[idx] * (1 + signs * (factors - 1))
-            # Prevent negative values if original data is non-negative
-            if (series >= 0).all():
-                outliers = outliers.clip(lower=0)
-        else:  # additive
-            mean_abs = series.abs().mean()
-            outliers = series.loc[idx] + signs * factors * mean_abs
-            if (series >= 0).all():
-                outliers = outliers.clip(lower=0)
-
-        # Preserve integer type if original column is int
-        if np.issubdtype(series.dtype, np.integer):
-            outliers = outliers.round().astype(series.dtype)
-
-        df.loc[idx, col] = outliers
+    if method == "level_shift":
+        start = int(rng.integers(0, max(n - k, 0) + 1))
+        idx = np.arange(start, min(start + k, n))
+    else:
+        idx = rng.choice(n, size=k, replace=False)
+
+    # skip missing and non-numeric columns
+    targets = [col for col in dict.fromkeys(cols) if col in df.columns and
+               pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+    if targets:
+        columns = [widen_numeric(df[col]).to_numpy(copy=True) for col in targets]
+        # Only the k sampled rows are stacked into a matrix; statistics are one pass per column
+        rows = np.column_stack([values[idx].astype(np.float64) for values in columns])
+        factors, signs = _draw_factors(rng, len(idx), len(targets), mag, method)
+
+        if method in ("multiplier", "heavy_tail"):
+            outliers = rows * (1 + signs * (factors - 1))
+        else:  # additive / level_shift
+            mean_abs = np.array([np.nanmean(np.abs(values)) for values in columns])
+            outliers = rows + signs * factors * mean_abs
+        # Prevent negative values if original data is non-negative
+        nonneg = np.array([(values >= 0).all() for values in columns])
+        outliers[:, nonneg] = np.maximum(outliers[:, nonneg], 0)
+
+        for j, (col, values) in enumerate(zip(targets, columns)):
+            # Preserve integer type if original column is int
+            values[idx] = np.round(outliers[:, j]) if values.dtype.kind in "iu" else outliers[:, j]
+            df[col] = values
+
+    if label_col is not None:
+        labels = np.zeros(n, dtype=bool)
+        if targets:
+            labels[idx] = True
+        if label_col in df.columns:
+            labels |= df[label_col].to_numpy(dtype=bool)
+        df[label_col] = labels
 
     return df
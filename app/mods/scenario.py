@@ -0,0 +1,204 @@
+import pandas as pd
+import numpy as np
+
+from app.helpers.compaction import widen_numeric
+from app.helpers.profiling import StageProfiler, profile_stage, scenario_stage_name
+from app.helpers.rng import scenario_rng
+
+
+# ----------------------------
+# Compiled scenario plans
+# ----------------------------
+# A plan resolves the scenarios of one dataset up front (date bounds, month lookup tables)
+# and applies them together: the date column is parsed once, consecutive multiplicative
+# steps (multiplier shocks, seasonality, fraud spikes) fold into one pending factor per
+# column, and values are only materialized before steps that read them (additive shocks,
+# correlations). Touched columns are written back once onto a shallow copy of the frame.
+
+def _month_table(month_multipliers: dict) -> np.ndarray:
+    """Multiplier per month number, with slot 0 (unparseable dates) and unlisted months at 1.0."""
+    by_month = {str(k): v for k, v in month_multipliers.items()}
+    table = np.ones(13)
+    for m in range(1, 13):
+        v = by_month.get(str(m))
+        if v is not None and not pd.isna(v):
+            table[m] = float(v)
+    return table
+
+
+def _compile_step(sc: dict) -> dict | None:
+    if sc['type'] == 'shock':
+        return {'op': 'shock', 'column': sc['target_column'], 'start': pd.to_datetime(sc['start']).to_datetime64(),
+                'end': pd.to_datetime(sc['end']).to_datetime64(), 'magnitude': sc['magnitude'],
+                'additive': sc['mode'] != 'multiplier'}
+    if sc['type'] == 'seasonal':
+        return {'op': 'seasonal', 'column': sc['target_column'], 'table': _month_table(sc['month_multipliers'])}
+    if sc['type'] == 'fraud_outlier':
+        return {'op': 'fraud', 'column': sc['target_column'], 'pct': sc.get('pct', 0.01),
+                'multiplier': sc.get('multiplier', 5.0)}
+    if sc['type'] == 'correlation':
+        return {'op': 'correlation', 'column': sc['target_column'], 'source': sc['source_col'],
+                'coef': sc.get('coef', 0.0)}
+    return None
+
+
+class _PlanState:
+    """Working columns of one plan run: owned 64-bit arrays plus pending per-column factors."""
+
+    def __init__(self, df: pd.DataFrame, date_col: str):
+        self.df = df
+        self.n = len(df)
+        self.date_col = date_col
+        self.values = {}
+        self.factors = {}
+        self._dates = None
+        self._months = None
+
+    def dates(self) -> np.ndarray | None:
+        if self.date_col not in self.df.columns:
+            return None
+        if self._dates is None:
+            self._dates = pd.to_datetime(
+                self.df[self.date_col], errors='coerce')
+        return self._dates.to_numpy()
+
+    def months(self) -> np.ndarray | None:
+        if self._months is None and self.dates() is not None:
+            self._months = self._dates.dt.month.fillna(0).to_numpy(dtype=np.int64)
+        return self._months
+
+    def column(self, col: str, floating: bool = False) -> np.ndarray | None:
+        """The working array of a numeric column (None when absent or non-numeric)."""
+        if col not in self.values:
+            if col not in self.df.columns:
+                return None
+            s = self.df[col]
+            if pd.api.types.is_bool_dtype(s) or not pd.api.types.is_numeric_dtype(s):
+                return None
+            self.values[col] = widen_numeric(s, floating).to_numpy(copy=True)
+        if floating and self.values[col].dtype.kind != 'f':
+            self.values[col] = self.values[col].astype(np.float64)
+        return self.values[col]
+
+    def factor(self, col: str) -> np.ndarray | None:
+        if self.column(col, floating=True) is None:
+            return None
+        if col not in self.factors:
+            self.factors[col] = np.ones(self.n)
+        return self.factors[col]
+
+    def flush(self, col: str):
+        if col in self.factors:
+            self.values[col] *= self.factors.pop(col)
+
+    def result(self) -> pd.DataFrame:
+        if not self.values:
+            return self.df
+        out = self.df.copy(deep=False)
+        for col in self.values:
+            self.flush(col)
+            out[col] = self.values[col]
+        return out
+
+
+def _run_correlation(state: _PlanState, step: dict, rng: np.random.Generator, noise_factor: float = 0.1):
+    # Same arithmetic as apply_correlation, on the plan's working arrays
+    target_col, source_col = step['column'], step['source']
+    if state.column(source_col) is None or state.column(target_col) is None:
+        return
+    state.flush(source_col)
+    state.flush(target_col)
+    source = pd.Series(state.values[source_col], copy=False)
+    target = state.values[target_col]
+    source_std = source.std()
+    target_std = pd.Series(target, copy=False).std()
+    if source_std == 0 or target_std == 0:
+        return
+    source_norm = ((source - source.mean()) / source_std).to_numpy()
+    noise = rng.normal(0, target_std * noise_factor, state.n)
+    correlated = target + step['coef'] * source_norm * target_std + noise
+    if target.dtype.kind in 'iu':
+        correlated = correlated.round().astype(target.dtype)
+    state.values[target_col] = correlated
+
+
+class ScenarioPlan:
+    """The scenarios targeting one dataset, compiled for single-pass application."""
+
+    def __init__(self, dataset: str, steps: list, date_col: str = 'Date'):
+        self.dataset = dataset
+        self.steps = steps  # (position in the full scenario list, scenario, compiled step)
+        self.date_col = date_col
+
+    def __len__(self):
+        return len(self.steps)
+
+    def apply(self, df: pd.DataFrame, seed: int, chunk: int | None = None,
+              profiler: StageProfiler | None = None) -> pd.DataFrame:
+        """
+        Applies every step in order. Results match applying the scenarios one by one (up to
+        float rounding from folding factors); `df` itself is never modified.
+        With a `profiler`, each scenario and the final write-back are recorded as stages.
+        """
+        if not self.steps:
+            return df
+        state = _PlanState(df, self.date_col)
+        for position, sc, step in self.steps:
+            with profile_stage(profiler, "scenario", self.dataset, scenario_stage_name(position, sc), chunk):
+                self._apply_step(state, seed, chunk, position, sc, step)
+        with profile_stage(profiler, "scenario", self.dataset, "write-back", chunk) as stage:
+            df = state.result()
+            stage.output(df)
+        return df
+
+    @staticmethod
+    def _apply_step(state: _PlanState, seed: int, chunk: int | None, position: int, sc: dict, step: dict):
+        col = step['column']
+        if step['op'] == 'shock':
+            dates = state.dates()
+            if dates is None or state.column(col, floating=True) is None:
+                return
+            mask = (dates >= step['start']) & (dates <= step['end'])
+            if step['additive']:
+                state.flush(col)
+                state.values[col][mask] += step['magnitude']
+            else:
+                state.factor(col)[mask] *= step['magnitude']
+        elif step['op'] == 'seasonal':
+            months = state.months()
+            if months is None or state.column(col, floating=True) is None:
+                return
+            state.factor(col)[:] *= step['table'][months]
+        elif step['op'] == 'fraud':
+            k = max(1, int(np.floor(step['pct'] * state.n)))
+            if col not in state.df.columns or state.n == 0:
+                return
+            # Positions drawn exactly as inject_fraud_outliers draws index labels
+            idx = scenario_rng(seed, position, sc, chunk).choice(
+                state.n, size=k, replace=False)
+            factor = state.factor(col)
+            if factor is not None:
+                factor[idx] *= step['multiplier']
+        elif step['op'] == 'correlation':
+            _run_correlation(state, step, scenario_rng(
+                seed, position, sc, chunk))
+
+
+def compile_scenarios(scenarios: list, dataset: str) -> ScenarioPlan:
+    """Builds the plan for `dataset`; each scenario keeps its position in the full list (and so its stream)."""
+    steps = []
+    for i, sc in enumerate(scenarios or []):
+        if sc.get('target_dataset') == dataset:
+            step = _compile_step(sc)
+            if step is not None:
+                steps.append((i, sc, step))
+    return ScenarioPlan(dataset, steps)
+
+
+def apply_dataset_scenarios(df: pd.DataFrame, dataset: str, scenarios: list, seed: int, chunk: int | None = None,
+                            profiler: StageProfiler | None = None):
+    """
+    Applies, in order, every scenario targeting `dataset` through its compiled plan. Each scenario
+    keeps the stream of its position in the full list; streamed chunks draw from a per-chunk sub-stream.
+    """
+    return compile_scenarios(scenarios, dataset).apply(df, seed, chunk, profiler)
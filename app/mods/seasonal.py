@@ -1,5 +1,7 @@
 import pandas as pd
 
+from app.helpers.compaction import widen_numeric
+
 
 def apply_seasonal(df: pd.DataFrame, column: str, month_multipliers: dict, date_col='Date'):
     df = df.copy()
@@ -12,5 +14,5 @@ def apply_seasonal(df: pd.DataFrame, column: str, month_multipliers: dict, date_
             str(k): v for k, v in month_multipliers.items()}
         multipliers = tmp_date.dt.month.astype(str).map(
             month_multipliers_str_keys).fillna(1.0).astype(float)
-        df[column] = df[column] * multipliers
+        df[column] = widen_numeric(df[column], floating=True) * multipliers
     return df
@@ -41,6 +41,11 @@ TCustomColumnEntry = Tuple[str, TCustomColumnFormulaConfig |
                            TCustomColumnRangeConfig | TCustomColumnChoiceConfig]
 
 
+class TCategoricalDistribution(TypedDict):
+    values: List[str | int | float]
+    weights: List[float] | None
+
+
 class TAppStateConfig(TypedDict):
     industry: str
     industry_kpi: Dict[str, TIndustryConfig]
@@ -54,11 +59,15 @@ class TAppStateConfig(TypedDict):
     faker_locale: str
     outlier_frequency: float
     outlier_magnitude: float
+    outlier_model: str
+    outlier_labels: bool
     custom_columns: Dict[str, List[TCustomColumnEntry]]
     scenarios: list
+    categorical_distributions: Dict[str, dict]
     total_customers: int
     total_vendors: int
     total_assets: int
+    total_warehouses: int
 
 
 class TProfileConfig(TypedDict):
@@ -72,8 +81,60 @@ class TProfileConfig(TypedDict):
     faker_locale: str
     outlier_frequency: float
     outlier_magnitude: float
+    outlier_model: str
+    outlier_labels: bool
     custom_columns: Dict[str, List[TCustomColumnEntry]]
     scenarios: list
+    categorical_distributions: Dict[str, dict]
     total_customers: int
     total_vendors: int
     total_assets: int
+    total_warehouses: int
+
+
+class TStreamedOutput(TypedDict):
+    path: str
+    format: str
+    rows: int
+    chunks: int
+
+
+class TExportFormat(TypedDict):
+    label: str
+    extension: str
+    codecs: List[str]
+
+
+class TDatasetSchema(TypedDict):
+    categorical: List[str]
+    datetime: List[str]
+
+
+class TStageRecord(TypedDict):
+    stage: str
+    kind: str
+    dataset: str
+    name: str | None
+    chunk: int | None
+    wall_s: float
+    cpu_s: float
+    rows: int | None
+    peak_mb: float | None
+    output_mb: float | None
+    profile_path: str | None
+
+
+class TDatasetEstimate(TypedDict):
+    rows: int
+    max_rows: int
+    frame_mb: float
+    peak_mb: float
+
+
+class TRunPlan(TypedDict):
+    mode: Literal["memory", "stream", "refuse"]
+    periods_per_chunk: int | None
+    memory_mb: float
+    stream_mb: float | None
+    budget_mb: float | None
+    reason: str
@@ -4,6 +4,7 @@ import json
 
 from app.helpers.config import INDUSTRY_KPIS, DEFAULT_REGIONS
 from app.helpers.profile import save_profile, list_profiles, prepare_profile
+from app.mods.outliers import OUTLIER_MODELS
 
 
 def render_sidebar():
@@ -34,6 +35,11 @@ def render_sidebar():
                                  0.2, key='key_outlier_freq')
         outlier_mag = st.slider('Outlier Magnitude', 1.5,
                                 8.0, key='key_outlier_mag')
+        outlier_model = st.selectbox('Outlier Model', OUTLIER_MODELS, key='key_outlier_model',
+                                     help="multiplier / additive = point spikes, heavy_tail = occasional extreme spikes, "
+                                     "level_shift = one contiguous run of shifted rows")
+        outlier_labels = st.checkbox('Label injected outliers', key='key_outlier_labels',
+                                     help="Adds a boolean IsInjectedOutlier column (ground truth for anomaly detection)")
         st.markdown('---')
         st.header('Profiles')
         new_profile_name = st.text_input('Save current config as profile', '')
@@ -69,6 +75,8 @@ def render_sidebar():
             'Total Vendors', step=1, key='key_total_vendors'))
         total_assets = int(st.number_input(
             'Total Assets', step=1, key='key_total_assets'))
+        total_warehouses = int(st.number_input(
+            'Total Warehouses', min_value=1, step=1, key='key_total_warehouses'))
 
         return {
             'industry': industry,
@@ -81,7 +89,10 @@ def render_sidebar():
             'faker_locale': faker_locale,
             'outlier_freq': outlier_freq,
             'outlier_mag': outlier_mag,
+            'outlier_model': outlier_model,
+            'outlier_labels': outlier_labels,
             'total_customers': total_customers,
             'total_vendors': total_vendors,
-            'total_assets': total_assets
+            'total_assets': total_assets,
+            'total_warehouses': total_warehouses
         }
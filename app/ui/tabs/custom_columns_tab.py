@@ -55,7 +55,10 @@ def render_custom_columns_tab(tab_obj: delta_generator.DeltaGenerator):
 
             if col_type == 'formula':
                 st.markdown(
-                    'Use column names directly. Allowed modules: `np`, `math`, `random`, `pd`.')
+                    'Use column names directly. Allowed modules: `np`, `math`, `random`, `pd`. '
+                    'Conditionals (`a if cond else b`) and `math.*` calls are vectorized. '
+                    'Window functions: `lag`, `lead`, `diff`, `cumsum`, `rolling_mean`, `rolling_sum`, '
+                    '`group_sum` / `group_mean` / `group_min` / `group_max` (value, by), `group_count(by)`.')
                 expr = st.text_area('Expression', 'np.log1p(InvoiceAmount)')
                 col_config = {'type': 'formula', 'expr': expr}
             elif col_type == 'range':
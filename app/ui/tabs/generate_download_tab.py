@@ -1,15 +1,22 @@
+import json
 import streamlit as st
 from streamlit import delta_generator
-import zipfile
 import pandas as pd
-import io
+import os
 
-from app.helpers.general import set_seed
-from app.helpers.config import DEFAULT_REGIONS
-from app.helpers.pd import apply_custom_columns_vectorized
+from app.helpers.config import (DATASET_CACHE_DIR, DATASET_CACHE_MAX_MB, DEF_MEMORY_BUDGET_MB, DEF_PERIODS_PER_CHUNK,
+                                OUTPUT_DIR, RUN_PROFILE_DIR)
+from app.helpers.dataset_cache import DatasetCache
+from app.helpers.distributions import distribution_errors
+from app.helpers.artifacts import ArtifactStore
+from app.helpers.estimator import estimate_datasets, plan_run
+from app.helpers.export import EXPORT_FORMATS, available_export_formats, dataset_filename, read_preview
+from app.helpers.profiling import StageProfiler, run_stage_keys
+from app.helpers.scheduler import run_generators
+from app.helpers.streaming import stream_generators
 from app.generators import generator_config
 from app.helpers.state import get_state_config
-import app.mods as scenarios
+from app.mods import apply_dataset_scenarios
 
 
 def render_generate_download_tab(tab_obj: delta_generator.DeltaGenerator):
@@ -17,7 +24,6 @@ def render_generate_download_tab(tab_obj: delta_generator.DeltaGenerator):
         state_config = get_state_config()
 
         seed = state_config["seed"]
-        faker_locale = state_config["faker_locale"]
 
         st.header('Generate & Download')
         st.sidebar.markdown('---')
@@ -25,58 +31,163 @@ def render_generate_download_tab(tab_obj: delta_generator.DeltaGenerator):
         datasets_to_gen = st.sidebar.multiselect(
             'Datasets to generate', list(generator_config.keys()), default=list(generator_config.keys()))
 
-        if st.sidebar.button('🚀 Generate Data Now', use_container_width=True, type="primary"):
+        export_format = st.sidebar.selectbox(
+            'Export format', available_export_formats(), format_func=lambda f: EXPORT_FORMATS[f]['label'],
+            help='Parquet / Arrow IPC store low-cardinality text columns dictionary-encoded; both need pyarrow.')
+        compression = st.sidebar.selectbox(
+            'Compression', EXPORT_FORMATS[export_format]['codecs'], disabled=export_format == 'csv')
+
+        streaming = st.sidebar.toggle(
+            'Streaming mode (write to disk)', help='Generate fact datasets a block of periods at a time and write each block straight to disk. Keeps memory bounded for large volumes.')
+        if streaming:
+            periods_per_chunk = st.sidebar.number_input(
+                'Periods per chunk', min_value=1, value=DEF_PERIODS_PER_CHUNK, step=1)
+            out_dir = st.sidebar.text_input('Output folder', value=OUTPUT_DIR)
+        else:
+            periods_per_chunk, out_dir = DEF_PERIODS_PER_CHUNK, OUTPUT_DIR
+
+        budget_mb = st.sidebar.number_input(
+            'Memory budget (MB)', min_value=0, value=DEF_MEMORY_BUDGET_MB, step=256,
+            help='Runs estimated to need more are streamed to disk in smaller chunks, or refused if even that does not fit. 0 = no limit.')
+        plan = plan_run(state_config, datasets_to_gen, budget_mb, streaming, int(periods_per_chunk))
+        _render_estimate(estimate_datasets(state_config, datasets_to_gen), plan)
+        distribution_issues = distribution_errors(state_config)
+        for msg in distribution_issues:
+            st.error(msg)
+
+        # Generated frames are reused across runs while the settings they depend on are unchanged
+        cache: DatasetCache = st.session_state.setdefault(
+            'dataset_cache', DatasetCache(DATASET_CACHE_MAX_MB * 2**20))
+        spill = st.sidebar.checkbox(
+            'Spill dataset cache to disk', help=f'Keep datasets evicted from the in-memory cache under `{DATASET_CACHE_DIR}`.')
+        cache.spill_dir = DATASET_CACHE_DIR if spill else None
+
+        profiling = st.sidebar.checkbox(
+            'Profile this run', help='Record time, CPU, rows and memory of every generator, custom column and scenario. Memory tracing slows the run down.')
+        profiler = None
+        if profiling:
+            profiled_stage = st.sidebar.selectbox(
+                'cProfile one stage', [None] + run_stage_keys(
+                    datasets_to_gen, state_config["custom_columns"], state_config["scenarios"]),
+                format_func=lambda k: k or '(none)', help=f'Dumps a .prof file under `{RUN_PROFILE_DIR}`.')
+            profiler = StageProfiler(
+                profile_stage=profiled_stage, profile_dir=RUN_PROFILE_DIR)
+
+        if st.sidebar.button('🚀 Generate Data Now', use_container_width=True, type="primary",
+                             disabled=plan['mode'] == 'refuse' or bool(distribution_issues)):
             with st.spinner('Generating datasets... this may take a moment.'):
-                faker = set_seed(seed, locale=faker_locale)
-                generated = {}
+                if plan['mode'] == 'stream':
+                    outputs, gen_warnings = stream_generators(
+                        state_config, datasets_to_gen, out_dir, plan['periods_per_chunk'], export_format, compression,
+                        profiler=profiler)
+                    for msg in gen_warnings:
+                        st.warning(msg)
+                    st.session_state.run_report = profiler.report() if profiler else None
+                    st.session_state.generated_data = {}
+                    st.session_state.streamed_outputs = outputs
+                    st.success(
+                        f'Data generation complete! Files written to `{out_dir}`.')
+                    st.rerun()
 
-                for dskey, ds_generator in generator_config.items():
-                    if dskey in datasets_to_gen:
-                        df = ds_generator(
-                            state_config, faker, generated)
-                        generated[dskey] = df
-                        generated[dskey] = apply_custom_columns_vectorized(
-                            df, dskey)
+                hits_before = cache.hits
+                generated, gen_warnings = run_generators(
+                    state_config, datasets_to_gen, cache=cache, profiler=profiler)
+                for msg in gen_warnings:
+                    st.warning(msg)
+                if cache.hits > hits_before:
+                    st.toast(
+                        f'Reused {cache.hits - hits_before} unchanged dataset(s) from cache.')
 
                 # Apply scenarios
-                for sc in st.session_state.key_scenarios:
-                    target_ds = sc.get('target_dataset')
-                    if target_ds in generated:
-                        df = generated[target_ds]
-                        if sc['type'] == 'shock':
-                            df = scenarios.apply_shock(
-                                df, sc['target_column'], sc['start'], sc['end'], sc['magnitude'], sc['mode'])
-                        elif sc['type'] == 'seasonal':
-                            df = scenarios.apply_seasonal(
-                                df, sc['target_column'], sc['month_multipliers'])
-                        elif sc['type'] == 'fraud_outlier':
-                            df = scenarios.inject_fraud_outliers(df, sc['target_column'], sc.get(
-                                'pct', 0.01), sc.get('multiplier', 5.0), seed=sc.get('seed'))
-                        elif sc['type'] == 'correlation':
-                            df = scenarios.apply_correlation(
-                                df, sc['source_col'], sc['target_column'], sc.get('coef', 0.0))
-                        generated[target_ds] = df
-                    else:
+                for sc in state_config["scenarios"]:
+                    if sc.get('target_dataset') not in generated:
                         st.warning(
-                            f"Scenario '{sc.get('name')}' targets '{target_ds}', which was not generated. Skipping.")
+                            f"Scenario '{sc.get('name')}' targets '{sc.get('target_dataset')}', which was not generated. Skipping.")
+                for target_ds in generated:
+                    generated[target_ds] = apply_dataset_scenarios(
+                        generated[target_ds], target_ds, state_config["scenarios"], seed, profiler=profiler)
 
                 st.session_state.generated_data = generated
+                st.session_state.run_report = profiler.report() if profiler else None
+                st.session_state.generation_id = st.session_state.get(
+                    'generation_id', 0) + 1
+                st.session_state.streamed_outputs = {}
                 st.success(
                     'Data generation complete! View previews and download below.')
                 st.rerun()
 
+        if st.session_state.get('run_report'):
+            _render_run_report(st.session_state.run_report)
+
+        if st.session_state.get('streamed_outputs'):
+            st.markdown('### Streamed Outputs')
+            for name, out in st.session_state.streamed_outputs.items():
+                st.subheader(
+                    f"`{name}` — {out['rows']:,} rows in {out['chunks']:,} chunk(s)")
+                st.caption(out['path'])
+                if out['rows']:
+                    st.dataframe(read_preview(out['path'], out['format']))
+                    st.download_button(f'⬇️ Download {name}', _file_reader(out['path']), file_name=os.path.basename(
+                        out['path']), on_click='ignore', use_container_width=True)
+
         if 'generated_data' in st.session_state and st.session_state.generated_data:
             st.markdown('### Previews & Downloads')
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
-                for name, df in st.session_state.generated_data.items():
-                    st.subheader(f"`{name}` — {len(df):,} rows")
-                    st.dataframe(df.head(50))
-                    st.download_button(f'⬇️ Download {name}', df.to_csv(index=False).encode(
-                        'utf-8'), file_name=f"{name}.csv", use_container_width=True)
-                    csv = df.to_csv(index=False).encode('utf-8')
-                    zf.writestr(f"{name}.csv", csv)
-
-            zip_buffer.seek(0)
-            st.download_button('⬇️ Download ALL as ZIP', zip_buffer.getvalue(
-            ), file_name='synthetic_datasets.zip', use_container_width=True)
+            frames = st.session_state.generated_data
+            # Files are written on the first click only, then reused until the next generation
+            store: ArtifactStore = st.session_state.setdefault(
+                'artifact_store', ArtifactStore())
+            store.reset(st.session_state.get('generation_id'))
+
+            for name, df in frames.items():
+                st.subheader(f"`{name}` — {len(df):,} rows")
+                st.dataframe(df.head(50))
+                st.download_button(f'⬇️ Download {name}', _file_reader(
+                    lambda name=name, df=df: store.dataset_path(name, df, export_format, compression)),
+                    file_name=dataset_filename(name, export_format), on_click='ignore', use_container_width=True)
+
+            st.download_button('⬇️ Download ALL as ZIP', _file_reader(
+                lambda: store.bundle_path(frames, export_format, compression)),
+                file_name='synthetic_datasets.zip', on_click='ignore', use_container_width=True)
+
+
+def _render_estimate(estimates: dict, plan: dict):
+    peak_mb = plan['stream_mb'] if plan['mode'] == 'stream' else plan['memory_mb']
+    total_rows = sum(e['rows'] for e in estimates.values())
+    with st.expander(f"📏 Estimated size — ~{total_rows:,} rows, ~{peak_mb:,.0f} MB peak"):
+        st.dataframe(pd.DataFrame.from_dict(estimates, orient='index'), column_config={
+            'rows': st.column_config.NumberColumn('Rows (expected)', format='%d'),
+            'max_rows': st.column_config.NumberColumn('Rows (at most)', format='%d'),
+            'frame_mb': st.column_config.NumberColumn('Frame (MB)', format='%.1f'),
+            'peak_mb': st.column_config.NumberColumn('Peak while generating (MB)', format='%.1f'),
+        })
+        st.caption('Sizes are upper-bound estimates from measured bytes per row, before anything is generated.')
+    if plan['mode'] == 'refuse':
+        st.error(plan['reason'])
+    elif plan['reason']:
+        st.warning(plan['reason'])
+
+
+def _render_run_report(report: dict):
+    with st.expander(f"⏱️ Run report — {report['total_wall_s']:.2f}s across {len(report['summary'])} stage(s)"):
+        if not report['summary']:
+            st.caption('Every dataset came from the cache; nothing was generated.')
+        else:
+            summary = pd.DataFrame(report['summary']).drop(columns=['kind', 'dataset', 'name'])
+            st.dataframe(summary, hide_index=True, column_config={
+                'wall_s': st.column_config.NumberColumn('Wall (s)', format='%.3f'),
+                'cpu_s': st.column_config.NumberColumn('CPU (s)', format='%.3f'),
+                'peak_mb': st.column_config.NumberColumn('Peak (MB)', format='%.1f'),
+                'output_mb': st.column_config.NumberColumn('Output (MB)', format='%.1f'),
+            })
+        st.download_button('⬇️ Download run report (JSON)', json.dumps(report, indent=2, default=float),
+                           file_name='run_report.json', mime='application/json', on_click='ignore')
+        for record in report['stages']:
+            if record['profile_path'] and os.path.exists(record['profile_path']):
+                st.download_button(f"⬇️ Download cProfile dump of `{record['stage']}`",
+                                   _file_reader(record['profile_path']),
+                                   file_name=os.path.basename(record['profile_path']), on_click='ignore')
+
+
+def _file_reader(path):
+    """Deferred download data: opens the file (or the path returned by `path()`) only when clicked."""
+    return lambda: open(path() if callable(path) else path, 'rb')
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from benchmarks.suite import (DEF_MEMORY_THRESHOLD, DEF_TIME_THRESHOLD, GRIDS, compare_results, environment,
+                              run_benchmarks)
+
+# ----------------------------
+# Benchmark entry point
+# ----------------------------
+# Runs headlessly (no Streamlit), from the project root:
+#   python -m benchmarks --grid quick
+#   python -m benchmarks --grid default --save-baseline
+#   python -m benchmarks --grid default --baseline benchmarks/baseline.json
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Throughput and peak-memory benchmarks for every generator and scenario.")
+    parser.add_argument("--grid", default="quick", choices=list(GRIDS),
+                        help="Size / frequency / span grid (default: %(default)s).")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="Override the grid's entity counts (customers, vendors; assets get a tenth).")
+    parser.add_argument("--frequencies", nargs="+", choices=["ME", "W", "D"],
+                        help="Override the grid's frequencies.")
+    parser.add_argument("--years", type=int, nargs="+",
+                        help="Override the grid's date spans, in years.")
+    parser.add_argument("--only",
+                        help="Regex over benchmark names, e.g. 'generator:Revenue' or 'scenario:|outliers:'.")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Timed runs per benchmark; the best is kept (default: %(default)s).")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the extra tracemalloc run that measures peak memory.")
+    parser.add_argument("-o", "--out",
+                        help="Results JSON (default: benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH,
+                        help="Compare against a baseline JSON (default path: benchmarks/baseline.json) "
+                        "and exit with status 1 on regressions.")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH,
+                        help="Also store these results as the baseline (default path: benchmarks/baseline.json).")
+    parser.add_argument("--time-threshold", type=float, default=DEF_TIME_THRESHOLD,
+                        help="Allowed slowdown before a regression is reported (default: %(default)s = +25%%).")
+    parser.add_argument("--memory-threshold", type=float, default=DEF_MEMORY_THRESHOLD,
+                        help="Allowed peak-memory growth before a regression is reported (default: %(default)s).")
+    return parser
+
+
+def _print_result(r: dict):
+    peak = f"{r['peak_mb']:9.1f} MB" if r["peak_mb"] is not None else "        -"
+    rate = f"{r['rows_per_s']:>14,.0f} rows/s" if r["rows_per_s"] else "             - rows/s"
+    print(f"{r['name']:38s} {r['case']:26s} {r['rows']:>11,} rows {r['seconds']:9.3f}s {rate} {peak}", flush=True)
+
+
+def _write_json(path: str, payload: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    grid = GRIDS[args.grid]
+    sizes = args.sizes or grid["sizes"]
+    frequencies = args.frequencies or grid["frequencies"]
+    years = args.years or grid["years"]
+
+    baseline = None
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"error: baseline {args.baseline} not found (create one with --save-baseline).", file=sys.stderr)
+            return 2
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    env = environment()
+    results = run_benchmarks(sizes, frequencies, years, repeat=args.repeat, memory=not args.no_memory,
+                             only=args.only, on_result=_print_result)
+    payload = {"environment": env, "grid": {"sizes": sizes, "frequencies": frequencies, "years": years,
+                                            "repeat": args.repeat}, "results": results}
+
+    out = args.out or os.path.join(
+        RESULTS_DIR, env["timestamp"].replace(":", "").replace("+0000", "Z") + ".json")
+    _write_json(out, payload)
+    print(f"Results -> {out}")
+    if args.save_baseline:
+        _write_json(args.save_baseline, payload)
+        print(f"Baseline -> {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare_results(
+            results, baseline["results"], args.time_threshold, args.memory_threshold)
+        for reg in regressions:
+            print(f"REGRESSION {reg['name']} [{reg['case']}] {reg['metric']}: "
+                  f"{reg['baseline']:.3f} -> {reg['current']:.3f}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import gc
+import itertools
+import os
+import platform
+import re
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.generators import generator_config, generator_config_keys, generator_inputs
+from app.helpers.general import make_faker
+from app.helpers.profile_loader import state_config_from_profile
+from app.helpers.rng import dataset_rng, make_rng
+from app.mods import (OUTLIER_MODELS, apply_dataset_scenarios, compile_scenarios,
+                      inject_outliers_vectorized)
+from app.types import TAppStateConfig
+
+# ----------------------------
+# Scaling benchmarks
+# ----------------------------
+# Every generator in `generator_config` and every scenario / outlier model in `app.mods` is
+# timed over a grid of entity counts, frequencies and date spans. A generator is only
+# measured on the axes it actually reads (see `generator_config_keys`), so e.g. the
+# customer master runs once per size, not once per size x frequency x span.
+# Timings are the best of `repeat` runs; peak memory comes from one separate tracemalloc
+# run (tracing slows allocation-heavy code, so it never overlaps the timed runs).
+
+GRIDS: Dict[str, dict] = {
+    "quick": {"sizes": [1_000], "frequencies": ["ME"], "years": [1]},
+    "default": {"sizes": [1_000, 10_000, 100_000], "frequencies": ["ME", "W", "D"], "years": [1, 5]},
+    "full": {"sizes": [1_000, 10_000, 100_000, 1_000_000], "frequencies": ["ME", "W", "D"], "years": [1, 5, 10]},
+}
+
+BENCH_START_DATE = "2020-01-01"
+# Assets get a tenth of the grid size: the depreciation schedule is assets x months
+SIZE_KEYS = {"total_customers": 1, "total_vendors": 1, "total_assets": 10}
+PERIOD_KEYS = {"frequency", "start_date", "end_date"}
+
+# Scenarios applied to the invoices of each period case
+BENCH_TARGET = "Revenue_Invoices"
+BENCH_SCENARIOS: List[dict] = [
+    {"type": "shock", "name": "shock", "target_dataset": BENCH_TARGET, "target_column": "InvoiceAmount",
+     "start": BENCH_START_DATE, "end": "2099-12-31", "magnitude": 1.2, "mode": "multiplier"},
+    {"type": "seasonal", "name": "seasonal", "target_dataset": BENCH_TARGET, "target_column": "InvoiceAmount",
+     "month_multipliers": {str(m): 1 + m / 100 for m in range(1, 13)}},
+    {"type": "fraud_outlier", "name": "fraud_outlier", "target_dataset": BENCH_TARGET,
+     "target_column": "InvoiceAmount", "pct": 0.01, "multiplier": 5.0},
+    {"type": "correlation", "name": "correlation", "target_dataset": BENCH_TARGET, "source_col": "CustomerLTV",
+     "target_column": "InvoiceAmount", "coef": 0.5},
+]
+BENCH_OUTLIER_COLUMNS = ["InvoiceAmount", "PaidAmount", "CostAmount"]
+
+# A run regresses when it is this much slower / hungrier than the baseline, beyond a noise floor
+DEF_TIME_THRESHOLD = 0.25
+DEF_MEMORY_THRESHOLD = 0.25
+MIN_TIME_DELTA = 0.01  # seconds
+MIN_MEMORY_DELTA = 1.0  # MB
+
+
+def bench_config(size: int, frequency: str, years: int) -> TAppStateConfig:
+    """App defaults with the grid's entity counts, frequency and a `years`-long window."""
+    config = state_config_from_profile({})
+    for key, divisor in SIZE_KEYS.items():
+        config[key] = max(size // divisor, 1)
+    start = pd.Timestamp(BENCH_START_DATE)
+    config["frequency"] = frequency
+    config["start_date"] = start.strftime("%Y-%m-%d")
+    config["end_date"] = (start + pd.DateOffset(years=years) -
+                          pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    return config
+
+
+def _closure(ds: str) -> List[str]:
+    """`ds` and every dataset it reads, transitively."""
+    out = [ds]
+    for dep in generator_inputs.get(ds, []):
+        out += [d for d in _closure(dep) if d not in out]
+    return out
+
+
+def _axes(ds: str) -> Tuple[bool, bool]:
+    """Whether `ds` (through its inputs) depends on the size axis and on the period axes."""
+    keys = {k for d in _closure(ds) for k in generator_config_keys.get(d, [])}
+    return bool(keys & SIZE_KEYS.keys()), bool(keys & PERIOD_KEYS)
+
+
+def case_label(size: int | None, frequency: str | None, years: int | None) -> str:
+    parts = []
+    if size is not None:
+        parts.append(f"n={size}")
+    if frequency is not None:
+        parts += [f"freq={frequency}", f"years={years}"]
+    return " ".join(parts) or "fixed"
+
+
+def measure(fn: Callable[[], object], repeat: int = 1, memory: bool = True) -> Tuple[object, dict]:
+    """Runs `fn` `repeat` times (best wall / CPU time) plus once under tracemalloc for its peak."""
+    best_wall = best_cpu = float("inf")
+    result = None
+    for _ in range(max(repeat, 1)):
+        result = None
+        gc.collect()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn()
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    stats = {"seconds": best_wall, "cpu_seconds": best_cpu, "peak_mb": None}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            stats["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+
+def _record(name: str, case: str, df: pd.DataFrame, stats: dict) -> dict:
+    rows = len(df)
+    return {
+        "name": name,
+        "case": case,
+        "rows": rows,
+        "rows_per_s": rows / stats["seconds"] if stats["seconds"] > 0 else None,
+        "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+        **stats,
+    }
+
+
+def _scenario_benchmarks(df: pd.DataFrame, case: str, seed: int, repeat: int, memory: bool) -> Iterator[dict]:
+    # Each scenario alone through a one-step compiled plan, the path generation runs take
+    for sc in BENCH_SCENARIOS:
+        plan = compile_scenarios([sc], BENCH_TARGET)
+        out, stats = measure(lambda: plan.apply(df, seed), repeat, memory)
+        yield _record(f"scenario:{sc['type']}", case, out, stats)
+    out, stats = measure(lambda: apply_dataset_scenarios(
+        df, BENCH_TARGET, BENCH_SCENARIOS, seed), repeat, memory)
+    yield _record("scenario:plan", case, out, stats)
+    for model in OUTLIER_MODELS:
+        out, stats = measure(lambda: inject_outliers_vectorized(
+            df, BENCH_OUTLIER_COLUMNS, 0.05, 3.0, model, rng=make_rng(seed, "bench", model)), repeat, memory)
+        yield _record(f"outliers:{model}", case, out, stats)
+
+
+def run_benchmarks(sizes: List[int], frequencies: List[str], years: List[int], repeat: int = 1,
+                   memory: bool = True, only: str | None = None,
+                   on_result: Callable[[dict], None] | None = None) -> List[dict]:
+    """
+    Benchmarks every generator (and the scenarios, on the invoices) across the grid.
+    `only` is a regex over benchmark names ("generator:Debtors", "scenario:shock", "outliers:additive", ...).
+    Inputs a generator reads are generated untimed.
+    """
+    pattern = re.compile(only) if only else None
+    wanted = lambda name: pattern is None or pattern.search(name) is not None
+    want_scenarios = any(wanted(n) for n in [f"scenario:{sc['type']}" for sc in BENCH_SCENARIOS] +
+                         ["scenario:plan"] + [f"outliers:{m}" for m in OUTLIER_MODELS])
+    results: List[dict] = []
+    seen = set()
+
+    for size, frequency, span in itertools.product(sizes, frequencies, years):
+        config = bench_config(size, frequency, span)
+        measured = {}
+        for ds in generator_config:
+            by_size, by_period = _axes(ds)
+            key = (ds, size if by_size else None, frequency if by_period else None, span if by_period else None)
+            timed = wanted(f"generator:{ds}") or (want_scenarios and ds == BENCH_TARGET)
+            if timed and key not in seen:
+                measured[ds] = key
+        needed = {d for ds in measured for d in _closure(ds)}
+
+        generated: Dict[str, pd.DataFrame] = {}
+        for ds in generator_config:
+            if ds not in needed:
+                continue
+            inputs = {d: generated[d] for d in generator_inputs.get(ds, [])}
+            run = lambda: generator_config[ds](
+                config, make_faker(config["seed"], locale=config["faker_locale"]), inputs, dataset_rng(config, ds))
+            if ds not in measured:
+                generated[ds] = run()
+                continue
+            key = measured[ds]
+            seen.add(key)
+            generated[ds], stats = measure(run, repeat, memory)
+            label = case_label(*key[1:])
+            if wanted(f"generator:{ds}"):
+                results.append(_record(f"generator:{ds}", label, generated[ds], stats))
+                if on_result is not None:
+                    on_result(results[-1])
+            if ds == BENCH_TARGET and want_scenarios and not generated[ds].empty:
+                for record in _scenario_benchmarks(generated[ds], label, config["seed"], repeat, memory):
+                    if wanted(record["name"]):
+                        results.append(record)
+                        if on_result is not None:
+                            on_result(record)
+        del generated
+    return results
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare_results(results: List[dict], baseline: List[dict], time_threshold: float = DEF_TIME_THRESHOLD,
+                    memory_threshold: float = DEF_MEMORY_THRESHOLD) -> List[dict]:
+    """Benchmarks slower or hungrier than their baseline entry (matched on name and case) beyond the thresholds."""
+    base = {(b["name"], b["case"]): b for b in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r["name"], r["case"]))
+        if b is None:
+            continue
+        if r["seconds"] > b["seconds"] * (1 + time_threshold) and r["seconds"] - b["seconds"] > MIN_TIME_DELTA:
+            regressions.append({"name": r["name"], "case": r["case"], "metric": "seconds",
+                                "baseline": b["seconds"], "current": r["seconds"]})
+        if r.get("peak_mb") is not None and b.get("peak_mb") is not None and \
+                r["peak_mb"] > b["peak_mb"] * (1 + memory_threshold) and r["peak_mb"] - b["peak_mb"] > MIN_MEMORY_DELTA:
+            regressions.append({"name": r["name"], "case": r["case"], "metric": "peak_mb",
+                                "baseline": b["peak_mb"], "current": r["peak_mb"]})
+    return regressions
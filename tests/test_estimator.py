@@ -0,0 +1,21 @@
+import pytest
+
+from app.generators import generator_inputs
+from app.helpers.estimator import estimate_datasets, plan_run
+from app.helpers.profile_loader import state_config_from_profile
+
+# Each dependant alone, plus Debtors with only one of its inputs
+SELECTIONS = [[ds] for ds, inputs in generator_inputs.items() if inputs] + [["Customer_Master", "Debtors"]]
+
+
+@pytest.mark.parametrize("datasets", SELECTIONS, ids=lambda ds: "+".join(ds))
+def test_dependant_selected_without_its_inputs(datasets):
+    # Inputs that are not selected count as empty, as they do when generating
+    config = state_config_from_profile({})
+
+    estimates = estimate_datasets(config, datasets)
+    plan = plan_run(config, datasets, 100)
+
+    assert list(estimates) == datasets
+    assert estimates[datasets[-1]]["max_rows"] == 0
+    assert plan["mode"] == "memory"
@@ -0,0 +1,65 @@
+import re
+
+import numpy as np
+import pytest
+
+from app.helpers.identifiers import batch_cin, batch_gstin, batch_lei, batch_pan
+
+ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+N = 5000
+
+
+def gstin_is_valid(gstin: str) -> bool:
+    """Scalar GSTIN check: mod-36 sum of the body, weights 1 and 2 alternating."""
+    total = 0
+    for i, ch in enumerate(gstin[:14]):
+        product = ALPHABET.index(ch) * (2 if i % 2 else 1)
+        total += product // 36 + product % 36
+    return gstin[14] == ALPHABET[(36 - total % 36) % 36]
+
+
+def lei_is_valid(lei: str) -> bool:
+    """ISO 7064 MOD 97-10: the whole code, letters as 10-35, is 1 modulo 97."""
+    return int("".join(str(ALPHABET.index(ch)) for ch in lei)) % 97 == 1
+
+
+@pytest.mark.parametrize("validator, valid, invalid", [
+    (gstin_is_valid, "27AAPFU0939F1ZV", "27AAPFU0939F1ZW"),
+    (lei_is_valid, "5493001KJTIIGC8Y1R12", "5493001KJTIIGC8Y1R13"),
+])
+def test_reference_validators(validator, valid, invalid):
+    assert validator(valid) and not validator(invalid)
+
+
+def test_pan_and_gstin():
+    rng = np.random.default_rng(7)
+    pans = batch_pan(rng, N)
+    gstins = batch_gstin(rng, pans)
+
+    assert len(set(pans)) == N
+    assert all(re.fullmatch(r"[A-Z]{5}[0-9]{4}[A-Z]", pan) for pan in pans)
+    assert all(re.fullmatch(r"(0[1-9]|[1-3][0-9])[A-Z]{5}[0-9]{4}[A-Z][1-3]Z[0-9A-Z]", g) for g in gstins)
+    assert all(g[2:12] == pan for g, pan in zip(gstins, pans))
+    assert all(gstin_is_valid(g) for g in gstins)
+
+
+def test_lei():
+    leis = batch_lei(np.random.default_rng(7), N)
+
+    assert len(set(leis)) == N
+    assert all(re.fullmatch(r"[0-9A-Z]{18}[0-9]{2}", lei) for lei in leis)
+    assert all(lei_is_valid(lei) for lei in leis)
+
+
+def test_cin():
+    rng = np.random.default_rng(7)
+    listing = rng.choice(["L", "U"], size=N)
+    regions = rng.choice(["Maharashtra", "Tamil Nadu", "", "Île-de-France"], size=N)
+    business_types = rng.choice(["Private Limited", "Public Limited", "LLP", "Unknown"], size=N)
+    reg_dates = np.datetime64("1990-01-01") + rng.integers(0, 12000, size=N).astype("timedelta64[D]")
+    cins = batch_cin(rng, listing, regions, business_types, reg_dates)
+
+    assert len(set(cins)) == N
+    assert all(re.fullmatch(r"[LU][0-9]{5}[A-Z]{2}(19|20)[0-9]{2}(PTC|PLC|LLP)[0-9]{6}", c) for c in cins)
+    assert [c[0] for c in cins] == list(listing)
+    assert {c[6:8] for c in cins} == {"MA", "TA", "XX", "LE"}
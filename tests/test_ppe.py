@@ -0,0 +1,30 @@
+import numpy as np
+
+from app.generators.ppe import _asset_basis, generate_ppe_depreciation_schedule, generate_ppe_register
+from app.helpers.profile_loader import state_config_from_profile
+from app.helpers.rng import dataset_rng
+
+
+def test_schedule_depreciates_the_clean_cost_when_the_register_has_outliers():
+    config = state_config_from_profile({})
+    config.update(total_assets=500, outlier_frequency=0.5, outlier_magnitude=5.0, outlier_labels=True)
+
+    register = generate_ppe_register(config)
+    schedule = generate_ppe_depreciation_schedule(config, generated={"PPE_Register": register})
+    basis = _asset_basis(config, dataset_rng(config, "PPE_Register"))
+    clean_cost = dict(zip(register["AssetID"], basis["cost"]))
+
+    # The outliers distorted the register, but every schedule line carries the clean cost
+    injected = register["IsInjectedOutlier"].to_numpy()
+    assert (register["Cost"].to_numpy()[injected] != basis["cost"][injected]).any()
+    assert (register["Cost"].to_numpy()[~injected] == basis["cost"][~injected]).all()
+    assert (schedule["Cost"] == schedule["AssetID"].map(clean_cost)).all()
+    np.testing.assert_allclose(schedule["ClosingBookValue"],
+                               schedule["Cost"] - schedule["AccumulatedDepreciation"], atol=0.011)
+    assert (schedule["ClosingBookValue"] >= 0).all()
+
+    # Untouched assets still tie to the register's closing balance (SLM / WDV are deterministic)
+    last = schedule.groupby("AssetID").tail(1).set_index("AssetID")
+    clean = register[~injected & (register["DepreciationMethod"] != "Usage-based")].set_index("AssetID")
+    np.testing.assert_allclose(last.loc[clean.index, "AccumulatedDepreciation"],
+                               clean["AccumulatedDepreciation"], atol=0.011)
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from app.helpers import reference_data
+from app.helpers.reference_data import REFERENCE_DATA_VERSION, industries_digest, industries_stat, write_reference_data
+
+load = reference_data.load_reference_data.__wrapped__  # bypass the process-wide cache
+INDUSTRIES = {"Retail": {"products": ["Shoes"], "operational": []}}
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    industries_path = tmp_path / "industries.json"
+    industries_path.write_text(json.dumps(INDUSTRIES), encoding="utf-8")
+    artifact_path = tmp_path / "reference_data.json"
+    write_reference_data({"version": REFERENCE_DATA_VERSION, "industries_sha256": industries_digest(INDUSTRIES),
+                          "industries_stat": industries_stat(str(industries_path)), "industries": INDUSTRIES,
+                          "regions": {"India": ["Goa"]}}, str(artifact_path))
+    monkeypatch.setattr(reference_data, "build_reference_data", lambda path: "rebuilt")
+    return str(artifact_path), str(industries_path)
+
+
+def test_unchanged_templates_are_checked_by_stat_alone(files, monkeypatch):
+    def read_industries(path):
+        raise AssertionError("industries.json should not be read")
+    monkeypatch.setattr(reference_data, "_read_industries", read_industries)
+    assert load(*files)["regions"] == {"India": ["Goa"]}
+
+
+def test_touched_but_identical_templates_keep_the_artifact(files):
+    artifact_path, industries_path = files
+    with open(industries_path, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write(json.dumps(INDUSTRIES, indent=2))
+    os.utime(industries_path, ns=(0, 0))
+    assert load(artifact_path, industries_path)["industries"] == INDUSTRIES
+
+
+def test_edited_templates_are_rebuilt_in_memory(files):
+    artifact_path, industries_path = files
+    with open(industries_path, "w", encoding="utf-8") as f:
+        json.dump({**INDUSTRIES, "Steel": {"products": [], "operational": []}}, f)
+    before = open(artifact_path, encoding="utf-8").read()
+    assert load(artifact_path, industries_path) == "rebuilt"
+    assert open(artifact_path, encoding="utf-8").read() == before
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.helpers.custom_columns import apply_custom_columns_vectorized
+from app.helpers.safe_eval import rowwise_frame_eval, vectorized_eval
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 200
+    return pd.DataFrame({
+        "Amount": rng.uniform(0, 100, size=n),
+        "Qty": rng.integers(0, 10, size=n),
+        "Region": rng.choice(["North", "South", "East", "West"], size=n),
+    })
+
+
+# Each needs the numpy rewrite: the plain vectorized form raises on arrays
+REWRITTEN = [
+    "Amount * 2 if Amount > 50 else -Amount",                           # IfExp -> np.where
+    "math.sqrt(Amount) + math.log(Qty + 1, 2) - math.floor(Amount)",    # math.* -> np.*
+    "math.log(Amount + 1) * math.pow(Qty, 2)",
+    "1 if Qty > 3 and Region in ['North', 'South'] else 0",             # and / in -> logical_and / isin
+    "Amount if 2 <= Qty < 7 else (0 if not Amount > 10 else 1)",        # chained compare, not
+    "Amount if Region not in ('East',) or Qty == 0 else math.ceil(Amount)",
+]
+
+
+@pytest.mark.parametrize("expr", REWRITTEN)
+def test_rewrite_matches_rowwise_eval(df, expr):
+    with pytest.raises(Exception):
+        vectorized_eval(expr, df)
+    rewritten = vectorized_eval(expr, df, rewrite=True)
+    rowwise = rowwise_frame_eval(expr, df)
+    np.testing.assert_allclose(rewritten.to_numpy(dtype=float), np.asarray(rowwise, dtype=float), rtol=1e-12)
+
+
+def test_formula_without_a_numpy_form_falls_back_to_rowwise(df):
+    expr = "math.factorial(Qty) if Qty > 2 else 0"
+    with pytest.raises(Exception):
+        vectorized_eval(expr, df, rewrite=True)  # np.where over math.factorial still fails on arrays
+
+    warnings = []
+    out = apply_custom_columns_vectorized(df, "Revenue_Invoices", [("Fact", {"type": "formula", "expr": expr})],
+                                          seed=1, on_warning=warnings.append)
+    expected = [float(np.prod(range(1, q + 1))) if q > 2 else 0 for q in df["Qty"]]
+    np.testing.assert_array_equal(out["Fact"].to_numpy(dtype=float), expected)
+    assert len(warnings) == 1 and "row-wise" in warnings[0]
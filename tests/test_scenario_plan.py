@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.helpers.rng import scenario_rng
+from app.mods import apply_correlation, apply_seasonal, apply_shock, compile_scenarios, inject_fraud_outliers
+
+SEED = 42
+SCENARIOS = [
+    {"type": "shock", "target_dataset": "Revenue_Invoices", "target_column": "InvoiceAmount",
+     "start": "2023-03-01", "end": "2023-06-30", "magnitude": 1.4, "mode": "multiplier"},
+    {"type": "seasonal", "target_dataset": "Purchases", "target_column": "Amount",
+     "month_multipliers": {"1": 2.0}},
+    {"type": "seasonal", "target_dataset": "Revenue_Invoices", "target_column": "InvoiceAmount",
+     "month_multipliers": {"1": 0.8, "11": 1.3, 12: 1.6}},
+    {"type": "fraud_outlier", "target_dataset": "Revenue_Invoices", "target_column": "InvoiceAmount",
+     "pct": 0.02, "multiplier": 7.5},
+    {"type": "shock", "target_dataset": "Revenue_Invoices", "target_column": "Discount",
+     "start": "2023-09-01", "end": "2023-10-31", "magnitude": 250.0, "mode": "additive"},
+    {"type": "correlation", "target_dataset": "Revenue_Invoices", "target_column": "Discount",
+     "source_col": "InvoiceAmount", "coef": 0.6},
+    {"type": "fraud_outlier", "target_dataset": "Revenue_Invoices", "target_column": "Quantity",
+     "pct": 0.05, "multiplier": 3.0, "seed": 7},
+    {"type": "shock", "target_dataset": "Revenue_Invoices", "target_column": "InvoiceAmount",
+     "start": "2023-01-01", "end": "2023-12-31", "magnitude": 0.9, "mode": "multiplier"},
+]
+
+
+def _frame(n: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D"),
+        "InvoiceAmount": rng.gamma(2.0, 5000.0, size=n),
+        "Discount": rng.uniform(0, 500, size=n),
+        "Quantity": rng.integers(1, 100, size=n),
+    })
+
+
+def _one_by_one(df: pd.DataFrame, chunk: int | None) -> pd.DataFrame:
+    for position, sc in enumerate(SCENARIOS):
+        if sc["target_dataset"] != "Revenue_Invoices":
+            continue
+        rng = scenario_rng(SEED, position, sc, chunk)
+        col = sc["target_column"]
+        if sc["type"] == "shock":
+            df = apply_shock(df, col, sc["start"], sc["end"], sc["magnitude"], sc["mode"])
+        elif sc["type"] == "seasonal":
+            df = apply_seasonal(df, col, sc["month_multipliers"])
+        elif sc["type"] == "fraud_outlier":
+            df = inject_fraud_outliers(df, col, sc["pct"], sc["multiplier"], rng=rng)
+        elif sc["type"] == "correlation":
+            df = apply_correlation(df, sc["source_col"], col, sc["coef"], rng=rng)
+    return df
+
+
+@pytest.mark.parametrize("chunk", [None, 3])
+def test_compiled_plan_matches_applying_scenarios_one_by_one(chunk):
+    df = _frame()
+    before = df.copy()
+
+    plan = compile_scenarios(SCENARIOS, "Revenue_Invoices")
+    planned = plan.apply(df, SEED, chunk)
+    expected = _one_by_one(df, chunk)
+
+    assert len(plan) == 7
+    pd.testing.assert_frame_equal(df, before)  # the input frame is never modified
+    assert list(planned.columns) == list(expected.columns)
+    for col in ["InvoiceAmount", "Discount", "Quantity"]:
+        # Folding consecutive factors only reorders float multiplications
+        np.testing.assert_allclose(planned[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-9)
+    assert not np.allclose(planned["InvoiceAmount"], df["InvoiceAmount"])
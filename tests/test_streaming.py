@@ -0,0 +1,30 @@
+import pytest
+
+from app.helpers.profile_loader import state_config_from_profile
+from app.helpers.streaming import stream_generators
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _read_table(path: str, fmt: str):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    return pa.ipc.open_file(path).read_all()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_streamed_chunks_share_one_file_schema(tmp_path, fmt):
+    # One day per chunk: value ranges differ chunk to chunk, so per-chunk dtypes would not line up
+    config = state_config_from_profile({})
+    config.update(start_date="2022-01-01", end_date="2022-03-31", frequency="D", total_customers=50)
+    datasets = ["Customer_Master", "Revenue_Invoices", "Inventory_Snapshots"]
+
+    outputs, _ = stream_generators(config, datasets, str(tmp_path), 1, fmt)
+
+    for ds in ["Revenue_Invoices", "Inventory_Snapshots"]:
+        out = outputs[ds]
+        assert out["chunks"] == 90
+        table = _read_table(out["path"], fmt)
+        assert table.num_rows == out["rows"]
+        assert pa.types.is_int64(table.schema.field("UnitCount" if ds == "Revenue_Invoices" else "Adjustments").type)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from app.helpers.safe_eval import vectorized_eval
+from app.helpers.window_functions import cumsum, lag, lead, rolling_sum
+
+DATES = pd.to_datetime(["2024-03-01", "2024-01-01", "2024-02-01", "2024-01-15", "2024-02-01"])
+CUSTOMERS = np.array(["A", "A", "A", "B", "B"])
+AMOUNTS = np.array([30.0, 10.0, 20.0, 5.0, 7.0])
+
+
+def test_order_by_walks_each_group_chronologically_and_keeps_frame_positions():
+    # A: Jan 10 -> Feb 20 -> Mar 30; B: Jan 5 -> Feb 7
+    np.testing.assert_array_equal(lag(AMOUNTS, 1, CUSTOMERS, order_by=DATES), [20, np.nan, 10, np.nan, 5])
+    np.testing.assert_array_equal(lead(AMOUNTS, 1, CUSTOMERS, order_by=DATES), [np.nan, 20, 30, 7, np.nan])
+    np.testing.assert_array_equal(cumsum(AMOUNTS, CUSTOMERS, order_by=DATES), [60, 10, 30, 5, 12])
+    np.testing.assert_array_equal(rolling_sum(AMOUNTS, 2, order_by=DATES), [37, 10, 25, 15, 27])
+
+
+def test_order_by_ties_keep_frame_order():
+    dates = pd.to_datetime(["2024-01-01"] * 3)
+    np.testing.assert_array_equal(lag(AMOUNTS[:3], 1, order_by=dates), [np.nan, 30, 10])
+
+
+def test_without_order_by_rows_run_in_frame_order():
+    np.testing.assert_array_equal(lag(AMOUNTS, 1, CUSTOMERS), [np.nan, 30, 10, np.nan, 5])
+
+
+def test_order_by_from_a_formula():
+    df = pd.DataFrame({"Date": DATES, "CustomerID": CUSTOMERS, "InvoiceAmount": AMOUNTS})
+    result = vectorized_eval("InvoiceAmount - lag(InvoiceAmount, 1, CustomerID, order_by=Date)", df)
+    np.testing.assert_array_equal(result, [10, np.nan, 10, np.nan, 2])